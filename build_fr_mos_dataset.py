@@ -24,6 +24,25 @@ Output splits
   dev    =  local dev portion    +  mafand validation
   test   =  local test portion   +  mafand test
 
+Semantic dedup (``--semantic-dedup THRESHOLD``) removes cross-source
+near-duplicates from the local rows and mafand train before splitting: pairs
+whose French *and* Mooré LASER embeddings reach the cosine threshold are
+clustered and one row per cluster is kept, ranked by ``--dedup-priority``.
+Embeddings are cached under ``--embedding-cache`` so rebuilds only encode new
+sentences.  mafand validation/test rows are never dropped.
+
+Near dedup (``--near-dedup``) does the same with MinHash-LSH clusters over
+normalised character shingles of both sides (see ``moore_web.near_dedup``),
+catching copies that differ in whitespace, casing or a trailing word.  It is
+cheap and runs before the semantic stage.
+
+Leakage check (``--leakage report|move``, default ``report``): after the
+splits are merged, every dev/test row is checked against an index of the
+train sentences (exact normalised match or MinHash near copy, each side
+separately, see ``moore_web.leakage``).  ``report`` prints the counts (and
+writes ``--leakage-report`` JSONL if given); ``move`` also moves the leaking
+rows into train.
+
 The local dev/test are built by stratified sampling over eval-eligible
 sources (use ``--train-only-sources`` to customise which sources stay
 train-only).  Remaining local rows go to train.
@@ -43,6 +62,10 @@ Usage
     python build_fr_mos_dataset.py --output-dir fr_mos_combined \\
         --push-to-hub madoss/fr-mos-combined
 
+    # Drop cross-source paraphrases (LASER cosine >= 0.95 on both sides)
+    python build_fr_mos_dataset.py --output-dir fr_mos_combined \\
+        --semantic-dedup 0.95 --source-priority mafand conseils news
+
     # Skip the mafand download (local data only)
     python build_fr_mos_dataset.py --output-dir fr_mos_combined \\
         --no-mafand
@@ -164,6 +187,104 @@ def _apply_quality_filter(rows: list[dict]) -> list[dict]:
     return kept
 
 
+# ---------------------------------------------------------------------------
+# Semantic dedup
+# ---------------------------------------------------------------------------
+
+_DEFAULT_DEDUP_PRIORITY: tuple[str, ...] = ("source", "comet_qe", "laser_score")
+
+
+def _drop_report(rows: list[dict], kept: list[dict], label: str) -> None:
+    dropped = len(rows) - len(kept)
+    if not dropped:
+        return
+    kept_ids = {id(r) for r in kept}
+    by_source: dict[str, int] = defaultdict(int)
+    for r in rows:
+        if id(r) not in kept_ids:
+            by_source[r["source"]] += 1
+    parts = "  ".join(f"{s}={n:,}" for s, n in sorted(by_source.items()))
+    print(f"  {label}: dropped {dropped:,} rows  [{parts}]")
+
+
+def _apply_near_dedup(
+    rows: list[dict],
+    priority: tuple[str, ...],
+    source_order: tuple[str, ...],
+) -> list[dict]:
+    """Keep one row per MinHash-LSH near-duplicate cluster (see ``moore_web.near_dedup``)."""
+    from moore_web.near_dedup import near_dup_clusters
+    from moore_web.semantic_dedup import select_representatives
+
+    clusters = near_dup_clusters([r["french"] for r in rows], [r["moore"] for r in rows])
+    keep = select_representatives(rows, clusters, priority=priority, source_order=source_order)
+    kept = [r for r, k in zip(rows, keep.tolist()) if k]
+    _drop_report(rows, kept, "near dedup (MinHash-LSH)")
+    return kept
+
+
+def _apply_semantic_dedup(
+    rows: list[dict],
+    threshold: float,
+    cache_dir: Path | None,
+    priority: tuple[str, ...],
+    source_order: tuple[str, ...],
+) -> list[dict]:
+    """Keep one row per cluster of LASER near-duplicates (see ``moore_web.semantic_dedup``)."""
+    from moore_web.score_laser import encode_cached, load_encoders
+    from moore_web.semantic_dedup import semantic_dedup
+
+    laser_fr, laser_mo = load_encoders("fra", "mos")
+    fr_embs = encode_cached(laser_fr, [r["french"] for r in rows], "fra", cache_dir)
+    mo_embs = encode_cached(laser_mo, [r["moore"] for r in rows], "mos", cache_dir)
+    kept, _ = semantic_dedup(
+        rows, fr_embs, mo_embs, threshold=threshold, priority=priority, source_order=source_order
+    )
+    _drop_report(rows, kept, f"semantic dedup (cos >= {threshold})")
+    return kept
+
+
+# ---------------------------------------------------------------------------
+# Leakage check
+# ---------------------------------------------------------------------------
+
+
+def _check_leakage(
+    train: list[dict],
+    evals: dict[str, list[dict]],
+    move: bool,
+    report_path: Path | None,
+) -> tuple[list[dict], dict[str, list[dict]]]:
+    """Flag dev/test rows whose French or Mooré side (nearly) appears in *train*."""
+    from moore_web.leakage import LEAK_KINDS, LeakageIndex, leak_mask, leak_reasons
+
+    index = LeakageIndex.build([r["french"] for r in train], [r["moore"] for r in train])
+    report: list[dict] = []
+    kept_evals: dict[str, list[dict]] = {}
+    moved: list[dict] = []
+    for split, rows in evals.items():
+        flags = index.check([r["french"] for r in rows], [r["moore"] for r in rows])
+        mask = leak_mask(flags)
+        kinds = "  ".join(f"{k}={int(flags[k].sum()):,}" for k in LEAK_KINDS)
+        print(f"  {split}: {int(mask.sum()):,} / {len(rows):,} rows leak into train  [{kinds}]")
+        leaking_idx = [i for i, m in enumerate(mask.tolist()) if m]
+        leaking = [rows[i] for i in leaking_idx]
+        if leaking:
+            _print_source_breakdown(leaking, f"{split} leaks")
+        for i in leaking_idx:
+            report.append({"split": split, "leak": leak_reasons(flags, i), **rows[i]})
+        if move:
+            moved.extend(leaking)
+            rows = [r for r, m in zip(rows, mask.tolist()) if not m]
+        kept_evals[split] = rows
+
+    if report_path:
+        _write_jsonl(report, report_path)
+    if moved:
+        print(f"  moved {len(moved):,} leaking rows to train")
+    return train + moved, kept_evals
+
+
 # ---------------------------------------------------------------------------
 # Stratified split
 # ---------------------------------------------------------------------------
@@ -230,6 +351,13 @@ def build(
     push_to_hub: str | None,
     hub_private: bool,
     seed: int,
+    near_dedup: bool = False,
+    semantic_threshold: float | None = None,
+    embedding_cache: Path | None = None,
+    dedup_priority: tuple[str, ...] = _DEFAULT_DEDUP_PRIORITY,
+    source_priority: tuple[str, ...] = (),
+    leakage: str = "report",
+    leakage_report: Path | None = None,
 ) -> None:
     # ---- 1. Load local files ------------------------------------------------
     print("Loading local moore-web files …")
@@ -261,26 +389,7 @@ def build(
     print("\nApplying quality filters …")
     local_all = _apply_quality_filter(local_all)
 
-    # Separate train-only rows (dictionary entries etc.)
-    train_only = [r for r in local_all if r["source"] in train_only_sources]
-    splittable = [r for r in local_all if r["source"] not in train_only_sources]
-
-    print(f"\nEval-eligible rows: {len(splittable):,}  "
-          f"(train-only: {len(train_only):,})")
-
-    # ---- 2. Stratified split of splittable rows ----------------------------
-    print(f"\nBuilding stratified split  dev={dev_size}  test={test_size}  seed={seed} …")
-    local_train, local_dev, local_test = _stratified_split(
-        splittable, dev_size, test_size, seed
-    )
-    local_train = train_only + local_train  # re-attach train-only rows
-
-    print("  Local split:")
-    _print_source_breakdown(local_train, "train")
-    _print_source_breakdown(local_dev,   "dev  ")
-    _print_source_breakdown(local_test,  "test ")
-
-    # ---- 3. mafand splits --------------------------------------------------
+    # ---- mafand splits -----------------------------------------------------
     mafand_train: list[dict] = []
     mafand_dev: list[dict] = []
     mafand_test: list[dict] = []
@@ -313,11 +422,54 @@ def build(
                     })
             print(f"  {split_name}: {len(target):,} rows")
 
+    # ---- Near / semantic dedup (local rows + mafand train) ------------------
+    if near_dedup or semantic_threshold is not None:
+        print("\nRemoving near-duplicates …")
+        mafand_ids = {id(r) for r in mafand_train}
+        pool = local_all + mafand_train
+        if near_dedup:
+            pool = _apply_near_dedup(pool, dedup_priority, source_priority)
+        if semantic_threshold is not None:
+            pool = _apply_semantic_dedup(
+                pool, semantic_threshold, embedding_cache, dedup_priority, source_priority
+            )
+        local_all = [r for r in pool if id(r) not in mafand_ids]
+        mafand_train = [r for r in pool if id(r) in mafand_ids]
+
+    # Separate train-only rows (dictionary entries etc.)
+    train_only = [r for r in local_all if r["source"] in train_only_sources]
+    splittable = [r for r in local_all if r["source"] not in train_only_sources]
+
+    print(f"\nEval-eligible rows: {len(splittable):,}  "
+          f"(train-only: {len(train_only):,})")
+
+    # ---- 2. Stratified split of splittable rows ----------------------------
+    print(f"\nBuilding stratified split  dev={dev_size}  test={test_size}  seed={seed} …")
+    local_train, local_dev, local_test = _stratified_split(
+        splittable, dev_size, test_size, seed
+    )
+    local_train = train_only + local_train  # re-attach train-only rows
+
+    print("  Local split:")
+    _print_source_breakdown(local_train, "train")
+    _print_source_breakdown(local_dev,   "dev  ")
+    _print_source_breakdown(local_test,  "test ")
+
     # ---- 4. Merge ----------------------------------------------------------
     final_train = local_train + mafand_train
     final_dev = local_dev + mafand_dev
     final_test = local_test + mafand_test
 
+    if leakage != "off":
+        print("\nChecking dev/test leakage into train …")
+        final_train, evals = _check_leakage(
+            final_train,
+            {"dev": final_dev, "test": final_test},
+            move=leakage == "move",
+            report_path=leakage_report,
+        )
+        final_dev, final_test = evals["dev"], evals["test"]
+
     random.Random(seed).shuffle(final_train)
 
     print("\nFinal dataset:")
@@ -418,6 +570,56 @@ def _parse_args() -> argparse.Namespace:
         help="Source tags that must stay in train only "
              "(default: %(default)s).",
     )
+    parser.add_argument(
+        "--near-dedup",
+        action="store_true",
+        help="Drop MinHash-LSH near-duplicates (whitespace/casing/trailing-word variants) "
+             "across local sources and mafand train.",
+    )
+    parser.add_argument(
+        "--semantic-dedup",
+        type=float,
+        default=None,
+        metavar="THRESHOLD",
+        help="Drop cross-source near-duplicates whose French and Mooré LASER "
+             "embeddings both reach this cosine similarity (e.g. 0.95). Disabled by default.",
+    )
+    parser.add_argument(
+        "--embedding-cache",
+        default="laser_cache",
+        metavar="DIR",
+        help="Directory for cached LASER embeddings used by --semantic-dedup "
+             "(default: %(default)s).",
+    )
+    parser.add_argument(
+        "--dedup-priority",
+        nargs="+",
+        default=list(_DEFAULT_DEDUP_PRIORITY),
+        metavar="FIELD",
+        help="Ranking used to pick the row kept per --near-dedup / --semantic-dedup cluster: "
+             "'source' (see --source-priority) or a numeric field, higher is better "
+             "(default: %(default)s).",
+    )
+    parser.add_argument(
+        "--source-priority",
+        nargs="+",
+        default=[],
+        metavar="SOURCE",
+        help="Preferred sources for --dedup-priority, best first; unlisted sources rank last.",
+    )
+    parser.add_argument(
+        "--leakage",
+        choices=["off", "report", "move"],
+        default="report",
+        help="Check dev/test rows for exact or near copies of train sentences: "
+             "'report' only prints them, 'move' moves them into train (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--leakage-report",
+        default=None,
+        metavar="PATH",
+        help="Write the leaking dev/test rows with their leak kinds to this JSONL file.",
+    )
     parser.add_argument(
         "--seed",
         type=int,
@@ -439,4 +641,11 @@ if __name__ == "__main__":
         push_to_hub=args.push_to_hub,
         hub_private=args.hub_private,
         seed=args.seed,
+        near_dedup=args.near_dedup,
+        semantic_threshold=args.semantic_dedup,
+        embedding_cache=Path(args.embedding_cache) if args.embedding_cache else None,
+        dedup_priority=tuple(args.dedup_priority),
+        source_priority=tuple(args.source_priority),
+        leakage=args.leakage,
+        leakage_report=Path(args.leakage_report) if args.leakage_report else None,
     )
@@ -103,12 +103,14 @@ def align(
     """
     from laser_encoders import LaserEncoderPipeline
 
+    from moore_web.model_registry import laser_kwargs
+
     if laser_fr is None:
         print("Loading LASER French model…")
-        laser_fr = LaserEncoderPipeline(lang="fra")
+        laser_fr = LaserEncoderPipeline(lang="fra", **laser_kwargs("fra"))
     if laser_mo is None:
         print("Loading LASER Mooré model…")
-        laser_mo = LaserEncoderPipeline(lang="mos")
+        laser_mo = LaserEncoderPipeline(lang="mos", **laser_kwargs("mos"))
 
     print(f"Encoding {len(parallel.french)} French sentences…")
     fr_embs = laser_fr.encode_sentences(parallel.french, normalize_embeddings=True)
@@ -120,6 +122,16 @@ def align(
     return align_from_embeddings(parallel, fr_embs, mo_embs, min_score=min_score)
 
 
+def align_in_pool(parallel: ParallelText, min_score: float = 0.0) -> AlignedCorpus:
+    """:class:`~moore_web.worker_pool.WorkerPool` task: :func:`align` with the pool's ``laser-fra`` / ``laser-mos``.
+
+    Map it over per-article ``ParallelText`` objects to align articles in parallel.
+    """
+    from moore_web.worker_pool import model
+
+    return align(parallel, min_score=min_score, laser_fr=model("laser-fra"), laser_mo=model("laser-mos"))
+
+
 if __name__ == "__main__":
     import argparse
 
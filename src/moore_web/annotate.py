@@ -12,7 +12,10 @@ New columns per function
 - :func:`run_lang_id`          → ``{src}_glotlid_lang``, ``{src}_glotlid_prob``,
                                   ``{tgt}_glotlid_lang``, ``{tgt}_glotlid_prob``
                                   (column names derived from ``src_field`` / ``tgt_field``)
-- :func:`run_quality_warnings` → ``quality_warnings`` (list[str]), ``identification_consistency`` (float)
+- :func:`run_code_switch`      → ``{tgt}_code_switch_langs``, ``{tgt}_code_switch_probs``,
+                                  ``{tgt}_code_switch_ratio``
+- :func:`run_quality_warnings` → ``quality_flags`` (uint32), ``quality_warnings`` (list[str]),
+                                  ``identification_consistency`` (float)
 - :func:`run_len_ratio`        → ``len_ratio`` (float)
 - :func:`run_laser`            → ``laser_score`` (float)
 - :func:`run_comet_qe`         → ``comet_qe`` (float)
@@ -36,6 +39,8 @@ from __future__ import annotations
 import json
 from pathlib import Path
 
+import numpy as np
+
 from datasets import Dataset, DatasetDict, load_dataset  # noqa: F401 — re-exported for monkeypatching
 
 # ---------------------------------------------------------------------------
@@ -125,6 +130,8 @@ def run_lang_id(
     tgt_field: str = "moore",
     batch_size: int = 1000,
     model=None,
+    num_proc: int = 1,
+    lid_model: str = "glotlid",
 ):
     """Add GlotLID language-ID predictions for source and target columns.
 
@@ -132,28 +139,116 @@ def run_lang_id(
     ``{src_field}_glotlid_lang``, ``{src_field}_glotlid_prob``,
     ``{tgt_field}_glotlid_lang``, ``{tgt_field}_glotlid_prob``.
 
+    With ``lid_model="meag"`` or ``"ensemble"`` (see :mod:`moore_web.lid`) the
+    columns are named after that model instead, e.g. ``{src_field}_ensemble_lang``.
+
     Args:
         dataset:    Input ``datasets.Dataset``.
         src_field:  Source column name (default: ``"french"``).
         tgt_field:  Target column name (default: ``"moore"``).
         batch_size: Rows per batch for model inference.
         model:      Pre-loaded GlotLID fasttext model; loaded automatically if ``None``.
+        num_proc:   Forked worker processes sharing the loaded model.
+        lid_model:  One of ``moore_web.lid.LID_MODELS``.
 
     Returns:
         Annotated ``datasets.Dataset``.
     """
+    if lid_model != "glotlid":
+        return _run_lid_predictor(dataset, src_field, tgt_field, batch_size, lid_model)
+
     from moore_web import glotlid
 
     if model is None:
         model = glotlid.load_model()
 
     print(f"Running GlotLID on '{src_field}' and '{tgt_field}' ({len(dataset):,} rows)…")
+    extra = {"num_proc": num_proc} if num_proc > 1 else {}
     return glotlid.annotate_dataset(
         dataset,
         model=model,
         source_col=src_field,
         target_col=tgt_field,
         batch_size=batch_size,
+        **extra,
+    )
+
+
+def _run_lid_predictor(dataset, src_field: str, tgt_field: str, batch_size: int, lid_model: str):
+    from moore_web.lid import load_predictor
+
+    predict = load_predictor(lid_model)
+
+    def _batch(batch):
+        for field in (src_field, tgt_field):
+            preds = predict(batch[field])
+            batch[f"{field}_{lid_model}_lang"] = preds.langs()
+            batch[f"{field}_{lid_model}_prob"] = preds.prob_values(4)
+        return batch
+
+    print(f"Running {lid_model} LID on '{src_field}' and '{tgt_field}' ({len(dataset):,} rows)…")
+    return dataset.map(_batch, batched=True, batch_size=batch_size, load_from_cache_file=False)
+
+
+def run_ortho_gate(dataset, src_field: str = "french", tgt_field: str = "moore", calls_per_row=None):
+    """Drop rows whose target is clearly not Mooré by character profile.
+
+    See :func:`moore_web.orthography.gate`.  Prints the rows rejected per
+    reason and, for each model in *calls_per_row* (``{name: calls per row}``),
+    the calls the gate saved.
+
+    Args:
+        dataset:       Input ``datasets.Dataset``.
+        src_field:     Source column name (default: ``"french"``).
+        tgt_field:     Target (Mooré) column name (default: ``"moore"``).
+        calls_per_row: Downstream model calls per row, for the savings report.
+
+    Returns:
+        The kept rows.
+    """
+    from moore_web.orthography import gate, report_savings
+
+    table = dataset.with_format("arrow")
+    reasons = gate(table[src_field], table[tgt_field])
+    report_savings(reasons, calls_per_row)
+    return dataset.select(np.flatnonzero(reasons == 0))
+
+
+def run_code_switch(
+    dataset,
+    tgt_field: str = "moore",
+    expected: str = "mos_Latn",
+    batch_size: int = 10_000,
+    lid_model: str = "glotlid",
+    predict_fn=None,
+):
+    """Add windowed code-switching columns for the target column.
+
+    Adds ``{tgt_field}_code_switch_langs``, ``{tgt_field}_code_switch_probs`` and
+    ``{tgt_field}_code_switch_ratio`` — the share of the target's token windows
+    confidently labelled with another language than *expected*
+    (see :mod:`moore_web.code_switch`).
+
+    Args:
+        dataset:    Input ``datasets.Dataset``.
+        tgt_field:  Target column name (default: ``"moore"``).
+        expected:   Language the target should be written in.
+        batch_size: Rows whose windows share one prediction call.
+        lid_model:  One of ``moore_web.lid.LID_MODELS``.
+        predict_fn: Pre-loaded ``texts → Predictions`` function; overrides *lid_model*.
+
+    Returns:
+        Annotated ``datasets.Dataset``.
+    """
+    from moore_web.code_switch import annotate_dataset
+
+    return annotate_dataset(
+        dataset,
+        column=tgt_field,
+        predict_fn=predict_fn,
+        expected=expected,
+        batch_size=batch_size,
+        lid_model=lid_model,
     )
 
 
@@ -162,14 +257,14 @@ def run_lang_id(
 # ---------------------------------------------------------------------------
 
 
-def _build_foreign_wordlist(load_wordlists: bool) -> set[str]:
-    """Build the foreign-word exclusion set used by quality-warning checks."""
+def _build_foreign_wordlist(load_wordlists: bool):
+    """Load the compiled foreign-word exclusion set used by quality-warning checks."""
     if not load_wordlists:
         return set()
 
-    from moore_web.wordlists import build_foreign_wordlist
+    from moore_web.wordlists import load_foreign_wordlist
 
-    return build_foreign_wordlist()
+    return load_foreign_wordlist()
 
 
 def run_quality_warnings(
@@ -177,14 +272,21 @@ def run_quality_warnings(
     src_field: str = "french",
     tgt_field: str = "moore",
     load_wordlists: bool = True,
+    num_proc: int = 1,
+    len_ratio: bool = False,
+    detectors: list[str] | None = None,
+    labels: bool = True,
 ):
     """Add quality-warning annotations to each row.
 
-    Adds two columns:
+    Adds three columns:
 
+    - ``quality_flags`` — uint32 bitmask of active warnings (bit ``i`` is
+      ``moore_web.filter_nllb.WARNING_LABELS[i]``).
     - ``quality_warnings`` — list of active warning labels
       (``"emoji"``, ``"dots_asymmetry"``, ``"number_mismatch"``,
       ``"parenthesis_asymmetry"``, ``"bullet_asymmetry"``, ``"foreign_words"``).
+      Skipped with ``labels=False``.
     - ``identification_consistency`` — float in [0, 1]: fraction of target tokens
       absent from the foreign word list (higher = more Mooré-consistent).
 
@@ -194,19 +296,36 @@ def run_quality_warnings(
         tgt_field:      Target column name (default: ``"moore"``).
         load_wordlists: Load GlotLID + spellchecker foreign-word lists for richer
                         detection.  Set to ``False`` to skip (faster, no HF download).
+        num_proc:       Worker processes.  Workers are forked after the wordlist is
+                        loaded and share it copy-on-write; output is identical.
+        len_ratio:      Also add ``len_ratio`` (see :func:`run_len_ratio`) in the same
+                        pass, reusing the same text stage.
+        detectors:      Warning detectors to run (default: all registered in
+                        :data:`moore_web.filter_nllb.DETECTORS`).
+        labels:         Also store the ``quality_warnings`` label lists next to the
+                        compact ``quality_flags``.
 
     Returns:
         Annotated ``datasets.Dataset``.
     """
-    from moore_web.filter_nllb import annotate_warnings
+    from moore_web.filter_nllb import map_warnings
 
     foreign_wordlist = _build_foreign_wordlist(load_wordlists)
 
     print(f"Annotating quality warnings ({len(dataset):,} rows)…")
-    return dataset.map(
-        lambda batch: annotate_warnings(batch, foreign_wordlist, src_col=src_field, tgt_col=tgt_field),
-        batched=True,
+    return map_warnings(
+        dataset,
+        foreign_wordlist,
+        src_col=src_field,
+        tgt_col=tgt_field,
+        num_proc=num_proc,
+        len_ratio=len_ratio,
+        detectors=detectors,
+        labels=labels,
         desc="quality warnings",
+        # The wordlist key is content-derived, so a disk-backed dataset would hit
+        # the datasets cache and skip the detectors and their statistics.
+        load_from_cache_file=False,
     )
 
 
@@ -259,6 +378,7 @@ def run_laser(
     output_field: str | None = None,
     encoder_src=None,
     encoder_tgt=None,
+    cache_dir: str | None = None,
 ):
     """Add LASER cosine-similarity scores between source and target sentences.
 
@@ -277,6 +397,8 @@ def run_laser(
                       ``"laser_{src_lang}_{tgt_lang}"`` when ``None``.
         encoder_src:  Pre-loaded source encoder; loaded automatically if ``None``.
         encoder_tgt:  Pre-loaded target encoder; loaded automatically if ``None``.
+        cache_dir:    Optional LASER embedding cache directory, reused by later stages
+                      such as semantic deduplication.
 
     Returns:
         Annotated ``datasets.Dataset``.
@@ -292,6 +414,7 @@ def run_laser(
         output_field=output_field,
         encoder_src=encoder_src,
         encoder_tgt=encoder_tgt,
+        cache_dir=cache_dir,
     )
 
 
@@ -308,6 +431,7 @@ def run_comet_qe(
     batch_size: int = 8,
     gpus: int = 1,
     model=None,
+    proxy=None,
 ):
     """Add COMET-QE reference-free translation quality scores.
 
@@ -324,6 +448,8 @@ def run_comet_qe(
         batch_size:   Rows per inference batch.
         gpus:         Number of GPUs to use (0 = CPU).
         model:        Pre-loaded COMET model; loaded automatically if ``None``.
+        proxy:        Optional :class:`~moore_web.qe_proxy.QEProxy`; COMET then only
+                      scores the pairs the proxy cannot confidently accept or reject.
 
     Returns:
         Annotated ``datasets.Dataset``.
@@ -338,6 +464,7 @@ def run_comet_qe(
         batch_size=batch_size,
         gpus=gpus,
         model=model,
+        proxy=proxy,
     )
 
 
@@ -361,19 +488,36 @@ def annotate(
     batch_size: int = 1000,
     comet_batch_size: int = 8,
     gpus: int = 1,
+    num_proc: int = 1,
+    warn_detectors: list[str] | None = None,
     src_lang: str | None = None,
     tgt_lang: str | None = None,
+    qe_proxy: str | None = None,
+    lid_model: str = "glotlid",
+    code_switch: bool = False,
+    max_code_switch: float | None = None,
+    ortho_gate: bool = False,
 ):
     """Run any combination of annotation steps on a dataset.
 
     ``quality_warn`` and ``consistency`` both call :func:`run_quality_warnings` in a
-    single pass (the foreign wordlist is loaded only once).
+    single pass (the foreign wordlist is loaded only once); ``len_ratio`` joins
+    that pass when either is set.
+
+    ``code_switch`` runs before LASER and COMET-QE; with ``max_code_switch``,
+    rows whose target is more mixed than that are dropped before those models run.
+
+    ``ortho_gate`` runs first: rows whose target is clearly not Mooré by
+    character profile (:func:`moore_web.orthography.gate`) are dropped before
+    any model runs, and the model calls saved are reported.
 
     Args:
         dataset:           Input ``datasets.Dataset``.
         src_field:         Source column name.
         tgt_field:         Target column name.
         lang_id:           Add GlotLID language-ID columns.
+        lid_model:         LID model for ``lang_id`` (``"glotlid"``, ``"meag"`` or
+                           ``"ensemble"``; see :func:`run_lang_id`).
         quality_warn:      Add ``quality_warnings`` column.
         consistency:       Add ``identification_consistency`` column.
         len_ratio:         Add ``len_ratio`` column.
@@ -383,16 +527,47 @@ def annotate(
         batch_size:        Rows per batch for lang-ID and warning annotation.
         comet_batch_size:  Rows per inference batch for COMET-QE.
         gpus:              Number of GPUs for COMET-QE (0 = CPU).
+        num_proc:          Worker processes for GlotLID and quality-warning annotation.
+        warn_detectors:    Quality-warning detectors to run (default: all).
         src_lang:          LASER language code for the source encoder. Falls back to
                            ``FIELD_TO_LANG`` then the ``run_laser`` default.
         tgt_lang:          LASER language code for the target encoder. Falls back to
                            ``FIELD_TO_LANG`` then the ``run_laser`` default.
+        qe_proxy:          Path to a trained :mod:`~moore_web.qe_proxy` model used to
+                           triage pairs before COMET-QE.
+        code_switch:       Add ``{tgt}_code_switch_*`` columns (see :func:`run_code_switch`).
+        max_code_switch:   Drop rows whose ``{tgt}_code_switch_ratio`` exceeds this value
+                           (requires ``code_switch``).
+        ortho_gate:        Drop rows rejected by the orthography pre-filter first.
 
     Returns:
         Annotated ``datasets.Dataset``.
     """
+    if ortho_gate:
+        dataset = run_ortho_gate(
+            dataset,
+            src_field=src_field,
+            tgt_field=tgt_field,
+            calls_per_row={
+                name: per_row
+                for name, per_row, enabled in (
+                    (lid_model, 2, lang_id),
+                    ("LASER", 2, laser),
+                    ("COMET-QE", 1, comet_qe),
+                )
+                if enabled
+            },
+        )
+
     if lang_id:
-        dataset = run_lang_id(dataset, src_field=src_field, tgt_field=tgt_field, batch_size=batch_size)
+        dataset = run_lang_id(
+            dataset,
+            src_field=src_field,
+            tgt_field=tgt_field,
+            batch_size=batch_size,
+            num_proc=num_proc,
+            lid_model=lid_model,
+        )
 
     if quality_warn or consistency:
         dataset = run_quality_warnings(
@@ -400,11 +575,24 @@ def annotate(
             src_field=src_field,
             tgt_field=tgt_field,
             load_wordlists=load_wordlists,
+            num_proc=num_proc,
+            len_ratio=len_ratio,
+            # Consistency alone needs only the hashed-token stage, no detectors.
+            detectors=warn_detectors if quality_warn else [],
         )
-
-    if len_ratio:
+    elif len_ratio:
         dataset = run_len_ratio(dataset, src_field=src_field, tgt_field=tgt_field)
 
+    if code_switch:
+        dataset = run_code_switch(dataset, tgt_field=tgt_field, lid_model=lid_model)
+        if max_code_switch is not None:
+            before = len(dataset)
+            ratio = np.asarray(
+                dataset.with_format("numpy")[f"{tgt_field}_code_switch_ratio"], dtype=np.float64
+            )
+            dataset = dataset.select(np.flatnonzero(ratio <= max_code_switch))
+            print(f"Dropped {before - len(dataset):,} code-switched rows (ratio > {max_code_switch}).")
+
     if laser:
         laser_kwargs = {}
         if src_lang is not None:
@@ -414,12 +602,19 @@ def annotate(
         dataset = run_laser(dataset, src_field=src_field, tgt_field=tgt_field, **laser_kwargs)
 
     if comet_qe:
+        comet_kwargs = {}
+        if qe_proxy is not None:
+            from moore_web.qe_proxy import QEProxy, print_report
+
+            comet_kwargs["proxy"] = QEProxy.load(qe_proxy)
+            print_report(comet_kwargs["proxy"])
         dataset = run_comet_qe(
             dataset,
             src_field=src_field,
             tgt_field=tgt_field,
             batch_size=comet_batch_size,
             gpus=gpus,
+            **comet_kwargs,
         )
 
     return dataset
@@ -0,0 +1,17 @@
+"""Local cache locations shared by moore_web artifacts.
+
+Compiled artifacts (wordlists, prediction caches, model files) live under one
+root so that a worker can be provisioned by copying a single directory.  The
+root is ``$MOORE_WEB_CACHE`` when set, else ``~/.cache/moore_web``.
+"""
+
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+
+def cache_root() -> Path:
+    """Return the moore_web cache directory (not created)."""
+    env = os.environ.get("MOORE_WEB_CACHE")
+    return Path(env).expanduser() if env else Path.home() / ".cache" / "moore_web"
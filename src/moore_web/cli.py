@@ -10,7 +10,7 @@ Sources
 -------
     sida   Bilingual SIDA book (single PDF, columns interleaved)
     kade   Kadé facilitator manuals (two separate PDF/TXT files)
-    news   Raamde news corpus (JSON with ``text_units`` lists)
+    news   Raamde news corpus (JSON or JSONL entries with ``text_units`` lists)
 """
 
 from __future__ import annotations
@@ -91,6 +91,29 @@ def _err(msg: str) -> None:
     typer.echo(f"Error: {msg}", err=True)
 
 
+def _news_stream(input_path: Path, lang_id: bool, drop_debug: bool = False):
+    """Segmented news entries read one at a time from JSON/JSONL, with batched GlotLID when *lang_id*."""
+    from moore_web.segment_news_data import read_entries, segment_stream
+
+    predict_fn = None
+    if lang_id:
+        from moore_web.lid import load_predictor
+
+        typer.echo("      Running language ID in batches across articles…")
+        predict_fn = load_predictor("glotlid")
+    return segment_stream(read_entries(input_path), predict_fn, drop_debug=drop_debug)
+
+
+_WARN_DETECTORS_HELP = (
+    "Comma-separated quality-warning detectors to run (default: all). "
+    "List them with: python -m moore_web.filter_nllb --list-detectors"
+)
+
+
+def _split_detectors(value: str | None) -> list[str] | None:
+    return [name.strip() for name in value.split(",") if name.strip()] if value else None
+
+
 # TODO: replace Kadé by Poko and Katiu, Atega too
 
 
@@ -120,6 +143,7 @@ def _finalize_aligned(
     add_laser_score: bool,
     add_comet_qe: bool,
     postprocess: Callable[[list[dict]], list[dict]] | None = None,
+    warn_detectors: list[str] | None = None,
 ) -> None:
     """Write aligned corpus, optionally annotating and/or pushing to HF Hub."""
     out_str = str(out)
@@ -158,9 +182,12 @@ def _finalize_aligned(
                 len_ratio=add_len_ratio,
                 laser=add_laser_score,
                 comet_qe=add_comet_qe,
+                warn_detectors=warn_detectors,
             )
-            if not add_quality_warn and "quality_warnings" in dataset.column_names:
-                dataset = dataset.remove_columns(["quality_warnings"])
+            if not add_quality_warn:
+                dataset = dataset.remove_columns(
+                    [c for c in ("quality_warnings", "quality_flags") if c in dataset.column_names]
+                )
             if not add_consistency and "identification_consistency" in dataset.column_names:
                 dataset = dataset.remove_columns(["identification_consistency"])
 
@@ -169,8 +196,8 @@ def _finalize_aligned(
         _write_aligned(aligned, Path(out_str), jsonl)
 
 
-def _dedup_aligned(aligned):
-    """Deduplicate an AlignedCorpus using COMET-QE and return a new one."""
+def _dedup_aligned(aligned, audit_path: Path | None = None):
+    """Deduplicate an AlignedCorpus using LASER margins / COMET-QE and return a new one."""
     from moore_web.dedup_aligned_comet import deduplicate_by_comet
     from moore_web.flatten import AlignedCorpus
 
@@ -178,7 +205,7 @@ def _dedup_aligned(aligned):
         {"fr": f, "mo": m, "laser_score": s} for f, m, s in zip(aligned.french, aligned.moore, aligned.scores)
     ]
     typer.echo("      Running COMET-QE deduplication…")
-    pairs = deduplicate_by_comet(pairs)
+    pairs = deduplicate_by_comet(pairs, audit_path=audit_path)
     return AlignedCorpus(
         french=[p["fr"] for p in pairs],
         moore=[p["mo"] for p in pairs],
@@ -267,7 +294,7 @@ def parse(
     input: Annotated[
         Optional[Path],
         typer.Option(
-            "--input", "-i", exists=True, dir_okay=False, help="Input file (sida PDF or news JSON)."
+            "--input", "-i", exists=True, dir_okay=False, help="Input file (sida PDF or news JSON/JSONL)."
         ),
     ] = None,
     # kade only
@@ -330,19 +357,10 @@ def parse(
             raise typer.Exit(1)
         out = output or _default_output(input, "_segmented.json")
         typer.echo(f"Parsing news corpus: {input}")
-        corpus = json.loads(input.read_text(encoding="utf-8"))
-
-        if lang_id:
-            from moore_web.glotlid import annotate_text_units
-
-            typer.echo("Running language ID…")
-            corpus = annotate_text_units(corpus)
-
-        from moore_web.segment_news_data import segment_entries
+        from moore_web.segment_news_data import write_entries
 
-        corpus = segment_entries(corpus)
-        out.write_text(json.dumps(corpus, ensure_ascii=False, indent=2), encoding="utf-8")
-        typer.echo(f"Wrote {len(corpus)} entries → {out}")
+        n = write_entries(_news_stream(input, lang_id), out)
+        typer.echo(f"Wrote {n} entries → {out}")
 
     elif source == Source.simple:
         if input is None:
@@ -373,7 +391,7 @@ def flatten(
     input: Annotated[
         Optional[Path],
         typer.Option(
-            "--input", "-i", exists=True, dir_okay=False, help="Parsed JSON (sida, news, or simple)."
+            "--input", "-i", exists=True, dir_okay=False, help="Parsed JSON or JSONL (sida, news, or simple)."
         ),
     ] = None,
     # kade only
@@ -441,8 +459,9 @@ def flatten(
         if input is None:
             _err("--input is required for source 'news'.")
             raise typer.Exit(1)
-        entries = json.loads(input.read_text(encoding="utf-8"))
-        parallel = flatten_news_entries(entries, segment=segment)
+        from moore_web.segment_news_data import read_entries
+
+        parallel = flatten_news_entries(read_entries(input), segment=segment)
         out = output or _default_output(input, "_parallel.json")
 
     elif source == Source.simple:
@@ -494,7 +513,7 @@ def parse_flat(
             "-i",
             exists=True,
             dir_okay=False,
-            help="Input file (sida PDF, news JSON, or simple PDF).",
+            help="Input file (sida PDF, news JSON/JSONL, or simple PDF).",
         ),
     ] = None,
     fr_input: Annotated[
@@ -568,18 +587,7 @@ def parse_flat(
             _err("--input is required for source 'news'.")
             raise typer.Exit(1)
         typer.echo(f"Parsing news corpus: {input}")
-        corpus = json.loads(input.read_text(encoding="utf-8"))
-
-        if lang_id:
-            from moore_web.glotlid import annotate_text_units
-
-            typer.echo("Running language ID…")
-            corpus = annotate_text_units(corpus)
-
-        from moore_web.segment_news_data import segment_entries
-
-        corpus = segment_entries(corpus)
-        parallel = flatten_news_entries(corpus, segment=segment)
+        parallel = flatten_news_entries(_news_stream(input, lang_id), segment=segment)
         out = output or _default_output(input, "_parallel.json")
 
     elif source == Source.simple:
@@ -695,9 +703,49 @@ def annotate(
     comet_qe: Annotated[
         bool, typer.Option("--comet-qe", is_flag=True, help="Add COMET-QE translation quality score.")
     ] = False,
+    qe_proxy: Annotated[
+        Optional[Path],
+        typer.Option(
+            "--qe-proxy",
+            exists=True,
+            dir_okay=False,
+            help="Trained QE proxy (moore_web.qe_proxy); COMET-QE only scores pairs it cannot decide.",
+        ),
+    ] = None,
+    code_switch: Annotated[
+        bool,
+        typer.Option("--code-switch", is_flag=True, help="Add windowed code-switching scores for the target."),
+    ] = False,
+    max_code_switch: Annotated[
+        Optional[float],
+        typer.Option(
+            "--max-code-switch",
+            min=0.0,
+            max=1.0,
+            help="With --code-switch, drop rows whose target code-switch ratio exceeds this "
+            "before LASER / COMET-QE run.",
+        ),
+    ] = None,
+    ortho_gate: Annotated[
+        bool,
+        typer.Option(
+            "--ortho-gate",
+            is_flag=True,
+            help="Drop rows whose target is clearly not Mooré by character profile before any model "
+            "runs, and report the model calls saved.",
+        ),
+    ] = False,
     all_annotations: Annotated[
         bool, typer.Option("--all", is_flag=True, help="Enable all annotation flags.")
     ] = False,
+    num_proc: Annotated[
+        int,
+        typer.Option("--num-proc", min=1, help="Worker processes for GlotLID and quality-warning annotation."),
+    ] = 1,
+    warn_detectors: Annotated[
+        Optional[str],
+        typer.Option("--warn-detectors", help=_WARN_DETECTORS_HELP),
+    ] = None,
     hf_private: Annotated[
         bool, typer.Option("--hf-private", is_flag=True, help="Push to HuggingFace as private dataset.")
     ] = False,
@@ -715,10 +763,10 @@ def annotate(
     if all_annotations:
         lang_id = consistency = quality_warn = len_ratio = laser_score = comet_qe = True
 
-    if not any([lang_id, consistency, quality_warn, len_ratio, laser_score, comet_qe]):
+    if not any([lang_id, consistency, quality_warn, len_ratio, laser_score, comet_qe, code_switch]):
         _err(
             "No annotation flags specified. Pass at least one of: --lang-id, --consistency, "
-            "--quality-warn, --len-ratio, --laser-score, --comet-qe."
+            "--quality-warn, --len-ratio, --code-switch, --laser-score, --comet-qe."
         )
         raise typer.Exit(1)
 
@@ -735,10 +783,18 @@ def annotate(
         comet_qe=comet_qe,
         src_lang=src_lang,
         tgt_lang=tgt_lang,
+        qe_proxy=str(qe_proxy) if qe_proxy else None,
+        num_proc=num_proc,
+        warn_detectors=_split_detectors(warn_detectors),
+        code_switch=code_switch,
+        max_code_switch=max_code_switch,
+        ortho_gate=ortho_gate,
     )
     # Drop the column not requested when only one of the shared pair is selected.
-    if not quality_warn and "quality_warnings" in dataset.column_names:
-        dataset = dataset.remove_columns(["quality_warnings"])
+    if not quality_warn:
+        dataset = dataset.remove_columns(
+            [c for c in ("quality_warnings", "quality_flags") if c in dataset.column_names]
+        )
     if not consistency and "identification_consistency" in dataset.column_names:
         dataset = dataset.remove_columns(["identification_consistency"])
 
@@ -915,6 +971,14 @@ def e2e(
             help="Deduplicate aligned pairs with COMET-QE, keeping highest score per group (not available for simple).",
         ),
     ] = False,
+    dedup_audit: Annotated[
+        Optional[Path],
+        typer.Option(
+            "--dedup-audit",
+            dir_okay=False,
+            help="With --drop-duplicate: write every dropped duplicate group to this JSONL file.",
+        ),
+    ] = None,
     jsonl: Annotated[
         bool,
         typer.Option("--jsonl", is_flag=True, help="Write output as JSONL instead of JSON."),
@@ -935,6 +999,10 @@ def e2e(
             "--add-quality-warn", is_flag=True, help="Annotate aligned output with quality_warnings."
         ),
     ] = False,
+    warn_detectors: Annotated[
+        Optional[str],
+        typer.Option("--warn-detectors", help=_WARN_DETECTORS_HELP),
+    ] = None,
     add_len_ratio: Annotated[
         bool,
         typer.Option("--add-len-ratio", is_flag=True, help="Annotate aligned output with len_ratio."),
@@ -1026,6 +1094,7 @@ def e2e(
         add_laser_score=add_laser_score,
         add_comet_qe=add_comet_qe,
         hf_private=hf_private,
+        warn_detectors=_split_detectors(warn_detectors),
     )
 
     from moore_web.align_corpus import align as _align
@@ -1065,20 +1134,11 @@ def e2e(
             _err("--input is required for source 'news'.")
             raise typer.Exit(1)
         typer.echo(f"[1/3] Parsing news corpus: {input}")
-        corpus = json.loads(input.read_text(encoding="utf-8"))
-
-        if lang_id:
-            from moore_web.glotlid import annotate_text_units
-
-            typer.echo("      Running language ID…")
-            corpus = annotate_text_units(corpus)
-
         from moore_web.flatten import AlignedCorpus, flatten_news_per_entry
-        from moore_web.segment_news_data import segment_entries
 
-        corpus = segment_entries(corpus)
         typer.echo("[2/3] Flattening…")
-        article_parallels = flatten_news_per_entry(corpus, segment=segment)
+        entries = _news_stream(input, lang_id, drop_debug=True)
+        article_parallels = flatten_news_per_entry(entries, segment=segment)
         out = output or _default_output(input, f"_aligned{_ext}")
         typer.echo(f"      {len(article_parallels)} bilingual articles found.")
 
@@ -1086,9 +1146,10 @@ def e2e(
         from laser_encoders import LaserEncoderPipeline
 
         from moore_web.align_corpus import align_from_embeddings as _align_from_embs
+        from moore_web.model_registry import laser_kwargs
 
-        laser_fr = LaserEncoderPipeline(lang="fra")
-        laser_mo = LaserEncoderPipeline(lang="mos")
+        laser_fr = LaserEncoderPipeline(lang="fra", **laser_kwargs("fra"))
+        laser_mo = LaserEncoderPipeline(lang="mos", **laser_kwargs("mos"))
 
         all_fr_sents = [s for _, dp in article_parallels for s in dp.french]
         all_mo_sents = [s for _, dp in article_parallels for s in dp.moore]
@@ -1114,7 +1175,7 @@ def e2e(
             source="news",
         )
         if drop_duplicate:
-            aligned = _dedup_aligned(aligned)
+            aligned = _dedup_aligned(aligned, audit_path=dedup_audit)
         _finalize_aligned(aligned, out, jsonl, **_ann_kwargs)
         return
 
@@ -1179,9 +1240,10 @@ def e2e(
         from laser_encoders import LaserEncoderPipeline
 
         from moore_web.align_corpus import align_from_embeddings as _align_from_embs
+        from moore_web.model_registry import laser_kwargs
 
-        laser_fr = LaserEncoderPipeline(lang="fra")
-        laser_mo = LaserEncoderPipeline(lang="mos")
+        laser_fr = LaserEncoderPipeline(lang="fra", **laser_kwargs("fra"))
+        laser_mo = LaserEncoderPipeline(lang="mos", **laser_kwargs("mos"))
 
         all_fr_sents = [s for _, dp in date_parallels for s in dp.french]
         all_mo_sents = [s for _, dp in date_parallels for s in dp.moore]
@@ -1208,7 +1270,7 @@ def e2e(
             source="conseils",
         )
         if drop_duplicate:
-            aligned = _dedup_aligned(aligned)
+            aligned = _dedup_aligned(aligned, audit_path=dedup_audit)
         _finalize_aligned(aligned, out, jsonl, **_ann_kwargs)
         return
 
@@ -1290,7 +1352,7 @@ def e2e(
     aligned = _align(parallel, min_score=min_score)
 
     if drop_duplicate:
-        aligned = _dedup_aligned(aligned)
+        aligned = _dedup_aligned(aligned, audit_path=dedup_audit)
 
     _finalize_aligned(aligned, out, jsonl, **_ann_kwargs)
 
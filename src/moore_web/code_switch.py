@@ -0,0 +1,266 @@
+"""Windowed code-switching detection for mixed-language segments.
+
+Sentence-level LID gives one label per text, so a Mooré sentence carrying a
+French phrase (common in Raamde articles and *conseils* sections) is still
+labelled ``mos_Latn``.  Here every text is cut into overlapping windows of
+``window`` whitespace tokens, advancing by ``stride``; each window gets its own
+label, and the **code-switch ratio** of a text is the share of its windows
+confidently labelled with another language than the reference (``expected``,
+or the text's majority label when none is given).
+
+All windows of a batch are sent to the LID model in **one** prediction call —
+with GlotLID the windows are also deduplicated and cached (see
+:mod:`moore_web.glotlid`) — so the cost grows with the number of distinct
+windows, not with the number of sentences.
+
+New columns (see :func:`annotate_dataset`)
+------------------------------------------
+- ``{column}_code_switch_langs`` — label of each window (list[str])
+- ``{column}_code_switch_probs`` — its probability (list[float])
+- ``{column}_code_switch_ratio`` — share of confidently foreign windows (float)
+
+Usage
+-----
+    # Annotate the Mooré side of a JSONL file
+    uv run python -m moore_web.code_switch -i data.jsonl -o out.jsonl --column moore
+
+    from moore_web.code_switch import detect
+    result = detect(texts, predict_fn, expected="mos_Latn")
+    result.ratio          # np.ndarray[float32], one value per text
+"""
+
+from __future__ import annotations
+
+import argparse
+from collections.abc import Callable
+from dataclasses import dataclass
+
+import numpy as np
+
+from moore_web.lid import Predictions
+
+DEFAULT_WINDOW = 4
+DEFAULT_STRIDE = 2
+DEFAULT_MIN_PROB = 0.5
+
+
+@dataclass
+class CodeSwitch:
+    """Window predictions of a batch of texts: windows of text ``i`` are ``offsets[i]:offsets[i + 1]``."""
+
+    windows: Predictions
+    starts: np.ndarray  # int32, first token of each window
+    ends: np.ndarray  # int32, one past its last token
+    offsets: np.ndarray  # int64, len(texts) + 1
+    ratio: np.ndarray  # float32, one per text
+
+    def __len__(self) -> int:
+        return len(self.ratio)
+
+    def langs(self) -> list[list[str]]:
+        """Window labels, per text."""
+        langs = self.windows.langs()
+        return [langs[a:b] for a, b in zip(self.offsets[:-1], self.offsets[1:])]
+
+    def probs(self, decimals: int | None = None) -> list[list[float]]:
+        """Window probabilities, per text (rounded to *decimals* when given)."""
+        probs = self.windows.prob_values(decimals)
+        return [probs[a:b] for a, b in zip(self.offsets[:-1], self.offsets[1:])]
+
+    def spans(self, i: int) -> list[tuple[int, int, str]]:
+        """``(start token, end token, label)`` of each window of text *i*."""
+        a, b = self.offsets[i], self.offsets[i + 1]
+        labels = self.windows.labels[self.windows.codes[a:b]].tolist()
+        return list(zip(self.starts[a:b].tolist(), self.ends[a:b].tolist(), labels))
+
+
+def window_starts(n_tokens: int, window: int = DEFAULT_WINDOW, stride: int = DEFAULT_STRIDE) -> list[int]:
+    """First token of each window; the last window always ends on the last token.
+
+    Texts of at most *window* tokens form a single window; empty texts have none.
+    """
+    if n_tokens == 0:
+        return []
+    if n_tokens <= window:
+        return [0]
+    starts = list(range(0, n_tokens - window + 1, stride))
+    if starts[-1] + window < n_tokens:
+        starts.append(n_tokens - window)
+    return starts
+
+
+def detect(
+    texts: list[str | None],
+    predict_fn: Callable[[list[str]], Predictions],
+    window: int = DEFAULT_WINDOW,
+    stride: int = DEFAULT_STRIDE,
+    expected: str | None = None,
+    min_prob: float = DEFAULT_MIN_PROB,
+) -> CodeSwitch:
+    """Label every window of every text with a single *predict_fn* call.
+
+    A window counts as switched when its probability is at least *min_prob* and
+    its label differs from *expected* (or, without it, from the text's most
+    frequent window label).  Null texts and texts without tokens have no
+    windows and get a ratio of 0.
+    """
+    window_texts: list[str] = []
+    starts: list[int] = []
+    ends: list[int] = []
+    counts = np.zeros(len(texts), dtype=np.int64)
+    for i, text in enumerate(texts):
+        tokens = text.split() if text is not None else []
+        text_starts = window_starts(len(tokens), window, stride)
+        window_texts.extend(" ".join(tokens[s : s + window]) for s in text_starts)
+        starts.extend(text_starts)
+        ends.extend(min(s + window, len(tokens)) for s in text_starts)
+        counts[i] = len(text_starts)
+    offsets = np.concatenate([[0], np.cumsum(counts)])
+
+    if window_texts:
+        windows = predict_fn(window_texts)
+    else:
+        windows = Predictions(np.zeros(0, np.int32), np.zeros(0, np.float32), np.array([], dtype=object))
+
+    # Reference label code of each window's text
+    if expected is not None:
+        hits = np.flatnonzero(windows.labels == expected)
+        reference = np.full(len(windows), hits[0] if len(hits) else -1, dtype=np.int64)
+    else:
+        majority = np.zeros(len(texts), dtype=np.int64)
+        for i in np.flatnonzero(counts):
+            majority[i] = np.bincount(windows.codes[offsets[i] : offsets[i + 1]]).argmax()
+        reference = np.repeat(majority, counts)
+
+    switched = (windows.codes != reference) & (windows.probs >= min_prob)
+    ratio = np.zeros(len(texts), dtype=np.float32)
+    nonempty = counts > 0
+    if len(switched):
+        totals = np.add.reduceat(switched.astype(np.int64), offsets[:-1][nonempty])
+        ratio[nonempty] = totals / counts[nonempty]
+    return CodeSwitch(
+        windows, np.asarray(starts, dtype=np.int32), np.asarray(ends, dtype=np.int32), offsets, ratio
+    )
+
+
+def _annotate_batch(
+    batch: dict[str, list],
+    column: str,
+    predict_fn: Callable[[list[str]], Predictions],
+    window: int,
+    stride: int,
+    expected: str | None,
+    min_prob: float,
+) -> dict[str, list]:
+    result = detect(batch[column], predict_fn, window, stride, expected, min_prob)
+    batch[f"{column}_code_switch_langs"] = result.langs()
+    batch[f"{column}_code_switch_probs"] = result.probs(4)
+    batch[f"{column}_code_switch_ratio"] = np.round(result.ratio.astype(np.float64), 4).tolist()
+    return batch
+
+
+def annotate_dataset(
+    dataset,
+    column: str = "moore",
+    predict_fn: Callable[[list[str]], Predictions] | None = None,
+    window: int = DEFAULT_WINDOW,
+    stride: int = DEFAULT_STRIDE,
+    expected: str | None = "mos_Latn",
+    min_prob: float = DEFAULT_MIN_PROB,
+    batch_size: int = 10_000,
+    lid_model: str = "glotlid",
+):
+    """Add the three ``{column}_code_switch_*`` columns to a HuggingFace Dataset.
+
+    *predict_fn* defaults to :func:`moore_web.lid.load_predictor` for *lid_model*.
+    Each ``dataset.map`` batch of *batch_size* rows is one prediction call over
+    all of its windows.
+    """
+    if predict_fn is None:
+        from moore_web.lid import load_predictor
+
+        predict_fn = load_predictor(lid_model)
+
+    print(f"Detecting code-switching in '{column}' ({len(dataset):,} rows, {window}-token windows)…")
+    dataset = dataset.map(
+        _annotate_batch,
+        batched=True,
+        batch_size=batch_size,
+        fn_kwargs={
+            "column": column,
+            "predict_fn": predict_fn,
+            "window": window,
+            "stride": stride,
+            "expected": expected,
+            "min_prob": min_prob,
+        },
+        load_from_cache_file=False,
+        desc="code-switch",
+    )
+    ratio = np.asarray(dataset.with_format("numpy")[f"{column}_code_switch_ratio"], dtype=np.float64)
+    if len(ratio):
+        print(f"  mixed rows (ratio > 0): {np.count_nonzero(ratio > 0):,} / {len(ratio):,}")
+    return dataset
+
+
+# ---------------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------------
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    from moore_web.lid import LID_MODELS
+
+    parser = argparse.ArgumentParser(
+        description="Annotate a dataset column with windowed code-switching scores.",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__,
+    )
+    parser.add_argument("-i", "--input", required=True, help="Local JSONL or hf://owner/repo.")
+    parser.add_argument("-o", "--output", required=True, help="Local JSONL or hf://owner/repo.")
+    parser.add_argument("--column", default="moore", help="Text column to scan (default: %(default)s).")
+    parser.add_argument(
+        "--expected",
+        default="mos_Latn",
+        help="Reference label; pass an empty string to use each text's majority label (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--window", type=int, default=DEFAULT_WINDOW, help="Tokens per window (default: %(default)s)."
+    )
+    parser.add_argument(
+        "--stride", type=int, default=DEFAULT_STRIDE, help="Tokens between windows (default: %(default)s)."
+    )
+    parser.add_argument(
+        "--min-prob",
+        type=float,
+        default=DEFAULT_MIN_PROB,
+        help="Minimum window probability to count as switched (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--lid-model", choices=LID_MODELS, default="glotlid", help="LID model (default: %(default)s)."
+    )
+    parser.add_argument(
+        "--batch-size", type=int, default=10_000, help="Rows per prediction call (default: %(default)s)."
+    )
+    return parser
+
+
+def main() -> None:
+    from moore_web.annotate import load_data, save_data
+
+    args = _build_parser().parse_args()
+    dataset = annotate_dataset(
+        load_data(args.input),
+        column=args.column,
+        window=args.window,
+        stride=args.stride,
+        expected=args.expected or None,
+        min_prob=args.min_prob,
+        batch_size=args.batch_size,
+        lid_model=args.lid_model,
+    )
+    save_data(dataset, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,19 +1,93 @@
-"""Deduplicate DTW-aligned parallel pairs using COMET-QE scoring.
+"""Deduplicate DTW-aligned parallel pairs using LASER margins and COMET-QE scoring.
 
 After DTW alignment the same source or target sentence can appear in multiple
 pairs.  This module detects such repetitions on **both** sides and keeps only
-the highest-quality pair per connected duplicate group, as judged by
-``McGill-NLP/ssa-comet-qe`` (reference-free quality estimation).
+the highest-quality pair per connected duplicate group.
+
+Grouping works on integer ids of hashed texts: every pair is linked to its
+source-text id and its target-text id in a sparse bipartite graph, and the
+duplicate groups are the connected components of that graph.
+
+Within a group the winner is taken from the existing ``laser_score`` when the
+best pair leads the runner-up by at least ``laser_margin``.  Only the remaining
+*ambiguous* groups are scored with ``McGill-NLP/ssa-comet-qe``
+(reference-free quality estimation).
 
 Typical usage
 -------------
 >>> from moore_web.dedup_aligned_comet import deduplicate_by_comet
->>> clean = deduplicate_by_comet(aligned_pairs)
+>>> clean = deduplicate_by_comet(aligned_pairs, audit_path="dropped_groups.jsonl")
 """
 
 from __future__ import annotations
 
-from collections import defaultdict
+from pathlib import Path
+
+import numpy as np
+
+from moore_web.text_hash import factorize_texts
+
+
+def find_duplicate_groups(src_texts: list[str], mt_texts: list[str]) -> np.ndarray:
+    """Return a group id per pair; pairs sharing a source **or** target text share a group.
+
+    Transitive duplicates (A shares src with B, B shares mt with C) end up in
+    the same group.  Singletons get their own group id.
+    """
+    from scipy.sparse import coo_matrix
+    from scipy.sparse.csgraph import connected_components
+
+    n = len(src_texts)
+    src_ids, n_src = factorize_texts(src_texts)
+    mt_ids, n_mt = factorize_texts(mt_texts)
+
+    # Nodes: [0, n) pairs, [n, n + n_src) source texts, [n + n_src, ...) target texts.
+    pair_nodes = np.arange(n, dtype=np.int64)
+    rows = np.concatenate([pair_nodes, pair_nodes])
+    cols = np.concatenate([n + src_ids, n + n_src + mt_ids])
+    n_nodes = n + n_src + n_mt
+    graph = coo_matrix((np.ones(len(rows), dtype=np.int8), (rows, cols)), shape=(n_nodes, n_nodes))
+    _, labels = connected_components(graph.tocsr(), directed=False)
+    return labels[:n]
+
+
+def _laser_winners(
+    groups: np.ndarray, members: np.ndarray, laser: np.ndarray, laser_margin: float
+) -> tuple[np.ndarray, np.ndarray]:
+    """Per duplicate group, return ``(best_member, decided)`` from LASER scores.
+
+    *members* must be sorted by group.  A group is decided when its best LASER
+    score beats the runner-up by at least *laser_margin* (groups with a missing
+    score are never decided).
+    """
+    order = np.lexsort((-np.nan_to_num(laser[members], nan=-np.inf), groups[members]))
+    ranked = members[order]
+    ranked_groups = groups[ranked]
+    starts = np.flatnonzero(np.r_[True, ranked_groups[1:] != ranked_groups[:-1]])
+    best = ranked[starts]
+    runner_up = ranked[starts + 1]
+    has_nan = np.add.reduceat(np.isnan(laser[ranked]).astype(np.int64), starts) > 0
+    decided = ~has_nan & (laser[best] - laser[runner_up] >= laser_margin)
+    return best, decided
+
+
+def _write_audit(path: str | Path, pairs: list[dict], groups: list[tuple[int, list[int], str]]) -> None:
+    """Write one JSONL line per dropped duplicate group, each member flagged ``kept`` or not."""
+    import msgspec
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    encoder = msgspec.json.Encoder()
+    with path.open("wb") as f:
+        for kept, members, resolved_by in groups:
+            record = {
+                "kept_index": kept,
+                "resolved_by": resolved_by,
+                "members": [{"index": i, "kept": i == kept, **pairs[i]} for i in members],
+            }
+            f.write(encoder.encode(record))
+            f.write(b"\n")
+    print(f"Wrote {len(groups)} dropped duplicate groups → {path}")
 
 
 def deduplicate_by_comet(
@@ -22,97 +96,96 @@ def deduplicate_by_comet(
     mt_key: str = "mo",
     batch_size: int = 8,
     gpus: int = 0,
+    laser_key: str = "laser_score",
+    laser_margin: float = 0.05,
+    audit_path: str | Path | None = None,
+    model=None,
 ) -> list[dict]:
-    """Remove duplicate aligned pairs, keeping the highest COMET-QE score.
+    """Remove duplicate aligned pairs, keeping the best pair per duplicate group.
 
     Two pairs are considered part of the same duplicate *group* when they share
     the same ``src_key`` text **or** the same ``mt_key`` text (checked on both
-    sides).  Connected components are built with union-find so that transitive
-    duplicates (A shares src with B, B shares mt with C) are handled correctly.
-    Within each component only the pair with the highest COMET-QE score is kept.
+    sides).  Groups are the connected components of the pair/text graph, so
+    transitive duplicates are handled correctly.
+
+    Within each group the pair with the highest ``laser_key`` score is kept when
+    it leads the runner-up by at least *laser_margin*; otherwise every member
+    of the group is scored with COMET-QE and the highest score wins.
 
     Args:
-        pairs:      List of dicts, each with at least ``src_key`` and
-                    ``mt_key`` string fields.
-        src_key:    Key for the source text (default ``"fr"``).
-        mt_key:     Key for the MT/target text (default ``"mo"``).
-        batch_size: COMET inference batch size.
-        gpus:       Number of GPUs to use (0 = CPU).
+        pairs:        List of dicts, each with at least ``src_key`` and
+                      ``mt_key`` string fields.
+        src_key:      Key for the source text (default ``"fr"``).
+        mt_key:       Key for the MT/target text (default ``"mo"``).
+        batch_size:   COMET inference batch size.
+        gpus:         Number of GPUs to use (0 = CPU).
+        laser_key:    Key holding the LASER score used for COMET-free tie-breaking.
+                      Pairs without it always go through COMET.
+        laser_margin: Minimum LASER lead of the best pair over the runner-up for a
+                      group to be resolved without COMET.  Use ``float("inf")`` to
+                      always score with COMET.
+        audit_path:   Optional JSONL path; each dropped group is written as one
+                      line with all its members for manual inspection.
+        model:        Pre-loaded COMET model; loaded on demand if ``None``.
 
     Returns:
-        Deduplicated list of pair dicts.  Scored pairs gain a ``"comet_qe"``
-        field with their raw model score.
+        Deduplicated list of pair dicts.  Pairs scored with COMET gain a
+        ``"comet_qe"`` field with their raw model score.
     """
-    # TODO: Can we vectorize this to be faster?
     # is this better than google/metricx-24-hybrid-xl-v2p6 mentionned in Omnilingual MT?
-    from comet import download_model, load_from_checkpoint
-
-    src_to_indices: dict[str, list[int]] = defaultdict(list)
-    mt_to_indices: dict[str, list[int]] = defaultdict(list)
-
-    for idx, pair in enumerate(pairs):
-        src_to_indices[pair[src_key]].append(idx)
-        mt_to_indices[pair[mt_key]].append(idx)
+    if not pairs:
+        return pairs
 
-    duplicate_indices: set[int] = set()
-    for indices in src_to_indices.values():
-        if len(indices) > 1:
-            duplicate_indices.update(indices)
-    for indices in mt_to_indices.values():
-        if len(indices) > 1:
-            duplicate_indices.update(indices)
+    groups = find_duplicate_groups([p[src_key] for p in pairs], [p[mt_key] for p in pairs])
+    sizes = np.bincount(groups)
+    dup_members = np.flatnonzero(sizes[groups] > 1)
 
-    if not duplicate_indices:
+    if not len(dup_members):
         print("No duplicates found — returning original list unchanged.")
         return pairs
 
-    print(f"Found {len(duplicate_indices)} pairs involved in duplications. Loading COMET-QE model...")
-
-    model_path = download_model("McGill-NLP/ssa-comet-qe")
-    model = load_from_checkpoint(model_path)
-
-    dup_indices_list = sorted(duplicate_indices)
-    comet_data = [{"src": pairs[i][src_key], "mt": pairs[i][mt_key]} for i in dup_indices_list]
-
-    output = model.predict(comet_data, batch_size=batch_size, gpus=gpus)
-    for rank, idx in enumerate(dup_indices_list):
-        pairs[idx]["comet_qe"] = float(output.scores[rank])
-
-    parent = list(range(len(pairs)))
-
-    def _find(x: int) -> int:
-        while parent[x] != x:
-            parent[x] = parent[parent[x]]
-            x = parent[x]
-        return x
-
-    def _union(a: int, b: int) -> None:
-        parent[_find(a)] = _find(b)
-
-    for indices in src_to_indices.values():
-        for i in range(1, len(indices)):
-            _union(indices[0], indices[i])
-
-    for indices in mt_to_indices.values():
-        for i in range(1, len(indices)):
-            _union(indices[0], indices[i])
-
-    component: dict[int, list[int]] = defaultdict(list)
-    for idx in duplicate_indices:
-        component[_find(idx)].append(idx)
+    dup_members = dup_members[np.argsort(groups[dup_members], kind="stable")]
+    laser = np.array(
+        [np.nan if pairs[i].get(laser_key) is None else float(pairs[i][laser_key]) for i in range(len(pairs))]
+    )
+    best, decided = _laser_winners(groups, dup_members, laser, laser_margin)
+    n_groups = len(best)
+    print(
+        f"Found {len(dup_members)} pairs in {n_groups} duplicate groups; "
+        f"{int(decided.sum())} resolved by LASER margin (>= {laser_margin})."
+    )
+
+    ambiguous = dup_members[np.isin(groups[dup_members], groups[best[~decided]])].tolist()
+    if ambiguous:
+        print(
+            f"Scoring {len(ambiguous)} pairs from {int((~decided).sum())} ambiguous groups with COMET-QE..."
+        )
+        if model is None:
+            from moore_web.score_comet_qe import load_model
+
+            model = load_model()
+        comet_data = [{"src": pairs[i][src_key], "mt": pairs[i][mt_key]} for i in ambiguous]
+        output = model.predict(comet_data, batch_size=batch_size, gpus=gpus)
+        for idx, score in zip(ambiguous, output.scores):
+            pairs[idx]["comet_qe"] = float(score)
+
+    starts = np.flatnonzero(np.r_[True, groups[dup_members][1:] != groups[dup_members][:-1]])
+    member_lists = np.split(dup_members, starts[1:])
 
     indices_to_drop: set[int] = set()
-    for members in component.values():
-        if len(members) < 2:
-            continue
-        best = max(members, key=lambda i: pairs[i].get("comet_qe", -1.0))
-        indices_to_drop.update(i for i in members if i != best)
+    dropped_groups: list[tuple[int, list[int], str]] = []
+    for members, laser_best, is_decided in zip(member_lists, best, decided):
+        members = members.tolist()
+        if is_decided:
+            kept, resolved_by = int(laser_best), "laser"
+        else:
+            kept, resolved_by = max(members, key=lambda i: pairs[i].get("comet_qe", -1.0)), "comet"
+        indices_to_drop.update(i for i in members if i != kept)
+        if audit_path is not None:
+            dropped_groups.append((kept, members, resolved_by))
 
     result = [p for i, p in enumerate(pairs) if i not in indices_to_drop]
     print(f"Removed {len(indices_to_drop)} duplicate pairs. {len(result)} pairs remaining.")
-    # TODO: Save dropped duplicate groups to a JSONL file for manual inspection.
-    #       Each line should contain the full group (all members with their comet_qe
-    #       scores) so it's easy to audit whether the right pair was kept and to
-    #       understand the origin of the duplicates (e.g. boilerplate, scraper
-    #       re-fetches, segmentation boundary errors).
+    if audit_path is not None:
+        _write_audit(audit_path, pairs, dropped_groups)
     return result
@@ -14,6 +14,11 @@ Filters applied
 10. Foreign word list                    — Mooré contains words from non-Mooré GlotLID wordlists
 11. Length ratio                         — min(len(src), len(tgt)) / max(len(src), len(tgt)) below threshold
 12. Terminal punctuation                 — OpusFilter-style mismatch in ``.``, ``?``, ``!``, ``…`` counts
+13. Near duplicates (``--near-dedup``)   — MinHash-LSH clusters over both sides; first row per cluster kept
+14. Code-switching                       — ``target_code_switch_ratio`` above threshold
+                                           (windowed LID, see :mod:`moore_web.code_switch`)
+15. Orthography gate (``--ortho-gate``)  — Mooré side clearly not Mooré by character / word profile
+                                           (see :mod:`moore_web.orthography`); runs first
 
 Quality warnings added per row (before hard filtering)
 -------------------------------------------------------
@@ -21,6 +26,14 @@ Quality warnings added per row (before hard filtering)
 ``has_parenthesis_asymmetry``, ``has_bullet_asymmetry``,
 ``has_foreign_words``, ``identification_inconsistency``, ``len_ratio``
 
+Warnings are stored as a ``quality_flags`` uint32 bitmask (bit ``i`` is
+``WARNING_LABELS[i]``); ``--warning-labels`` or :func:`with_warning_labels`
+adds the readable ``quality_warnings`` lists.
+
+The warnings are :class:`Detector` entries in the :data:`DETECTORS` registry
+(``--list-detectors``); ``--detectors`` picks which ones run, and each run
+prints per-detector time, rows/s and hit rate.
+
 Usage
 -----
     # Annotate warnings only (no hard filter, no push)
@@ -36,20 +49,35 @@ Usage
         --lid-threshold 0.9 \\
         --glotlid-threshold 0.9 \\
         --comet-threshold 0.5
+
+    # Only the cheap detectors
+    uv run python -m moore_web.filter_nllb --source-repo madoss/nllb-mos-lid --no-push \\
+        --detectors emoji dots_asymmetry bullet_asymmetry
 """
 
 # TODO; Improve filtering with https://huggingface.co/datasets/cis-lmu/glotlid-wordlists/blob/main/filter.py
 from __future__ import annotations
 
 import argparse
+import hashlib
 import math
+import multiprocessing as mp
 import re
-
+import time
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+from functools import cached_property
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
 from dotenv import load_dotenv
 
-from moore_web.wordlists import build_foreign_wordlist
+from moore_web.stream_stats import StreamingStats
+from moore_web.wordlists import CompiledWordlist, load_foreign_wordlist
 
 try:
+    from datatrove.utils.text import PUNCTUATION as _DT_PUNCTUATION
     from datatrove.utils.text import TextNormConfig, simplify_text as _simplify_text
 
     _NORM_CONFIG = TextNormConfig(
@@ -63,6 +91,7 @@ try:
     )
     _HAS_DATATROVE = True
 except ImportError:
+    _DT_PUNCTUATION = ""
     _HAS_DATATROVE = False
 
 load_dotenv()
@@ -110,6 +139,7 @@ _COL_TARGET_GLOTLID_PROB = "target_glotlid_prob"
 _COL_SOURCE_GLOTLID_LANG = "source_glotlid_lang"
 _COL_SOURCE_GLOTLID_PROB = "source_glotlid_prob"
 _COL_COMET_QE = "comet_qe_en_mos"
+_COL_TARGET_CODE_SWITCH = "target_code_switch_ratio"
 
 # ---------------------------------------------------------------------------
 # Warning detectors (pure functions, operate on a single row dict)
@@ -172,7 +202,7 @@ def _has_bullet_asymmetry(src: str, tgt: str) -> bool:
     return src_bullet != tgt_bullet
 
 
-def _lang_consistency_score(text: str, foreign_words: set[str]) -> float:
+def _lang_consistency_score(text: str, foreign_words: set[str] | CompiledWordlist) -> float:
     """Fraction of tokens in *text* that do NOT appear in the foreign wordlist.
 
     Uses datatrove's ``simplify_text`` when available for punctuation stripping,
@@ -193,7 +223,10 @@ def _lang_consistency_score(text: str, foreign_words: set[str]) -> float:
     # If too few meaningful tokens remain the score is unreliable (noise / gibberish).
     if len(words) < 2:
         return 0.0
-    non_foreign = len(words - foreign_words)
+    if isinstance(foreign_words, CompiledWordlist):
+        non_foreign = len(words) - int(np.count_nonzero(foreign_words.contains_many(list(words))))
+    else:
+        non_foreign = sum(w not in foreign_words for w in words)
     return round(non_foreign / len(words), 4)
 
 
@@ -222,14 +255,508 @@ def _terminal_punctuation_score(src: str, tgt: str) -> float:
     return -math.log(score + 1)
 
 
-def _has_foreign_words(text: str, wordlist: set[str]) -> bool:
+def _has_foreign_words(text: str, wordlist: set[str] | CompiledWordlist) -> bool:
     """True when *text* contains at least one token (length >= 3) present in the foreign wordlist."""
     if not wordlist:
         return False
-    tokens = (t for t in re.findall(r"\b\w+\b", text.lower()) if len(t) >= 3)
+    tokens = [t for t in re.findall(r"\b\w+\b", text.lower()) if len(t) >= 3]
+    if isinstance(wordlist, CompiledWordlist):
+        return bool(wordlist.contains_many(tokens).any()) if tokens else False
     return any(t in wordlist for t in tokens)
 
 
+# ---------------------------------------------------------------------------
+# Vectorised warning engine
+# ---------------------------------------------------------------------------
+
+# Labels in ``quality_warnings`` order; bit ``i`` of a flag value is ``WARNING_LABELS[i]``.
+# Filled in by :func:`register_detector`.
+WARNING_LABELS: tuple[str, ...] = ()
+WARNING_BITS: dict[str, int] = {}
+
+# RE2 (pyarrow.compute) equivalents of the Python patterns above.
+_EMOJI_RE2 = (
+    r"[\x{1f600}-\x{1f64f}\x{1f300}-\x{1f5ff}\x{1f680}-\x{1f6ff}\x{1f1e0}-\x{1f1ff}"
+    r"\x{2702}-\x{27b0}\x{24c2}-\x{1f251}]"
+)
+_PARENS_RE2 = r"[\(\[][^\)\]]{2,}[\)\]]"
+_TERMINAL_PUNCT_RE2 = "[.?!…]"
+_DIGIT_RE2 = r"\p{Nd}"
+# Python's Unicode ``\w`` is [\p{L}\p{N}_]; other non-space characters become spaces
+# before splitting on whitespace (cheaper than a regex split).
+_NON_WORD_RE2 = r"[^\p{L}\p{N}_\s]+"
+# datatrove's punctuation stripping (consistency score only) also splits on the word
+# characters it lists (``_`` and the full-width digit one); rows containing them
+# take the per-row path for that score.
+_DT_WORD_PUNCT = "".join(c for c in _DT_PUNCTUATION if re.match(r"\w", c))
+_DT_WORD_PUNCT_RE2 = "[" + re.escape(_DT_WORD_PUNCT) + "]" if _DT_WORD_PUNCT else None
+# Outside these blocks (and for U+0130, whose lowercase is two code points) RE2's
+# Unicode tables or Arrow's lowercasing can differ from Python's; such rows take
+# the exact per-row path for the token and number detectors.
+_PYTHON_ONLY_RE2 = (
+    r"[^\x{0}-\x{86f}\x{1e00}-\x{2bff}\x{3000}-\x{303f}\x{fe00}-\x{ffef}\x{1f000}-\x{1faff}]|\x{130}"
+)
+
+_LABEL_CACHE: dict[int, list[str]] = {}
+_HASHED_WORDLIST_CACHE: dict[int, tuple[set[str], CompiledWordlist]] = {}
+
+
+def _as_text_array(values) -> pa.Array:
+    if isinstance(values, pa.ChunkedArray):
+        values = values.combine_chunks()
+    if not isinstance(values, pa.Array):
+        values = pa.array(values, type=pa.large_string())
+    return pc.fill_null(values, "") if values.null_count else values
+
+
+def _bool(arr) -> np.ndarray:
+    return np.asarray(arr.to_numpy(zero_copy_only=False), dtype=bool)
+
+
+def _hashed_wordlist(wordlist: set[str] | CompiledWordlist) -> CompiledWordlist:
+    """*wordlist* as sorted 64-bit token hashes; a plain set is hashed once and cached per object."""
+    if isinstance(wordlist, CompiledWordlist):
+        return wordlist
+    cached = _HASHED_WORDLIST_CACHE.get(id(wordlist))
+    if cached is None or cached[0] is not wordlist:
+        cached = (wordlist, CompiledWordlist.from_words(wordlist))
+        _HASHED_WORDLIST_CACHE.clear()
+        _HASHED_WORDLIST_CACHE[id(wordlist)] = cached
+    return cached[1]
+
+
+def _match(arr: pa.Array, pattern: str) -> np.ndarray:
+    return _bool(pc.match_substring_regex(arr, pattern))
+
+
+def _edge_dots(stripped: pa.Array) -> np.ndarray:
+    """Vectorised ``_DOTS_RE.match(s) or _DOTS_RE.search(s[-5:])`` on stripped strings."""
+    starts = _bool(pc.starts_with(stripped, ".."))
+    ends = _bool(pc.match_substring(pc.utf8_slice_codeunits(stripped, start=-5), ".."))
+    return starts | ends
+
+
+def _leading_bullet(stripped: pa.Array) -> np.ndarray:
+    first = pc.utf8_slice_codeunits(stripped, start=0, stop=1)
+    return _bool(pc.is_in(first, value_set=pa.array(sorted(_BULLET_CHARS), type=pa.large_string())))
+
+
+# ---------------------------------------------------------------------------
+# Shared tokenisation stage
+# ---------------------------------------------------------------------------
+
+
+class TokenizedText:
+    """A text column and its lowercased ``\\w+`` tokenisation, computed once per batch.
+
+    Every attribute is derived on first access and cached, so all lexical
+    detectors (and ``len_ratio``) share one pass over the text, and detectors
+    that only need character counts never tokenise at all.  Tokens of row ``i``
+    are ``tokens[offsets[i]:offsets[i + 1]]``.
+    """
+
+    def __init__(self, texts):
+        self.text = texts.text if isinstance(texts, TokenizedText) else _as_text_array(texts)
+
+    def __len__(self) -> int:
+        return len(self.text)
+
+    @cached_property
+    def n_chars(self) -> np.ndarray:
+        """Code points per row (Python ``len``)."""
+        return pc.utf8_length(self.text).to_numpy().astype(np.int64)
+
+    @cached_property
+    def stripped(self) -> pa.Array:
+        return pc.utf8_trim_whitespace(self.text)
+
+    @cached_property
+    def lowered(self) -> pa.Array:
+        return pc.utf8_lower(self.text)
+
+    @cached_property
+    def _split(self) -> tuple[pa.Array, np.ndarray]:
+        lists = pc.utf8_split_whitespace(pc.replace_substring_regex(self.lowered, _NON_WORD_RE2, " "))
+        tokens = pc.list_flatten(lists)
+        # Arrow's split keeps empty strings around leading/trailing whitespace.
+        non_empty = _bool(pc.greater(pc.binary_length(tokens), 0))
+        return tokens.filter(pa.array(non_empty)), pc.list_parent_indices(lists).to_numpy()[non_empty]
+
+    @property
+    def tokens(self) -> pa.Array:
+        return self._split[0]
+
+    @property
+    def rows(self) -> np.ndarray:
+        """Row index of every token."""
+        return self._split[1]
+
+    @cached_property
+    def offsets(self) -> np.ndarray:
+        offsets = np.zeros(len(self) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(self.rows, minlength=len(self)), out=offsets[1:])
+        return offsets
+
+    @cached_property
+    def token_lengths(self) -> np.ndarray:
+        return pc.utf8_length(self.tokens).to_numpy().astype(np.int64)
+
+    @cached_property
+    def _encoded(self) -> pa.DictionaryArray:
+        return pc.dictionary_encode(self.tokens)
+
+    @property
+    def vocab(self) -> pa.Array:
+        """Distinct tokens of the batch."""
+        return self._encoded.dictionary
+
+    @cached_property
+    def ids(self) -> np.ndarray:
+        """Index into :attr:`vocab` of every token."""
+        return self._encoded.indices.to_numpy().astype(np.int64)
+
+
+def len_ratios(src: TokenizedText, tgt: TokenizedText) -> list[float]:
+    """Vectorised :func:`_len_ratio` over two text columns."""
+    a, b = src.n_chars, tgt.n_chars
+    ratio = np.minimum(a, b) / np.maximum(np.maximum(a, b), 1)
+    return [round(r, 4) if r else 0.0 for r in ratio.tolist()]
+
+
+# ---------------------------------------------------------------------------
+# Detector registry
+# ---------------------------------------------------------------------------
+
+
+class WarningInputs:
+    """Everything a detector may read for one batch; derived values are computed once."""
+
+    def __init__(self, src: TokenizedText, tgt: TokenizedText, foreign_wordlist: set[str] | CompiledWordlist):
+        self.src = src
+        self.tgt = tgt
+        self.foreign_wordlist = foreign_wordlist
+
+    def __len__(self) -> int:
+        return len(self.src)
+
+    @cached_property
+    def python_only(self) -> np.ndarray:
+        """Rows where Arrow/RE2 Unicode handling may differ from Python's (exact per-row path)."""
+        return _match(self.src.text, _PYTHON_ONLY_RE2) | _match(self.tgt.text, _PYTHON_ONLY_RE2)
+
+    @cached_property
+    def long_tokens(self) -> tuple[np.ndarray, np.ndarray]:
+        """``(rows, vocab ids)`` of the target tokens of >= 3 characters."""
+        long_enough = self.tgt.token_lengths >= 3
+        return self.tgt.rows[long_enough], self.tgt.ids[long_enough]
+
+    @cached_property
+    def hashed_wordlist(self) -> CompiledWordlist:
+        """The foreign wordlist as sorted 64-bit token hashes."""
+        return _hashed_wordlist(self.foreign_wordlist)
+
+    @cached_property
+    def vocab_foreign(self) -> np.ndarray:
+        """Foreign-wordlist membership of every target vocabulary entry (one bulk hash + sorted search)."""
+        return self.hashed_wordlist.contains_many(self.tgt.vocab)
+
+
+@dataclass(frozen=True)
+class Detector:
+    """A quality warning: its label, batch function, cost class and default hard-filter state.
+
+    ``fn`` receives a :class:`WarningInputs` and returns one boolean per row.
+    ``default`` is whether :func:`apply_hard_filters` drops flagged rows unless
+    told otherwise.
+    """
+
+    name: str
+    fn: Callable[[WarningInputs], np.ndarray]
+    cost: str = "python"
+    default: bool = False
+
+
+# Registration order fixes the bit of every label in the ``uint32`` flags.
+DETECTORS: dict[str, Detector] = {}
+DETECTOR_COSTS: tuple[str, ...] = ("vectorised", "regex", "token", "python")
+_MAX_DETECTORS = 32
+
+
+def register_detector(
+    name: str,
+    fn: Callable[[WarningInputs], np.ndarray],
+    cost: str = "python",
+    default: bool = False,
+) -> Detector:
+    """Add a detector to :data:`DETECTORS` and give it the next free bit."""
+    global WARNING_LABELS, WARNING_BITS
+    if name in DETECTORS:
+        raise ValueError(f"Detector {name!r} is already registered.")
+    if cost not in DETECTOR_COSTS:
+        raise ValueError(f"Unknown cost class {cost!r}; expected one of {DETECTOR_COSTS}.")
+    if len(DETECTORS) >= _MAX_DETECTORS:
+        raise ValueError(f"At most {_MAX_DETECTORS} detectors fit in the uint32 flags.")
+    DETECTORS[name] = Detector(name, fn, cost, default)
+    WARNING_LABELS = tuple(DETECTORS)
+    WARNING_BITS = {label: 1 << i for i, label in enumerate(WARNING_LABELS)}
+    _LABEL_CACHE.clear()
+    return DETECTORS[name]
+
+
+def _detect_emoji(x: WarningInputs) -> np.ndarray:
+    return _match(x.tgt.text, _EMOJI_RE2)
+
+
+def _detect_dots_asymmetry(x: WarningInputs) -> np.ndarray:
+    return _edge_dots(x.src.stripped) != _edge_dots(x.tgt.stripped)
+
+
+def _detect_number_mismatch(x: WarningInputs) -> np.ndarray:
+    # Only rows with digits (or Python-only characters) can mismatch; those take the exact per-row path.
+    rows = np.flatnonzero(_match(x.src.text, _DIGIT_RE2) | _match(x.tgt.text, _DIGIT_RE2) | x.python_only)
+    src_list = x.src.text.take(pa.array(rows)).to_pylist()
+    tgt_list = x.tgt.text.take(pa.array(rows)).to_pylist()
+    mask = np.zeros(len(x), dtype=bool)
+    mask[rows] = [_has_number_mismatch(a, b) for a, b in zip(src_list, tgt_list)]
+    return mask
+
+
+def _detect_parenthesis_asymmetry(x: WarningInputs) -> np.ndarray:
+    return _match(x.src.text, _PARENS_RE2) & ~_match(x.tgt.text, _PARENS_RE2)
+
+
+def _detect_bullet_asymmetry(x: WarningInputs) -> np.ndarray:
+    return _leading_bullet(x.src.stripped) != _leading_bullet(x.tgt.stripped)
+
+
+def _detect_foreign_words(x: WarningInputs) -> np.ndarray:
+    rows, ids = x.long_tokens
+    mask = np.bincount(rows[x.vocab_foreign[ids]], minlength=len(x)) > 0
+    for i in np.flatnonzero(x.python_only):
+        mask[i] = _has_foreign_words(x.tgt.text[i].as_py(), x.hashed_wordlist)
+    return mask
+
+
+def _detect_terminal_punctuation(x: WarningInputs) -> np.ndarray:
+    spun = pc.count_substring_regex(x.src.text, _TERMINAL_PUNCT_RE2).to_numpy().astype(np.int64)
+    tpun = pc.count_substring_regex(x.tgt.text, _TERMINAL_PUNCT_RE2).to_numpy().astype(np.int64)
+    penalty = np.abs(spun - tpun) + np.maximum(spun - 1, 0) + np.maximum(tpun - 1, 0)
+    # -log(penalty + 1) < -2  <=>  penalty + 1 > e**2  <=>  penalty >= 7
+    return penalty >= 7
+
+
+register_detector("emoji", _detect_emoji, cost="regex", default=True)
+register_detector("dots_asymmetry", _detect_dots_asymmetry, cost="vectorised", default=True)
+register_detector("number_mismatch", _detect_number_mismatch, cost="python")
+register_detector("parenthesis_asymmetry", _detect_parenthesis_asymmetry, cost="regex")
+register_detector("bullet_asymmetry", _detect_bullet_asymmetry, cost="vectorised")
+register_detector("foreign_words", _detect_foreign_words, cost="token", default=True)
+register_detector("terminal_punctuation", _detect_terminal_punctuation, cost="regex")
+
+
+def _consistency_scores(x: WarningInputs) -> list[float]:
+    """``identification_consistency`` for every row (computed on the *set* of words of each row)."""
+    rows, ids = x.long_tokens
+    n_vocab = max(len(x.tgt.vocab), 1)
+    distinct = np.unique(rows * n_vocab + ids)
+    distinct_rows = distinct // n_vocab
+    n_words = np.bincount(distinct_rows, minlength=len(x))
+    n_foreign = np.bincount(distinct_rows[x.vocab_foreign[distinct % n_vocab]], minlength=len(x))
+    consistency = [
+        round((w - f) / w, 4) if w >= 2 else 0.0 for w, f in zip(n_words.tolist(), n_foreign.tolist())
+    ]
+
+    # Exact per-row path where Arrow/RE2 Unicode handling may differ from Python's.
+    per_row = x.python_only
+    if _HAS_DATATROVE and _DT_WORD_PUNCT_RE2:
+        per_row = per_row | _match(x.tgt.text, _DT_WORD_PUNCT_RE2)
+    for i in np.flatnonzero(per_row):
+        consistency[i] = _lang_consistency_score(x.tgt.text[i].as_py(), x.hashed_wordlist)
+    return consistency
+
+
+# ---------------------------------------------------------------------------
+# Detector statistics
+# ---------------------------------------------------------------------------
+
+
+class DetectorStats:
+    """Wall time, rows seen and rows flagged per detector.
+
+    Counters live in shared memory created before ``dataset.map`` forks its
+    workers (see :func:`map_warnings`), so parallel runs report totals too.
+    """
+
+    def __init__(self):
+        self._values = None
+
+    def reset(self) -> None:
+        if self._values is None:
+            self._values = mp.Array("d", _MAX_DETECTORS * 3)
+        with self._values.get_lock():
+            self._values[:] = [0.0] * len(self._values)
+
+    def record(self, name: str, seconds: float, rows: int, hits: int) -> None:
+        if self._values is None:
+            self.reset()
+        slot = 3 * list(DETECTORS).index(name)
+        with self._values.get_lock():
+            self._values[slot] += seconds
+            self._values[slot + 1] += rows
+            self._values[slot + 2] += hits
+
+    def snapshot(self) -> dict[str, dict[str, float]]:
+        """Return ``{name: {seconds, rows, hits, rows_per_sec, hit_rate}}`` for detectors that ran."""
+        values = list(self._values) if self._values is not None else []
+        out = {}
+        for i, name in enumerate(DETECTORS):
+            if 3 * i >= len(values) or not values[3 * i + 1]:
+                continue
+            seconds, rows, hits = values[3 * i : 3 * i + 3]
+            out[name] = {
+                "seconds": seconds,
+                "rows": int(rows),
+                "hits": int(hits),
+                "rows_per_sec": rows / seconds if seconds else float("inf"),
+                "hit_rate": hits / rows,
+            }
+        return out
+
+    def report(self) -> None:
+        stats = self.snapshot()
+        if not stats:
+            return
+        print("\nDetector cost and hit rate:")
+        print(f"  {'detector':<24}{'cost':<12}{'time':>9}{'rows/s':>14}{'hit rate':>10}")
+        for name, s in stats.items():
+            print(
+                f"  {name:<24}{DETECTORS[name].cost:<12}{s['seconds']:>8.2f}s"
+                f"{s['rows_per_sec']:>14,.0f}{100 * s['hit_rate']:>9.2f}%"
+            )
+
+
+DETECTOR_STATS = DetectorStats()
+
+# Flag counts and score means/quantiles, accumulated batch by batch by map_warnings.
+WARNING_STATS = StreamingStats(scores=("identification_consistency", "len_ratio"))
+
+
+def compute_warnings(
+    src_texts,
+    tgt_texts,
+    foreign_wordlist: set[str] | CompiledWordlist,
+    detectors: Iterable[str] | None = None,
+) -> tuple[np.ndarray, list[float]]:
+    """Compute quality warnings for whole columns at once.
+
+    Each registered :class:`Detector` runs over the full batch: regex detectors
+    as Arrow (RE2) string kernels, token detectors on the target's shared
+    :class:`TokenizedText` stage.  Only rows that need it fall back to the
+    per-row detectors: number mismatch for rows containing digits, and the token
+    detectors for rows with characters whose Unicode handling differs between
+    Python and RE2.  Time and hits of every detector go to :data:`DETECTOR_STATS`.
+
+    Args:
+        src_texts:        Source strings (list, Arrow array or :class:`TokenizedText`;
+                          ``None`` counts as ``""``).
+        tgt_texts:        Target strings.
+        foreign_wordlist: Set (or compiled wordlist) of foreign tokens to check against.
+        detectors:        Names of the detectors to run (default: all registered).
+
+    Returns:
+        ``(flags, consistency)`` — a ``uint32`` bit-flag array (see
+        :data:`WARNING_BITS`) and the ``identification_consistency`` scores.
+        ``flags_to_labels(flags)`` gives the exact ``quality_warnings`` lists of
+        the per-row detectors.
+    """
+    src = src_texts if isinstance(src_texts, TokenizedText) else TokenizedText(src_texts)
+    tgt = tgt_texts if isinstance(tgt_texts, TokenizedText) else TokenizedText(tgt_texts)
+    n = len(src)
+    flags = np.zeros(n, dtype=np.uint32)
+    if n == 0:
+        return flags, []
+
+    inputs = WarningInputs(src, tgt, foreign_wordlist)
+    for name in DETECTORS if detectors is None else detectors:
+        detector = DETECTORS[name]
+        start = time.perf_counter()
+        mask = detector.fn(inputs)
+        DETECTOR_STATS.record(name, time.perf_counter() - start, n, int(np.count_nonzero(mask)))
+        flags[mask] |= np.uint32(WARNING_BITS[name])
+
+    return flags, _consistency_scores(inputs)
+
+
+def flags_to_labels(flags: np.ndarray) -> list[list[str]]:
+    """Expand bit flags into ``quality_warnings`` label lists (in :data:`WARNING_LABELS` order)."""
+    labels = []
+    for value in flags.tolist():
+        cached = _LABEL_CACHE.get(value)
+        if cached is None:
+            cached = _LABEL_CACHE[value] = [lab for i, lab in enumerate(WARNING_LABELS) if value >> i & 1]
+        labels.append(list(cached))
+    return labels
+
+
+# ---------------------------------------------------------------------------
+# Bitmask warning column
+# ---------------------------------------------------------------------------
+
+# ``quality_flags`` is the compact form of ``quality_warnings``: one uint32 per
+# row whose bit ``i`` is ``WARNING_LABELS[i]``.  Bits follow registration order,
+# so new built-in detectors must be appended to keep stored flags readable.
+QUALITY_FLAGS_COL = "quality_flags"
+QUALITY_WARNINGS_COL = "quality_warnings"
+
+
+def labels_to_flags(labels: Iterable[list[str] | None]) -> np.ndarray:
+    """Encode ``quality_warnings`` label lists as ``uint32`` flags (unknown labels raise ``KeyError``)."""
+    return np.fromiter(
+        (sum(WARNING_BITS[label] for label in set(row or ())) for row in labels), dtype=np.uint32
+    )
+
+
+def flags_mask(flags: np.ndarray, labels: Iterable[str]) -> np.ndarray:
+    """Rows whose *flags* carry any of *labels*."""
+    bits = np.uint32(sum(WARNING_BITS[label] for label in set(labels)))
+    return (flags & bits) != 0
+
+
+def read_flags(dataset) -> np.ndarray | None:
+    """Warning flags of *dataset*: its ``quality_flags`` column, else encoded from ``quality_warnings``."""
+    columns = dataset.column_names
+    if QUALITY_FLAGS_COL in columns:
+        column = dataset.with_format("arrow")[QUALITY_FLAGS_COL]
+        return pc.fill_null(column, 0).to_numpy().astype(np.uint32)
+    if QUALITY_WARNINGS_COL in columns:
+        warnings = dataset.with_format("arrow")[QUALITY_WARNINGS_COL]
+        index = pc.index_in(pc.list_flatten(warnings), value_set=pa.array(WARNING_LABELS, type=pa.string()))
+        known = _bool(pc.is_valid(index))
+        bits = np.left_shift(np.uint32(1), index.to_numpy(zero_copy_only=False)[known].astype(np.uint32))
+        flags = np.zeros(len(warnings), dtype=np.uint32)
+        np.bitwise_or.at(flags, pc.list_parent_indices(warnings).to_numpy()[known], bits)
+        return flags
+    return None
+
+
+def warning_counts(flags: np.ndarray) -> dict[str, int]:
+    """Rows flagged per label (labels with no hits omitted), most frequent first."""
+    counts = {
+        label: int(np.count_nonzero(flags & np.uint32(bit))) for label, bit in WARNING_BITS.items()
+    }
+    return dict(sorted(((k, v) for k, v in counts.items() if v), key=lambda kv: -kv[1]))
+
+
+def with_warning_labels(dataset, batch_size: int = 10_000):
+    """Compatibility view: add the ``quality_warnings`` label lists decoded from ``quality_flags``."""
+    return dataset.map(
+        lambda batch: {QUALITY_WARNINGS_COL: flags_to_labels(np.asarray(batch[QUALITY_FLAGS_COL], np.uint32))},
+        batched=True,
+        batch_size=batch_size,
+        desc="warning labels",
+    )
+
+
 # ---------------------------------------------------------------------------
 # Annotation: add warning columns to a batch
 # ---------------------------------------------------------------------------
@@ -237,13 +764,18 @@ def _has_foreign_words(text: str, wordlist: set[str]) -> bool:
 
 def annotate_warnings(
     batch: dict[str, list],
-    foreign_wordlist: set[str],
+    foreign_wordlist: set[str] | CompiledWordlist,
     src_col: str = _COL_ENG,
     tgt_col: str = _COL_MOS,
+    len_ratio: bool = False,
+    detectors: Iterable[str] | None = None,
+    labels: bool = True,
 ) -> dict[str, list]:
-    """Add ``quality_warnings`` and ``identification_consistency`` columns.
+    """Add ``quality_flags``, ``quality_warnings`` and ``identification_consistency`` columns.
 
-    ``quality_warnings`` is a ``list[str]`` of active warning labels per row:
+    ``quality_flags`` is a ``uint32`` bitmask of active warnings (see
+    :data:`WARNING_BITS`).  ``quality_warnings`` is the same information as a
+    ``list[str]`` of labels per row:
       ``"emoji"``, ``"dots_asymmetry"``, ``"number_mismatch"``,
       ``"parenthesis_asymmetry"``, ``"bullet_asymmetry"``, ``"foreign_words"``,
       ``"terminal_punctuation"``
@@ -256,42 +788,151 @@ def annotate_warnings(
         foreign_wordlist: Set of foreign tokens to check against.
         src_col:          Column name for the source text (default: ``"eng_Latn"``).
         tgt_col:          Column name for the target text (default: ``"mos_Latn"``).
+        len_ratio:        Also add ``len_ratio`` from the same text stage.
+        detectors:        Detector names to run (default: all in :data:`DETECTORS`).
+        labels:           Also add the ``quality_warnings`` label lists.  Without
+                          them, :func:`with_warning_labels` decodes them on demand.
     """
-    src_texts = batch[src_col]
-    tgt_texts = batch[tgt_col]
-    n = len(src_texts)
-
-    quality_warnings = []
-    id_consistency = []
-
-    for i in range(n):
-        src = src_texts[i] or ""
-        tgt = tgt_texts[i] or ""
-
-        warnings: list[str] = []
-        if _has_emoji(tgt):
-            warnings.append("emoji")
-        if _has_dots_asymmetry(src, tgt):
-            warnings.append("dots_asymmetry")
-        if _has_number_mismatch(src, tgt):
-            warnings.append("number_mismatch")
-        if _has_parenthesis_asymmetry(src, tgt):
-            warnings.append("parenthesis_asymmetry")
-        if _has_bullet_asymmetry(src, tgt):
-            warnings.append("bullet_asymmetry")
-        if _has_foreign_words(tgt, foreign_wordlist):
-            warnings.append("foreign_words")
-        if _terminal_punctuation_score(src, tgt) < -2:
-            warnings.append("terminal_punctuation")
-
-        quality_warnings.append(warnings)
-        id_consistency.append(_lang_consistency_score(tgt, foreign_wordlist))
-
-    batch["quality_warnings"] = quality_warnings
+    src, tgt = TokenizedText(batch[src_col]), TokenizedText(batch[tgt_col])
+    flags, id_consistency = compute_warnings(src, tgt, foreign_wordlist, detectors)
+
+    batch[QUALITY_FLAGS_COL] = flags
+    if labels:
+        batch[QUALITY_WARNINGS_COL] = flags_to_labels(flags)
     batch["identification_consistency"] = id_consistency
+    if len_ratio:
+        batch["len_ratio"] = len_ratios(src, tgt)
+    return batch
+
+
+# ---------------------------------------------------------------------------
+# Multi-process annotation
+# ---------------------------------------------------------------------------
+
+# The wordlist is published here by the parent before ``dataset.map`` forks its
+# workers, which inherit it copy-on-write instead of unpickling a copy each.
+_SHARED_WORDLIST: set[str] | CompiledWordlist = set()
+_SHARED_WORDLIST_KEY = ""
+
+
+def _wordlist_key(wordlist: set[str] | CompiledWordlist) -> str:
+    """Content hash of *wordlist*; also keeps the ``dataset.map`` cache fingerprint honest."""
+    if isinstance(wordlist, CompiledWordlist):
+        data = np.ascontiguousarray(wordlist.hashes).tobytes()
+    else:
+        data = "\n".join(sorted(wordlist)).encode("utf-8")
+    return hashlib.sha1(data).hexdigest()
+
+
+def share_wordlist(wordlist: set[str] | CompiledWordlist) -> str:
+    """Publish *wordlist* to worker processes forked after this call and return its key."""
+    global _SHARED_WORDLIST, _SHARED_WORDLIST_KEY
+    _SHARED_WORDLIST = wordlist
+    _SHARED_WORDLIST_KEY = _wordlist_key(wordlist)
+    if wordlist:
+        _hashed_wordlist(wordlist)  # hash a plain set once, before forking
+    return _SHARED_WORDLIST_KEY
+
+
+def annotate_warnings_shared(
+    batch: dict[str, list],
+    wordlist_key: str,
+    src_col: str = _COL_ENG,
+    tgt_col: str = _COL_MOS,
+    len_ratio: bool = False,
+    detectors: list[str] | None = None,
+    labels: bool = True,
+) -> dict[str, list]:
+    """:func:`annotate_warnings` against the wordlist published by :func:`share_wordlist`.
+
+    The batch's flags, ``identification_consistency`` and ``len_ratio`` (computed
+    here or already present) are added to :data:`WARNING_STATS`.
+    """
+    if wordlist_key != _SHARED_WORDLIST_KEY:
+        raise RuntimeError(
+            "Shared wordlist not found in this process: num_proc > 1 requires the 'fork' start method."
+        )
+    batch = annotate_warnings(
+        batch,
+        _SHARED_WORDLIST,
+        src_col=src_col,
+        tgt_col=tgt_col,
+        len_ratio=len_ratio,
+        detectors=detectors,
+        labels=labels,
+    )
+    WARNING_STATS.update(
+        flags=batch[QUALITY_FLAGS_COL],
+        identification_consistency=batch["identification_consistency"],
+        len_ratio=batch.get("len_ratio"),
+    )
     return batch
 
 
+def map_warnings(
+    dataset,
+    foreign_wordlist: set[str] | CompiledWordlist,
+    src_col: str = _COL_ENG,
+    tgt_col: str = _COL_MOS,
+    batch_size: int = 1000,
+    num_proc: int = 1,
+    len_ratio: bool = False,
+    detectors: Iterable[str] | None = None,
+    labels: bool = True,
+    **map_kwargs,
+):
+    """Run :func:`annotate_warnings` over *dataset*, in *num_proc* forked workers when > 1.
+
+    Row order and values are identical to the serial path.  With *len_ratio* the
+    ``len_ratio`` column is added in the same pass.  *detectors* restricts the
+    warnings computed (default: all registered).  With ``labels=False`` only the
+    compact ``quality_flags`` column is stored.  Per-detector cost and hit
+    rates are printed at the end; warning counts and score summaries are left
+    in :data:`WARNING_STATS` (see :func:`report_warning_stats`).
+    """
+    if detectors is not None:
+        unknown = sorted(set(detectors) - set(DETECTORS))
+        if unknown:
+            raise ValueError(f"Unknown detector(s) {unknown}; registered: {list(DETECTORS)}.")
+        detectors = list(detectors)
+    key = share_wordlist(foreign_wordlist)
+    DETECTOR_STATS.reset()  # shared counters must exist before the workers fork
+    WARNING_STATS.reset()
+    dataset = dataset.map(
+        annotate_warnings_shared,
+        batched=True,
+        batch_size=batch_size,
+        fn_kwargs={
+            "wordlist_key": key,
+            "src_col": src_col,
+            "tgt_col": tgt_col,
+            "len_ratio": len_ratio,
+            "detectors": detectors,
+            "labels": labels,
+        },
+        num_proc=num_proc if num_proc > 1 else None,
+        **map_kwargs,
+    )
+    DETECTOR_STATS.report()
+    return dataset
+
+
+def report_warning_stats(stats: dict | None = None) -> None:
+    """Print warning counts and score summaries from a :data:`WARNING_STATS` snapshot."""
+    stats = WARNING_STATS.snapshot(WARNING_LABELS) if stats is None else stats
+    n_total = stats["rows"]
+    if not n_total:
+        return
+    print(f"  quality_warnings (any): {stats['any']:,} ({100 * stats['any'] / n_total:.1f}%)")
+    for label, cnt in sorted(stats["labels"].items(), key=lambda kv: -kv[1]):
+        if cnt:
+            print(f"    {label}: {cnt:,} ({100 * cnt / n_total:.1f}%)")
+    for name, score in stats["scores"].items():
+        q = score["quantiles"]
+        spread = ", ".join(f"p{round(100 * k)} {v:.2f}" for k, v in q.items())
+        print(f"  {name} (mean): {score['mean']:.3f}  [{spread}]")
+
+
 def annotate_len_ratio(
     batch: dict[str, list],
     src_col: str = _COL_ENG,
@@ -307,11 +948,7 @@ def annotate_len_ratio(
         src_col: Column name for the source text (default: ``"eng_Latn"``).
         tgt_col: Column name for the target text (default: ``"mos_Latn"``).
     """
-    src_texts = batch[src_col]
-    tgt_texts = batch[tgt_col]
-    batch["len_ratio"] = [
-        _len_ratio(src or "", tgt or "") for src, tgt in zip(src_texts, tgt_texts)
-    ]
+    batch["len_ratio"] = len_ratios(TokenizedText(batch[src_col]), TokenizedText(batch[tgt_col]))
     return batch
 
     return batch
@@ -322,6 +959,34 @@ def annotate_len_ratio(
 # ---------------------------------------------------------------------------
 
 
+def default_warning_filters(**overrides: bool) -> list[str]:
+    """Warning labels that drop a row: each detector's ``default`` unless overridden by label."""
+    return [name for name, d in DETECTORS.items() if overrides.get(name, d.default)]
+
+
+def label_equals(dataset, name: str, value: str) -> np.ndarray:
+    """Boolean mask of rows whose label column *name* equals *value*.
+
+    *name* may hold plain strings, Arrow dictionary-encoded strings or
+    ``ClassLabel`` codes (``glotlid --categorical``); codes are compared as
+    integers without decoding.  Nulls, a missing column and a label outside the
+    ``ClassLabel`` vocabulary give ``False``.
+    """
+    from datasets import ClassLabel
+
+    if name not in dataset.column_names:
+        return np.zeros(len(dataset), dtype=bool)
+    column = dataset.with_format("arrow")[name]
+    feature = dataset.features[name]
+    if isinstance(feature, ClassLabel):
+        if value not in feature.names:
+            return np.zeros(len(dataset), dtype=bool)
+        return _bool(pc.fill_null(pc.equal(column, feature.str2int(value)), False))
+    if pa.types.is_dictionary(column.type):
+        column = pc.cast(column, column.type.value_type)
+    return _bool(pc.fill_null(pc.equal(column, value), False))
+
+
 def apply_hard_filters(
     dataset,
     lid_threshold: float = 0.9,
@@ -334,6 +999,8 @@ def apply_hard_filters(
     filter_number_mismatch: bool = False,
     consistency_threshold: float = 0.0,
     len_ratio_threshold: float = 0.0,
+    code_switch_threshold: float = 1.0,
+    warning_filters: Iterable[str] | None = None,
 ):
     """Remove rows that fail any hard quality criterion.
 
@@ -355,92 +1022,82 @@ def apply_hard_filters(
                                   this filter.
         len_ratio_threshold:      Minimum length ratio min(len(src), len(tgt)) /
                                   max(len(src), len(tgt)).  0.0 disables this filter.
+        code_switch_threshold:    Maximum ``target_code_switch_ratio`` (share of Mooré
+                                  windows labelled with another language).  1.0 disables
+                                  this filter.
+        warning_filters:          Warning labels that drop a row.  Overrides the
+                                  ``filter_*`` flags; by default each :class:`Detector`'s
+                                  ``default`` applies, with the flags above taking precedence.
 
     Returns:
         Filtered HF Dataset.
     """
     before = len(dataset)
-    stats: dict[str, int] = {}
+    table = dataset.with_format("arrow")
+    columns = set(dataset.column_names)
 
-    def _track(ds, name: str, condition):
-        nonlocal stats
-        after = ds.filter(condition, desc=f"filter:{name}")
-        stats[name] = len(ds) - len(after)
-        return after
+    def _at_least(name: str, threshold: float) -> np.ndarray:
+        return _bool(pc.fill_null(pc.greater_equal(table[name], threshold), False))
 
-    # --- numeric thresholds ---
-    if _COL_TARGET_LID in dataset.column_names:
-        dataset = _track(
-            dataset,
-            "target_lid",
-            lambda r: r[_COL_TARGET_LID] is not None and r[_COL_TARGET_LID] >= lid_threshold,
-        )
+    # Every active criterion becomes one boolean "keep" mask over the Arrow columns.
+    criteria: dict[str, np.ndarray] = {}
 
-    if _COL_TARGET_GLOTLID_PROB in dataset.column_names:
-        dataset = _track(
-            dataset,
-            "target_glotlid",
-            lambda r: (
-                r[_COL_TARGET_GLOTLID_PROB] is not None
-                and r[_COL_TARGET_GLOTLID_PROB] >= glotlid_threshold
-                and r.get(_COL_TARGET_GLOTLID_LANG) == _EXPECTED_TARGET_LANG
-            ),
-        )
+    # --- numeric thresholds ---
+    if _COL_TARGET_LID in columns:
+        criteria["target_lid"] = _at_least(_COL_TARGET_LID, lid_threshold)
 
-    if _COL_SOURCE_GLOTLID_PROB in dataset.column_names:
-        dataset = _track(
-            dataset,
-            "source_glotlid",
-            lambda r: (
-                r[_COL_SOURCE_GLOTLID_PROB] is not None
-                and r[_COL_SOURCE_GLOTLID_PROB] >= glotlid_threshold
-                and r.get(_COL_SOURCE_GLOTLID_LANG) == _EXPECTED_SOURCE_LANG
-            ),
+    if _COL_TARGET_GLOTLID_PROB in columns:
+        criteria["target_glotlid"] = _at_least(_COL_TARGET_GLOTLID_PROB, glotlid_threshold) & label_equals(
+            dataset, _COL_TARGET_GLOTLID_LANG, _EXPECTED_TARGET_LANG
         )
 
-    if _COL_COMET_QE in dataset.column_names:
-        dataset = _track(
-            dataset,
-            "comet_qe_en_mos",
-            lambda r: r[_COL_COMET_QE] is not None and r[_COL_COMET_QE] >= comet_threshold,
+    if _COL_SOURCE_GLOTLID_PROB in columns:
+        criteria["source_glotlid"] = _at_least(_COL_SOURCE_GLOTLID_PROB, glotlid_threshold) & label_equals(
+            dataset, _COL_SOURCE_GLOTLID_LANG, _EXPECTED_SOURCE_LANG
         )
 
-    # --- warning-based hard filters (check quality_warnings list) ---
-    qw_col = "quality_warnings"
-    if qw_col in dataset.column_names:
-        active: list[str] = []
-        if filter_emoji:
-            active.append("emoji")
-        if filter_dots:
-            active.append("dots_asymmetry")
-        if filter_foreign_words:
-            active.append("foreign_words")
-        if filter_parenthesis:
-            active.append("parenthesis_asymmetry")
-        if filter_number_mismatch:
-            active.append("number_mismatch")
+    if _COL_COMET_QE in columns:
+        criteria["comet_qe_en_mos"] = _at_least(_COL_COMET_QE, comet_threshold)
+
+    # --- warning-based hard filters (bitwise over quality_flags) ---
+    if QUALITY_FLAGS_COL in columns or QUALITY_WARNINGS_COL in columns:
+        if warning_filters is None:
+            overrides = {
+                "emoji": filter_emoji,
+                "dots_asymmetry": filter_dots,
+                "foreign_words": filter_foreign_words,
+                "parenthesis_asymmetry": filter_parenthesis,
+                "number_mismatch": filter_number_mismatch,
+            }
+            active = default_warning_filters(**overrides)
+        else:
+            active = list(warning_filters)
         if active:
-            active_set = frozenset(active)
-            dataset = _track(
-                dataset,
-                "quality_warnings",
-                lambda r: not bool(active_set & set(r[qw_col] or [])),
-            )
+            criteria["quality_warnings"] = ~flags_mask(read_flags(dataset), active)
 
-    if consistency_threshold > 0.0 and "identification_consistency" in dataset.column_names:
-        dataset = _track(
-            dataset,
-            "identification_consistency",
-            lambda r: (r["identification_consistency"] or 0.0) >= consistency_threshold,
+    if consistency_threshold > 0.0 and "identification_consistency" in columns:
+        criteria["identification_consistency"] = _at_least(
+            "identification_consistency", consistency_threshold
         )
 
-    if len_ratio_threshold > 0.0 and "len_ratio" in dataset.column_names:
-        dataset = _track(
-            dataset,
-            "len_ratio",
-            lambda r: (r["len_ratio"] or 0.0) >= len_ratio_threshold,
+    if len_ratio_threshold > 0.0 and "len_ratio" in columns:
+        criteria["len_ratio"] = _at_least("len_ratio", len_ratio_threshold)
+
+    if code_switch_threshold < 1.0 and _COL_TARGET_CODE_SWITCH in columns:
+        criteria["code_switch"] = _bool(
+            pc.fill_null(pc.less_equal(table[_COL_TARGET_CODE_SWITCH], code_switch_threshold), False)
         )
 
+    # Drop counts are attributed in criterion order, as if the filters ran one after another.
+    keep = np.ones(before, dtype=bool)
+    stats: dict[str, int] = {}
+    for name, passed in criteria.items():
+        stats[name] = int(np.count_nonzero(keep & ~passed))
+        keep &= passed
+
+    if not keep.all():
+        dataset = dataset.select(np.flatnonzero(keep))
+
     after = len(dataset)
     print(f"\nFiltering summary ({before:,} → {after:,} rows kept, {before - after:,} dropped):")
     for name, dropped in stats.items():
@@ -468,9 +1125,15 @@ def filter_nllb(
     filter_number_mismatch: bool = False,
     consistency_threshold: float = 0.0,
     len_ratio_threshold: float = 0.0,
+    code_switch_threshold: float = 1.0,
+    ortho_gate: bool = False,
     load_wordlists: bool = True,
     batch_size: int = 1000,
     private: bool = False,
+    near_dedup: bool = False,
+    num_proc: int = 1,
+    detectors: list[str] | None = None,
+    warning_labels: bool = False,
 ) -> None:
     """Full annotation + filtering pipeline for the NLLB eng↔mos dataset.
 
@@ -491,9 +1154,18 @@ def filter_nllb(
         consistency_threshold:    Minimum ``identification_consistency`` score. 0.0 disables.
         len_ratio_threshold:      Minimum length ratio min(len(src), len(tgt)) /
                                   max(len(src), len(tgt)). 0.0 disables.
+        code_switch_threshold:    Maximum ``target_code_switch_ratio``. 1.0 disables.
+        ortho_gate:               Drop rows whose Mooré side is clearly not Mooré
+                                  (:func:`moore_web.orthography.gate`) before any other step.
         load_wordlists:           Whether to load GlotLID wordlists.
         batch_size:               Rows per batch for dataset.map.
         private:                  Whether to make the HF Hub dataset private.
+        near_dedup:               Add a ``near_dup_cluster`` column (MinHash-LSH over both
+                                  sides) and keep only the first surviving row per cluster.
+        num_proc:                 Worker processes for warning annotation and near-duplicate hashing.
+        detectors:                Warning detectors to compute (default: all registered).
+        warning_labels:           Also write the ``quality_warnings`` label lists next to
+                                  the compact ``quality_flags`` bitmask.
     """
     from datasets import load_dataset
 
@@ -501,44 +1173,46 @@ def filter_nllb(
     ds = load_dataset(source_repo, split="train")
     print(f"Loaded {len(ds):,} rows.")
 
+    if ortho_gate:
+        from moore_web.orthography import gate, report_savings
+
+        table = ds.with_format("arrow")
+        reasons = gate(table[_COL_ENG], table[_COL_MOS])
+        # GlotLID / COMET-QE columns are computed upstream, so only the rejected rows are reported.
+        report_savings(reasons)
+        ds = ds.select(np.flatnonzero(reasons == 0))
+
     # Load wordlists
-    foreign_wordlist: set[str] = set()
+    foreign_wordlist: set[str] | CompiledWordlist = set()
     if load_wordlists:
         # NOTE: the GlotLID Mooré wordlist is very small (~1 000 discriminative n-grams),
         # so it cannot be used to positively identify Mooré words.  We use it only to
         # subtract any overlap from the foreign wordlist, avoiding false positives for
         # loanwords or short tokens shared between languages.
-        foreign_wordlist = build_foreign_wordlist()
+        foreign_wordlist = load_foreign_wordlist()
 
     # Annotate quality warnings
     print("Annotating quality warnings…")
-    ds = ds.map(
-        lambda batch: annotate_warnings(batch, foreign_wordlist),
-        batched=True,
+    ds = map_warnings(
+        ds,
+        foreign_wordlist,
         batch_size=batch_size,
+        num_proc=num_proc,
+        detectors=detectors,
+        labels=warning_labels,
         desc="annotate warnings",
         load_from_cache_file=False,
     )
 
-    # Print warning summary before filtering
-    n_total = len(ds)
-    print("\nWarning counts (before hard filtering):")
-    if "quality_warnings" in ds.column_names:
-        rows_with_warnings = sum(1 for w in ds["quality_warnings"] if w)
-        print(f"  quality_warnings (any): {rows_with_warnings:,} ({100 * rows_with_warnings / n_total:.1f}%)")
-        from collections import Counter
+    if near_dedup:
+        from moore_web.near_dedup import add_near_dup_clusters
 
-        label_counts: Counter = Counter(label for w in ds["quality_warnings"] for label in (w or []))
-        for label, cnt in label_counts.most_common():
-            print(f"    {label}: {cnt:,} ({100 * cnt / n_total:.1f}%)")
-    if "identification_consistency" in ds.column_names:
-        scores = ds["identification_consistency"]
-        mean_score = sum(scores) / len(scores) if scores else 0.0
-        print(f"  identification_consistency (mean): {mean_score:.3f}")
-    if "len_ratio" in ds.column_names:
-        ratios = ds["len_ratio"]
-        mean_ratio = sum(ratios) / len(ratios) if ratios else 0.0
-        print(f"  len_ratio (mean): {mean_ratio:.3f}")
+        print("Clustering near-duplicates…")
+        ds = add_near_dup_clusters(ds, _COL_ENG, _COL_MOS, num_proc=num_proc)
+
+    # Print warning summary before filtering (accumulated while annotating; no extra pass)
+    print("\nWarning counts (before hard filtering):")
+    report_warning_stats()
 
     # Apply hard filters
     ds = apply_hard_filters(
@@ -553,8 +1227,16 @@ def filter_nllb(
         filter_number_mismatch=filter_number_mismatch,
         consistency_threshold=consistency_threshold,
         len_ratio_threshold=len_ratio_threshold,
+        code_switch_threshold=code_switch_threshold,
     )
 
+    if near_dedup:
+        from moore_web.near_dedup import DEFAULT_COLUMN, first_of_cluster
+
+        n_before = len(ds)
+        ds = ds.select(first_of_cluster(np.asarray(ds[DEFAULT_COLUMN])))
+        print(f"  near_duplicates: dropped {n_before - len(ds):,}")
+
     # Write local output
     if output:
         import json
@@ -580,12 +1262,28 @@ def filter_nllb(
 # ---------------------------------------------------------------------------
 
 
+class _ListDetectors(argparse.Action):
+    def __init__(self, option_strings, dest, **kwargs):
+        super().__init__(option_strings, dest, nargs=0, default=argparse.SUPPRESS, **kwargs)
+
+    def __call__(self, parser, namespace, values, option_string=None):
+        print(f"{'detector':<24}{'cost':<12}hard filter by default")
+        for d in DETECTORS.values():
+            print(f"{d.name:<24}{d.cost:<12}{'yes' if d.default else 'no'}")
+        parser.exit()
+
+
 def _build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(
         description="Multi-dimensional NLLB eng↔mos filtering pipeline.",
         formatter_class=argparse.RawDescriptionHelpFormatter,
         epilog=__doc__,
     )
+    parser.add_argument(
+        "--list-detectors",
+        action=_ListDetectors,
+        help="List the registered quality-warning detectors and exit.",
+    )
     parser.add_argument(
         "--source-repo",
         required=True,
@@ -664,6 +1362,19 @@ def _build_parser() -> argparse.ArgumentParser:
         help="Minimum length ratio min(len(src), len(tgt)) / max(len(src), len(tgt)). "
         "0.0 disables this filter (default: %(default)s).",
     )
+    parser.add_argument(
+        "--code-switch-threshold",
+        type=float,
+        default=1.0,
+        help="Maximum target_code_switch_ratio (share of Mooré windows labelled with another "
+        "language, see moore_web.code_switch). 1.0 disables this filter (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--ortho-gate",
+        action="store_true",
+        help="Drop rows whose Mooré side is clearly English, French or non-Latin by character "
+        "and function-word profile before any other step, and report the rows rejected per reason.",
+    )
     parser.add_argument(
         "--no-push",
         dest="push",
@@ -682,6 +1393,30 @@ def _build_parser() -> argparse.ArgumentParser:
         default=1000,
         help="Rows per batch for dataset.map (default: %(default)s).",
     )
+    parser.add_argument(
+        "--near-dedup",
+        action="store_true",
+        help="Cluster MinHash-LSH near-duplicates and keep the first surviving row of each cluster.",
+    )
+    parser.add_argument(
+        "--num-proc",
+        type=int,
+        default=1,
+        help="Worker processes for warning annotation and near-duplicate hashing (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--detectors",
+        nargs="+",
+        default=None,
+        metavar="NAME",
+        help="Quality-warning detectors to compute (default: all; see --list-detectors).  "
+        "Skip costly, low-value checks on large datasets.",
+    )
+    parser.add_argument(
+        "--warning-labels",
+        action="store_true",
+        help="Also store quality_warnings label lists (default: only the quality_flags bitmask).",
+    )
     parser.add_argument("--private", action="store_true", help="Make the HF Hub dataset private.")
     return parser
 
@@ -705,9 +1440,15 @@ def main() -> None:
         filter_number_mismatch=args.filter_number_mismatch,
         consistency_threshold=args.consistency_threshold,
         len_ratio_threshold=args.len_ratio_threshold,
+        code_switch_threshold=args.code_switch_threshold,
+        ortho_gate=args.ortho_gate,
         load_wordlists=args.load_wordlists,
         batch_size=args.batch_size,
         private=args.private,
+        near_dedup=args.near_dedup,
+        num_proc=args.num_proc,
+        detectors=args.detectors,
+        warning_labels=args.warning_labels,
     )
 
 
@@ -5,50 +5,389 @@ Usage
     # Annotate a HF dataset and push to Hub
     uv run python -m moore_web.glotlid --source-repo madoss/nllb-mos-raw --hub-repo madoss/nllb-mos-lid
 
+    # Four forked workers sharing one loaded model
+    uv run python -m moore_web.glotlid --source-repo madoss/nllb-mos-raw --hub-repo madoss/nllb-mos-lid \\
+        --num-proc 4
+
     # Custom source/target columns
     uv run python -m moore_web.glotlid --source-repo madoss/nllb-mos-raw --hub-repo madoss/nllb-mos-lid \\
         --source-col eng_Latn --target-col mos_Latn
+
+Prediction cache
+----------------
+Texts are deduplicated before ``model.predict`` and results are kept in a
+SQLite cache keyed by (model revision, 64-bit text hash) under
+``$MOORE_WEB_CACHE/glotlid/`` (see :mod:`moore_web.cache`), so re-annotating an
+updated corpus only runs LID on texts not seen before.  Cached values are the
+stored ``(language, probability)`` pairs and identical to a fresh prediction.
+Pass ``--no-cache`` (or ``use_cache=False``) to bypass it.
+
+Categorical columns and top-k
+-----------------------------
+With ``--categorical`` the ``*_glotlid_lang`` columns are stored as
+``ClassLabel`` codes over the model's label vocabulary instead of repeating
+the label string on every row; :func:`decode_lid_columns` turns them back into
+strings.  ``--top-k K`` (K > 1) adds ``*_glotlid_topk_lang`` and
+``*_glotlid_topk_prob`` list columns with the K best labels per text, e.g. to
+spot French/Mooré confusion.  Top-k predictions bypass the prediction cache.
+
+    uv run python -m moore_web.glotlid --source-repo madoss/nllb-mos-raw --hub-repo madoss/nllb-mos-lid \\
+        --categorical --top-k 3
 """
 
 from __future__ import annotations
 
 import argparse
+import multiprocessing as mp
+import os
+import sqlite3
+import time
+from pathlib import Path
+
+import numpy as np
 from dotenv import load_dotenv
 import fasttext
-import pandas as pd
 from huggingface_hub import hf_hub_download
 
+from moore_web import lid
+from moore_web.cache import cache_root
+from moore_web.lid import Predictions
+from moore_web.text_hash import hash_texts
+
 load_dotenv()
 
 REPO_ID = "cis-lmu/glotlid"
 FILENAME = "model.bin"
+# Attribute set on loaded models: identifies the weights in the prediction cache.
+_REVISION_ATTR = "moore_web_revision"
+
+
+def _model_revision(repo_id: str, model_path: str) -> str:
+    """``repo@snapshot`` for Hub downloads, else ``repo@size-mtime`` of the model file."""
+    path = Path(model_path)
+    if path.parent.parent.name == "snapshots":
+        return f"{repo_id}@{path.parent.name}"
+    stat = path.stat()
+    return f"{repo_id}@{stat.st_size}-{int(stat.st_mtime)}"
 
 
 def load_model(repo_id: str = REPO_ID) -> fasttext.FastText._FastText:
-    """Download and load the GlotLID fasttext model from HuggingFace Hub."""
-    model_path = hf_hub_download(repo_id=repo_id, filename=FILENAME)
-    return fasttext.load_model(model_path)
+    """Load the GlotLID fasttext model.
 
+    The default repo resolves through :mod:`moore_web.model_registry` (no network
+    call once prefetched); other repos are downloaded from the HuggingFace Hub.
+    """
+    if repo_id == REPO_ID:
+        from moore_web import model_registry
 
-def predict(model: fasttext.FastText._FastText, texts: list[str], k: int = 1) -> tuple[pd.Series, pd.Series]:
-    """Return (predicted_language, predicted_probability) series for each text."""
-    # fasttext expects no newlines
-    cleaned = [t.replace("\n", " ") for t in texts]
-    labels, probs = model.predict(cleaned, k=k)
+        model_path = str(model_registry.resolve("glotlid"))
+        revision = f"{repo_id}@sha256:{model_registry.entry('glotlid')['sha256'][:16]}"
+    else:
+        model_path = hf_hub_download(repo_id=repo_id, filename=FILENAME)
+        revision = _model_revision(repo_id, model_path)
+    model = fasttext.load_model(model_path)
+    setattr(model, _REVISION_ATTR, revision)
+    return model
+
+
+# ---------------------------------------------------------------------------
+# Prediction cache
+# ---------------------------------------------------------------------------
+
+
+def default_cache_path() -> Path:
+    """SQLite file of the prediction cache under :func:`~moore_web.cache.cache_root`."""
+    return cache_root() / "glotlid" / "predictions.sqlite"
+
+
+class PredictionCache:
+    """Persistent ``(revision, text hash) → (language, probability)`` store.
+
+    The connection is opened lazily per process, so a cache created before
+    ``dataset.map`` forks its workers is safe to use from each of them.
+    """
+
+    _CHUNK = 500  # keys per ``IN (...)`` query, below SQLite's parameter limit
+
+    def __init__(self, revision: str, path: str | Path | None = None):
+        self.revision = revision
+        self.path = Path(path) if path is not None else default_cache_path()
+        self.hits = 0
+        self.misses = 0
+        self._conn = None
+        self._pid = None
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None or self._pid != os.getpid():
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, timeout=60)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS predictions ("
+                "revision TEXT, hash INTEGER, lang TEXT, prob REAL, PRIMARY KEY (revision, hash))"
+            )
+            self._pid = os.getpid()
+        return self._conn
+
+    def get_many(self, hashes: np.ndarray) -> dict[int, tuple[str, float]]:
+        """Return ``{hash: (lang, prob)}`` for the cached entries among the uint64 *hashes*."""
+        keys = hashes.astype(np.uint64).view(np.int64).tolist()
+        conn = self._connection()
+        found: dict[int, tuple[str, float]] = {}
+        for start in range(0, len(keys), self._CHUNK):
+            chunk = keys[start : start + self._CHUNK]
+            placeholders = ",".join("?" * len(chunk))
+            rows = conn.execute(
+                f"SELECT hash, lang, prob FROM predictions WHERE revision = ? AND hash IN ({placeholders})",
+                [self.revision, *chunk],
+            )
+            found.update((h, (lang, prob)) for h, lang, prob in rows)
+        self.hits += len(found)
+        self.misses += len(keys) - len(found)
+        return {int(np.int64(h).view(np.uint64)): v for h, v in found.items()}
+
+    def put_many(self, hashes: np.ndarray, langs: list[str], probs: list[float]) -> None:
+        """Store predictions for the uint64 *hashes*."""
+        keys = hashes.astype(np.uint64).view(np.int64).tolist()
+        conn = self._connection()
+        with conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO predictions VALUES (?, ?, ?, ?)",
+                [(self.revision, h, lang, prob) for h, lang, prob in zip(keys, langs, probs)],
+            )
+
+
+def prediction_cache(model, path: str | Path | None = None) -> PredictionCache | None:
+    """A :class:`PredictionCache` for *model*, or ``None`` when its revision is unknown."""
+    revision = getattr(model, _REVISION_ATTR, None)
+    return PredictionCache(revision, path) if revision else None
+
+
+class LIDStats:
+    """Text, cache and model-time counters in shared memory, summed over forked workers."""
+
+    _FIELDS = ("texts", "distinct", "cached", "predicted", "predict_seconds")
+
+    def __init__(self):
+        self._values = None
+
+    def reset(self) -> None:
+        if self._values is None:
+            self._values = mp.Array("d", len(self._FIELDS))
+        with self._values.get_lock():
+            self._values[:] = [0.0] * len(self._FIELDS)
+
+    def record(self, **counts: float) -> None:
+        if self._values is None:
+            self.reset()
+        with self._values.get_lock():
+            for name, value in counts.items():
+                self._values[self._FIELDS.index(name)] += value
+
+    def snapshot(self) -> dict[str, float]:
+        values = list(self._values) if self._values is not None else [0.0] * len(self._FIELDS)
+        return dict(zip(self._FIELDS, values))
+
+    def report(self, rows: int, seconds: float, num_proc: int = 1) -> None:
+        s = self.snapshot()
+        if not s["texts"]:
+            return
+        print(
+            f"GlotLID: {int(s['texts']):,} texts from {rows:,} rows in {seconds:.1f}s "
+            f"({s['texts'] / seconds if seconds else float('inf'):,.0f} texts/s, num_proc={num_proc})"
+        )
+        per_worker = s["predicted"] / s["predict_seconds"] if s["predict_seconds"] else float("inf")
+        print(
+            f"  distinct {int(s['distinct']):,} · cached {int(s['cached']):,} · predicted {int(s['predicted']):,}"
+            f" (model {s['predict_seconds']:.1f}s summed over workers, {per_worker:,.0f} texts/s per worker)"
+        )
+
+
+LID_STATS = LIDStats()
+
+
+# ---------------------------------------------------------------------------
+# Prediction
+# ---------------------------------------------------------------------------
+
+
+def _predict_top1(
+    model: fasttext.FastText._FastText, texts: list[str], k: int
+) -> tuple[list[str], list[float]]:
+    labels, probs = model.predict(texts, k=k)
     # labels are like ['__label__mos_Latn'], strip the prefix
-    langs = pd.Series([line[0].replace("__label__", "") for line in labels], name="predicted_language")
-    scores = pd.Series([round(float(p[0]), 4) for p in probs], name="predicted_probability")
-    return langs, scores
+    return [line[0].replace("__label__", "") for line in labels], [round(float(p[0]), 4) for p in probs]
+
 
+def predict(
+    model: fasttext.FastText._FastText,
+    texts: list[str],
+    k: int = 1,
+    cache: PredictionCache | None = None,
+) -> Predictions:
+    """Return the top-1 language and probability of each text as :class:`~moore_web.lid.Predictions`.
 
-def detect_for_texts(texts: list[str], model: fasttext.FastText._FastText | None = None) -> pd.DataFrame:
+    Each distinct text is predicted once; with *cache*, only texts missing from
+    it reach ``model.predict`` and their results are added to it.  Probabilities
+    are rounded to 4 decimals before being stored as ``float32``.
+    """
+    # fasttext expects no newlines
+    cleaned = [t.replace("\n", " ") for t in texts]
+    hashes = hash_texts(cleaned)
+    unique, first, inverse = np.unique(hashes, return_index=True, return_inverse=True)
+    langs: list[str] = [""] * len(unique)
+    scores = np.zeros(len(unique), dtype=np.float64)
+
+    cached = cache.get_many(unique) if cache is not None else {}
+    todo = []
+    for u, h in enumerate(unique.tolist()):
+        if h in cached:
+            langs[u], scores[u] = cached[h]
+        else:
+            todo.append(u)
+    if todo:
+        start = time.perf_counter()
+        new_langs, new_scores = _predict_top1(model, [cleaned[first[u]] for u in todo], k)
+        LID_STATS.record(predict_seconds=time.perf_counter() - start)
+        for u, lang in zip(todo, new_langs):
+            langs[u] = lang
+        scores[todo] = new_scores
+        if cache is not None:
+            cache.put_many(unique[todo], new_langs, new_scores)
+
+    LID_STATS.record(texts=len(texts), distinct=len(unique), cached=len(cached), predicted=len(todo))
+    distinct = Predictions.from_labels(langs, scores)
+    inverse = inverse.reshape(-1)
+    return Predictions(distinct.codes[inverse], distinct.probs[inverse], distinct.labels)
+
+
+def label_names(model: fasttext.FastText._FastText) -> list[str]:
+    """The model's label vocabulary without the ``__label__`` prefix, in model order."""
+    return [label.replace("__label__", "") for label in model.get_labels()]
+
+
+def predict_topk(
+    model: fasttext.FastText._FastText, texts: list[str], k: int
+) -> tuple[np.ndarray, np.ndarray]:
+    """Return the *k* best labels (object array) and probabilities (``float32``) per text, shape ``(n, k)``.
+
+    Each distinct text is predicted once; probabilities are rounded to 4 decimals.
+    """
+    cleaned = [t.replace("\n", " ") for t in texts]
+    _, first, inverse = np.unique(hash_texts(cleaned), return_index=True, return_inverse=True)
+    langs = np.full((len(first), k), "", dtype=object)
+    probs = np.zeros((len(first), k), dtype=np.float32)
+    if len(first):
+        start = time.perf_counter()
+        labels, scores = model.predict([cleaned[i] for i in first], k=k)
+        LID_STATS.record(predict_seconds=time.perf_counter() - start)
+        for u, (row_labels, row_scores) in enumerate(zip(labels, scores)):
+            langs[u, : len(row_labels)] = [label.replace("__label__", "") for label in row_labels]
+            probs[u, : len(row_scores)] = np.round(np.asarray(row_scores, dtype=np.float64), 4)
+    LID_STATS.record(texts=len(texts), distinct=len(first), predicted=len(first))
+    inverse = inverse.reshape(-1)
+    return langs[inverse], probs[inverse]
+
+
+def predict_in_pool(texts: list[str], use_cache: bool = True) -> Predictions:
+    """:class:`~moore_web.worker_pool.WorkerPool` task: :func:`predict` with the pool's ``glotlid`` model."""
+    from moore_web.worker_pool import model
+
+    glotlid_model = model("glotlid")
+    return predict(glotlid_model, texts, cache=prediction_cache(glotlid_model) if use_cache else None)
+
+
+def detect_for_texts(
+    texts: list[str],
+    model: fasttext.FastText._FastText | None = None,
+    cache: PredictionCache | None = None,
+):
     """Run lang ID on a flat list of strings. Returns a DataFrame with columns:
     text, predicted_language, predicted_probability.
     """
+    import pandas as pd
+
     if model is None:
         model = load_model()
-    langs, probs = predict(model, texts)
-    return pd.DataFrame({"text": texts, "predicted_language": langs, "predicted_probability": probs})
+    preds = predict(model, texts, cache=cache)
+    return pd.DataFrame(
+        {"text": texts, "predicted_language": preds.langs(), "predicted_probability": preds.prob_values(4)}
+    )
+
+
+# The model (and cache) are published here by the parent before ``dataset.map``
+# forks its workers, which inherit the ~1.6 GB model copy-on-write instead of
+# each loading or unpickling a copy.
+_SHARED_MODEL: fasttext.FastText._FastText | None = None
+_SHARED_CACHE: PredictionCache | None = None
+# Label → ClassLabel code when writing categorical columns, else None.
+_SHARED_LABEL_INDEX: dict[str, int] | None = None
+
+
+def _encode(langs: np.ndarray) -> list:
+    """Label strings as ClassLabel codes when categorical output is on, else as-is."""
+    if _SHARED_LABEL_INDEX is None:
+        return langs.tolist()
+    codes = np.fromiter(
+        (_SHARED_LABEL_INDEX[lang] for lang in langs.ravel()), dtype=np.int64, count=langs.size
+    )
+    return codes.reshape(langs.shape).tolist()
+
+
+def _annotate_batch_shared(
+    batch: dict[str, list], source_col: str, target_col: str, top_k: int = 1
+) -> dict[str, list]:
+    """Add the GlotLID columns to *batch* using the published model."""
+    for col in (source_col, target_col):
+        if top_k > 1:
+            langs, probs = predict_topk(_SHARED_MODEL, batch[col], top_k)
+            batch[f"{col}_glotlid_topk_lang"] = _encode(langs)
+            batch[f"{col}_glotlid_topk_prob"] = probs.tolist()
+            langs, probs = langs[:, 0], probs[:, 0]
+        else:
+            preds = predict(_SHARED_MODEL, batch[col], cache=_SHARED_CACHE)
+            langs, probs = preds.labels[preds.codes], preds.probs
+        batch[f"{col}_glotlid_lang"] = _encode(langs)
+        batch[f"{col}_glotlid_prob"] = np.round(probs.astype(np.float64), 4).tolist()
+    return batch
+
+
+def _output_features(dataset, columns: list[str], names: list[str] | None, top_k: int):
+    """Features of *dataset* plus the GlotLID columns (``ClassLabel`` labels when *names* is given)."""
+    from datasets import ClassLabel, Sequence, Value
+
+    features = dataset.features.copy()
+    lang = ClassLabel(names=names) if names is not None else Value("string")
+    for col in columns:
+        features[f"{col}_glotlid_lang"] = lang
+        features[f"{col}_glotlid_prob"] = Value("float64")
+        if top_k > 1:
+            features[f"{col}_glotlid_topk_lang"] = Sequence(lang)
+            features[f"{col}_glotlid_topk_prob"] = Sequence(Value("float32"))
+    return features
+
+
+def _decode_batch(batch: dict[str, list], column: str, feature, nested: bool) -> dict[str, list]:
+    values = batch[column]
+    return {column: [feature.int2str(row) for row in values] if nested else feature.int2str(values)}
+
+
+def decode_lid_columns(dataset):
+    """Return *dataset* with every ``ClassLabel`` column (or list of them) decoded to label strings."""
+    from datasets import ClassLabel, Sequence, Value
+
+    for name, feature in list(dataset.features.items()):
+        nested = isinstance(getattr(feature, "feature", None), ClassLabel)
+        if not nested and not isinstance(feature, ClassLabel):
+            continue
+        features = dataset.features.copy()
+        features[name] = Sequence(Value("string")) if nested else Value("string")
+        dataset = dataset.map(
+            _decode_batch,
+            batched=True,
+            fn_kwargs={"column": name, "feature": feature.feature if nested else feature, "nested": nested},
+            features=features,
+        )
+    return dataset
 
 
 def annotate_dataset(
@@ -57,62 +396,64 @@ def annotate_dataset(
     source_col: str = "eng_Latn",
     target_col: str = "mos_Latn",
     batch_size: int = 1000,
+    use_cache: bool = True,
+    num_proc: int = 1,
+    categorical: bool = False,
+    top_k: int = 1,
 ):
     """Add GlotLID predictions to a HuggingFace Dataset.
 
     Adds four new columns derived from the input column names:
       ``{source_col}_glotlid_lang``, ``{source_col}_glotlid_prob``,
       ``{target_col}_glotlid_lang``, ``{target_col}_glotlid_prob``.
+
+    With *categorical*, the ``*_lang`` columns are ``ClassLabel`` codes over
+    :func:`label_names` instead of strings.  With *top_k* > 1, each side also
+    gets ``*_glotlid_topk_lang`` / ``*_glotlid_topk_prob`` lists (best first);
+    these are predicted without the cache.
+    With *use_cache*, texts already in the prediction cache are not re-predicted.
+    With *num_proc* > 1, batches run in forked workers sharing the loaded model
+    (requires the ``fork`` start method); output is identical to the serial path.
+    A throughput report is printed at the end.
     """
+    global _SHARED_MODEL, _SHARED_CACHE, _SHARED_LABEL_INDEX
     if model is None:
         model = load_model()
-
-    src_lang_col = f"{source_col}_glotlid_lang"
-    src_prob_col = f"{source_col}_glotlid_prob"
-    tgt_lang_col = f"{target_col}_glotlid_lang"
-    tgt_prob_col = f"{target_col}_glotlid_prob"
-
-    def _batch_predict(batch):
-        src_langs, src_probs = predict(model, batch[source_col])
-        tgt_langs, tgt_probs = predict(model, batch[target_col])
-        batch[src_lang_col] = src_langs.tolist()
-        batch[src_prob_col] = src_probs.tolist()
-        batch[tgt_lang_col] = tgt_langs.tolist()
-        batch[tgt_prob_col] = tgt_probs.tolist()
-        return batch
-
-    return dataset.map(_batch_predict, batched=True, batch_size=batch_size, load_from_cache_file=False)
+    names = label_names(model) if categorical else None
+    _SHARED_MODEL = model
+    _SHARED_CACHE = prediction_cache(model) if use_cache and top_k <= 1 else None
+    _SHARED_LABEL_INDEX = {name: i for i, name in enumerate(names)} if names is not None else None
+
+    LID_STATS.reset()  # shared counters must exist before the workers fork
+    start = time.perf_counter()
+    dataset = dataset.map(
+        _annotate_batch_shared,
+        batched=True,
+        batch_size=batch_size,
+        fn_kwargs={"source_col": source_col, "target_col": target_col, "top_k": top_k},
+        features=_output_features(dataset, [source_col, target_col], names, top_k),
+        num_proc=num_proc if num_proc > 1 else None,
+        load_from_cache_file=False,
+    )
+    LID_STATS.report(len(dataset), time.perf_counter() - start, num_proc)
+    return dataset
 
 
-def annotate_text_units(entries: list[dict], model: fasttext.FastText._FastText | None = None) -> list[dict]:
+def annotate_text_units(
+    entries: list[dict],
+    model: fasttext.FastText._FastText | None = None,
+    use_cache: bool = True,
+) -> list[dict]:
     """Add text_unit_langs and text_unit_probs to each entry (debug fields).
 
     Only entries with more than one text unit are run through the model.
     Entries with a single or empty text_units list get None for both fields.
+    Repeated text units are predicted once; see :func:`predict` for *use_cache*.
     """
     if model is None:
         model = load_model()
-
-    indexed_texts = [
-        (i, text)
-        for i, item in enumerate(entries)
-        for text in item["text_units"]
-        if len(item["text_units"]) > 1
-    ]
-
-    if indexed_texts:
-        indices, texts = zip(*indexed_texts)
-        result = detect_for_texts(list(texts), model)
-        result["entry_index"] = list(indices)
-        for i, group in result.groupby("entry_index"):
-            entries[i]["text_unit_langs"] = group["predicted_language"].reset_index(drop=True).tolist()
-            entries[i]["text_unit_probs"] = group["predicted_probability"].reset_index(drop=True).tolist()
-
-    for item in entries:
-        item.setdefault("text_unit_langs", None)
-        item.setdefault("text_unit_probs", None)
-
-    return entries
+    cache = prediction_cache(model) if use_cache else None
+    return lid.annotate_text_units(entries, lambda texts: predict(model, texts, cache=cache), decimals=4)
 
 
 # ---------------------------------------------------------------------------
@@ -153,6 +494,28 @@ def cli() -> argparse.Namespace:
         help="Rows per batch for dataset.map (default: %(default)s).",
     )
     parser.add_argument("--private", action="store_true", help="Make the HF dataset private.")
+    parser.add_argument(
+        "--num-proc",
+        type=int,
+        default=1,
+        help="Forked worker processes sharing the loaded model (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Do not read or write the persistent prediction cache.",
+    )
+    parser.add_argument(
+        "--categorical",
+        action="store_true",
+        help="Store the *_glotlid_lang columns as ClassLabel codes instead of strings.",
+    )
+    parser.add_argument(
+        "--top-k",
+        type=int,
+        default=1,
+        help="Also store the K best labels and probabilities per text when K > 1 (default: %(default)s).",
+    )
     return parser.parse_args()
 
 
@@ -169,7 +532,15 @@ def main() -> None:
 
     print(f"Annotating {len(ds):,} rows…")
     ds = annotate_dataset(
-        ds, model=model, source_col=args.source_col, target_col=args.target_col, batch_size=args.batch_size
+        ds,
+        model=model,
+        source_col=args.source_col,
+        target_col=args.target_col,
+        batch_size=args.batch_size,
+        use_cache=not args.no_cache,
+        num_proc=args.num_proc,
+        categorical=args.categorical,
+        top_k=args.top_k,
     )
 
     print(f"Pushing to '{args.hub_repo}'…")
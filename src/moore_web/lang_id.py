@@ -1,37 +1,68 @@
 """Language identification using the MEAG LID model from HuggingFace."""
 
 import joblib
-import pandas as pd
+import numpy as np
 from huggingface_hub import hf_hub_download
 
+from moore_web import lid
+from moore_web.lid import Predictions
+
 REPO_ID = "JessicaOjo/meag_lid"
 FILENAME = "model/model.joblib"
 
 
 def load_model(repo_id: str = REPO_ID) -> dict:
-    """Download and load the NB model bundle from HuggingFace Hub."""
+    """Load the NB model bundle (default repo through :mod:`moore_web.model_registry`)."""
+    if repo_id == REPO_ID:
+        from moore_web.model_registry import resolve
+
+        return joblib.load(resolve("meag_lid"))
     model_path = hf_hub_download(repo_id=repo_id, filename=FILENAME, repo_type="model")
     return joblib.load(model_path)
 
 
-def predict(nb_bundle: dict, texts: list[str]) -> tuple[pd.Series, pd.Series]:
-    """Return (predicted_language, predicted_probability) series for each text."""
+def proba_chunks(nb_bundle: dict, texts: list[str], chunk_size: int = 10_000):
+    """Yield ``(start, proba)`` for consecutive chunks of *texts*.
+
+    Each chunk is vectorised and scored with a single ``predict_proba`` call, so
+    the sparse matrix and probability block never cover more than *chunk_size*
+    texts.  Columns of ``proba`` follow ``clf.classes_``.
+    """
     clf = nb_bundle["model"]
     vec = nb_bundle["vectorizer"]
-    X_vec = vec.transform(texts)
-    langs = pd.Series(clf.predict(X_vec), name="predicted_language")
-    probs = pd.Series(clf.predict_proba(X_vec).max(axis=1), name="predicted_probability")
-    return langs, probs
+    for start in range(0, len(texts), chunk_size):
+        yield start, clf.predict_proba(vec.transform(texts[start : start + chunk_size]))
+
 
+def predict(nb_bundle: dict, texts: list[str], chunk_size: int = 10_000) -> Predictions:
+    """Return the predicted language and its probability for each text.
 
-def detect_for_texts(texts: list[str], nb_bundle: dict | None = None) -> pd.DataFrame:
+    The label is the argmax of ``predict_proba`` (what ``clf.predict`` returns),
+    so the classifier runs once per chunk.  Label codes index ``clf.classes_``;
+    probabilities are ``float32``.
+    """
+    classes = np.asarray(nb_bundle["model"].classes_, dtype=object)
+    codes = np.zeros(len(texts), dtype=np.int32)
+    probs = np.zeros(len(texts), dtype=np.float32)
+    for start, proba in proba_chunks(nb_bundle, texts, chunk_size):
+        top = proba.argmax(axis=1)
+        codes[start : start + len(top)] = top
+        probs[start : start + len(top)] = proba[np.arange(len(top)), top]
+    return Predictions(codes, probs, classes)
+
+
+def detect_for_texts(texts: list[str], nb_bundle: dict | None = None):
     """Run lang ID on a flat list of strings. Returns a DataFrame with columns:
     text, predicted_language, predicted_probability.
     """
+    import pandas as pd
+
     if nb_bundle is None:
         nb_bundle = load_model()
-    langs, probs = predict(nb_bundle, texts)
-    return pd.DataFrame({"text": texts, "predicted_language": langs, "predicted_probability": probs})
+    preds = predict(nb_bundle, texts)
+    return pd.DataFrame(
+        {"text": texts, "predicted_language": preds.langs(), "predicted_probability": preds.prob_values()}
+    )
 
 
 def annotate_text_units(entries: list[dict], nb_bundle: dict | None = None) -> list[dict]:
@@ -42,24 +73,4 @@ def annotate_text_units(entries: list[dict], nb_bundle: dict | None = None) -> l
     """
     if nb_bundle is None:
         nb_bundle = load_model()
-
-    indexed_texts = [
-        (i, text)
-        for i, item in enumerate(entries)
-        for text in item["text_units"]
-        if len(item["text_units"]) > 1
-    ]
-
-    if indexed_texts:
-        indices, texts = zip(*indexed_texts)
-        result = detect_for_texts(list(texts), nb_bundle)
-        result["entry_index"] = list(indices)
-        for i, group in result.groupby("entry_index"):
-            entries[i]["text_unit_langs"] = group["predicted_language"].reset_index(drop=True).tolist()
-            entries[i]["text_unit_probs"] = group["predicted_probability"].reset_index(drop=True).tolist()
-
-    for item in entries:
-        item.setdefault("text_unit_langs", None)
-        item.setdefault("text_unit_probs", None)
-
-    return entries
+    return lid.annotate_text_units(entries, lambda texts: predict(nb_bundle, texts))
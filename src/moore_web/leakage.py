@@ -0,0 +1,142 @@
+"""Train/dev/test leakage index for parallel datasets.
+
+An index is built once over the **train** rows and every dev/test row is then
+checked in bulk, separately for the French and the Mooré side:
+
+- ``*_exact`` — the normalised sentence (NFKC, casefold, punctuation and
+  whitespace collapsed) has the same 64-bit hash as a train sentence.
+- ``*_near``  — the sentence shares a MinHash-LSH band with a train sentence
+  (character 5-gram shingles, 64 permutations in 8 bands of 8, i.e. roughly
+  Jaccard >= 0.77).  Sentences shorter than ``min_near_chars`` normalised
+  characters are only checked exactly, since short phrases collide too easily.
+
+Lookups are ``np.searchsorted`` over sorted uint64 arrays, so building and
+checking take seconds even for hundreds of thousands of rows and the check
+can run on every dataset build.
+
+Usage
+-----
+    from moore_web.leakage import LeakageIndex
+
+    index = LeakageIndex.build([r["french"] for r in train], [r["moore"] for r in train])
+    flags = index.check([r["french"] for r in test], [r["moore"] for r in test])
+    leaking = leak_mask(flags)
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from moore_web.near_dedup import band_keys, minhash_texts, normalize_text
+from moore_web.text_hash import hash_texts
+
+LEAK_KINDS: tuple[str, ...] = ("fr_exact", "fr_near", "mo_exact", "mo_near")
+
+
+def _contains(sorted_keys: np.ndarray, queries: np.ndarray) -> np.ndarray:
+    """Vectorised membership test of *queries* in the sorted array *sorted_keys*."""
+    if not len(sorted_keys):
+        return np.zeros(len(queries), dtype=bool)
+    pos = np.searchsorted(sorted_keys, queries)
+    return sorted_keys[np.minimum(pos, len(sorted_keys) - 1)] == queries
+
+
+@dataclass
+class _SideIndex:
+    exact: np.ndarray
+    bands: list[np.ndarray] = field(default_factory=list)
+
+
+@dataclass
+class LeakageIndex:
+    """Hashed exact and MinHash-LSH sketches of the train sentences, one set per side."""
+
+    fr: _SideIndex
+    mo: _SideIndex
+    num_perm: int = 64
+    bands: int = 8
+    ngram: int = 5
+    min_near_chars: int = 20
+    batch_size: int = 10_000
+
+    # ------------------------------------------------------------------
+    # Sketching
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _normalise(texts: list[str | None]) -> list[str]:
+        return [normalize_text(t) for t in texts]
+
+    def _band_keys(self, normed: list[str]) -> tuple[np.ndarray, np.ndarray]:
+        """Return ``(rows, keys)``: LSH band keys for the sentences long enough for near checks."""
+        rows = np.flatnonzero(np.fromiter((len(t) >= self.min_near_chars for t in normed), bool, len(normed)))
+        keys = np.empty((len(rows), self.bands), dtype=np.uint64)
+        for s in range(0, len(rows), self.batch_size):
+            chunk = [normed[i] for i in rows[s : s + self.batch_size]]
+            sig = minhash_texts(chunk, num_perm=self.num_perm, ngram=self.ngram)
+            keys[s : s + self.batch_size] = band_keys(sig, self.bands)
+        return rows, keys
+
+    def _side(self, texts: list[str | None]) -> _SideIndex:
+        normed = self._normalise(texts)
+        exact = hash_texts([t for t in normed if t])
+        _, keys = self._band_keys(normed)
+        return _SideIndex(exact=np.unique(exact), bands=[np.unique(keys[:, b]) for b in range(self.bands)])
+
+    def _check_side(self, side: _SideIndex, texts: list[str | None]) -> tuple[np.ndarray, np.ndarray]:
+        normed = self._normalise(texts)
+        non_empty = np.fromiter((bool(t) for t in normed), bool, len(normed))
+        exact = _contains(side.exact, hash_texts(normed)) & non_empty
+        near = np.zeros(len(normed), dtype=bool)
+        rows, keys = self._band_keys(normed)
+        for b, train_keys in enumerate(side.bands):
+            near[rows] |= _contains(train_keys, keys[:, b])
+        return exact, near
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def build(
+        cls,
+        src_texts: list[str | None],
+        tgt_texts: list[str | None],
+        num_perm: int = 64,
+        bands: int = 8,
+        ngram: int = 5,
+        min_near_chars: int = 20,
+    ) -> LeakageIndex:
+        """Index the French (*src_texts*) and Mooré (*tgt_texts*) train sentences."""
+        index = cls(
+            fr=_SideIndex(np.empty(0, np.uint64)),
+            mo=_SideIndex(np.empty(0, np.uint64)),
+            num_perm=num_perm,
+            bands=bands,
+            ngram=ngram,
+            min_near_chars=min_near_chars,
+        )
+        index.fr = index._side(src_texts)
+        index.mo = index._side(tgt_texts)
+        return index
+
+    def check(self, src_texts: list[str | None], tgt_texts: list[str | None]) -> dict[str, np.ndarray]:
+        """Return one boolean array per leak kind (see :data:`LEAK_KINDS`) for the given rows."""
+        fr_exact, fr_near = self._check_side(self.fr, src_texts)
+        mo_exact, mo_near = self._check_side(self.mo, tgt_texts)
+        return {"fr_exact": fr_exact, "fr_near": fr_near, "mo_exact": mo_exact, "mo_near": mo_near}
+
+
+def leak_mask(flags: dict[str, np.ndarray], kinds: tuple[str, ...] = LEAK_KINDS) -> np.ndarray:
+    """Return a boolean mask of rows flagged by any of *kinds*."""
+    mask = np.zeros(len(next(iter(flags.values()))), dtype=bool)
+    for kind in kinds:
+        mask |= flags[kind]
+    return mask
+
+
+def leak_reasons(flags: dict[str, np.ndarray], i: int) -> list[str]:
+    """Return the leak kinds that flagged row *i*."""
+    return [kind for kind in LEAK_KINDS if flags[kind][i]]
@@ -0,0 +1,179 @@
+"""Shared result type, text-unit scatter and model choice for the LID modules.
+
+:mod:`moore_web.glotlid` and :mod:`moore_web.lang_id` both return
+:class:`Predictions` — integer label codes, a label vocabulary and ``float32``
+probabilities — and fill the ``text_unit_langs`` / ``text_unit_probs`` debug
+fields through :func:`annotate_text_units`, which flattens the text units once
+and slices the results back per entry with an offset array.  Nothing here
+imports pandas.
+
+:func:`load_predictor` returns a ``texts → Predictions`` callable for one of
+:data:`LID_MODELS`:
+
+- ``glotlid``  — GlotLID fasttext (cached, see :mod:`moore_web.glotlid`).
+- ``meag``     — the MEAG naive-Bayes model (:mod:`moore_web.lang_id`).
+- ``ensemble`` — MEAG first; only texts it scores below ``threshold`` also go
+  through GlotLID, and the label with the higher weighted probability wins
+  (:func:`ensemble_predict`).
+
+Labels are always GlotLID-style (``mos_Latn``); bare MEAG codes get ``_Latn``.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+from dataclasses import dataclass
+
+import numpy as np
+
+LID_MODELS: tuple[str, ...] = ("glotlid", "meag", "ensemble")
+
+
+@dataclass
+class Predictions:
+    """Top-1 predictions: ``labels[codes[i]]`` with probability ``probs[i]``."""
+
+    codes: np.ndarray  # int32, index into ``labels``
+    probs: np.ndarray  # float32
+    labels: np.ndarray  # label vocabulary (object array of str)
+
+    @classmethod
+    def from_labels(cls, langs, probs) -> Predictions:
+        """Encode a sequence of label strings (and their probabilities)."""
+        labels, codes = np.unique(np.asarray(langs, dtype=object), return_inverse=True)
+        return cls(codes.reshape(-1).astype(np.int32), np.asarray(probs, dtype=np.float32), labels)
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def langs(self) -> list[str]:
+        """Decoded label of every text."""
+        return self.labels[self.codes].tolist() if len(self.codes) else []
+
+    def prob_values(self, decimals: int | None = None) -> list[float]:
+        """Probabilities as Python floats, rounded to *decimals* when given."""
+        probs = self.probs.astype(np.float64)
+        return (probs if decimals is None else np.round(probs, decimals)).tolist()
+
+
+def annotate_text_units(
+    entries: list[dict],
+    predict_fn: Callable[[list[str]], Predictions],
+    decimals: int | None = None,
+) -> list[dict]:
+    """Add ``text_unit_langs`` / ``text_unit_probs`` to each entry (debug fields).
+
+    Only entries with more than one text unit are run through *predict_fn*, in a
+    single call; the others get ``None`` for both fields.  Probabilities are
+    rounded to *decimals* when given.
+    """
+    selected = [i for i, item in enumerate(entries) if len(item["text_units"]) > 1]
+    texts = [text for i in selected for text in entries[i]["text_units"]]
+    if texts:
+        offsets = np.concatenate([[0], np.cumsum([len(entries[i]["text_units"]) for i in selected])])
+        preds = predict_fn(texts)
+        langs, probs = preds.langs(), preds.prob_values(decimals)
+        for k, i in enumerate(selected):
+            start, end = offsets[k], offsets[k + 1]
+            entries[i]["text_unit_langs"] = langs[start:end]
+            entries[i]["text_unit_probs"] = probs[start:end]
+
+    for item in entries:
+        item.setdefault("text_unit_langs", None)
+        item.setdefault("text_unit_probs", None)
+
+    return entries
+
+
+# ---------------------------------------------------------------------------
+# Model choice and ensemble
+# ---------------------------------------------------------------------------
+
+
+def to_glotlid_label(label: str) -> str:
+    """GlotLID-style ``lang_Script`` label; bare (MEAG) language codes are assumed Latin script."""
+    return label if "_" in label else f"{label}_Latn"
+
+
+def _meag_classes(nb_bundle: dict) -> np.ndarray:
+    return np.array([to_glotlid_label(str(c)) for c in nb_bundle["model"].classes_], dtype=object)
+
+
+def ensemble_predict(
+    texts: list[str],
+    nb_bundle: dict,
+    glotlid_model,
+    threshold: float = 0.9,
+    weight: float = 0.5,
+    chunk_size: int = 10_000,
+    cache=None,
+) -> Predictions:
+    """MEAG decides confident texts; ambiguous ones are settled together with GlotLID.
+
+    Texts whose MEAG probability is below *threshold* are also run through
+    GlotLID.  For them, MEAG's and GlotLID's labels are each scored as
+    ``weight * p_meag(label) + (1 - weight) * p_glotlid(label)`` (GlotLID only
+    gives its top label, so it scores 0 for any other), and the higher wins
+    with that score as its probability.
+    """
+    from moore_web import glotlid, lang_id
+
+    classes = _meag_classes(nb_bundle)
+    class_index = {c: i for i, c in enumerate(classes.tolist())}
+    langs = np.empty(len(texts), dtype=object)
+    probs = np.zeros(len(texts), dtype=np.float32)
+    for start, proba in lang_id.proba_chunks(nb_bundle, texts, chunk_size):
+        rows = np.arange(len(proba))
+        top = proba.argmax(axis=1)
+        p_top = proba[rows, top]
+        langs[start : start + len(top)] = classes[top]
+        probs[start : start + len(top)] = p_top
+
+        ambiguous = np.flatnonzero(p_top < threshold)
+        if not len(ambiguous):
+            continue
+        second = glotlid.predict(glotlid_model, [texts[start + i] for i in ambiguous], cache=cache)
+        g_langs = second.labels[second.codes]
+        g_probs = second.probs.astype(np.float64)
+        meag_langs = classes[top[ambiguous]]
+        meag_for_g = np.array(
+            [
+                proba[i, class_index[lang]] if lang in class_index else 0.0
+                for i, lang in zip(ambiguous, g_langs)
+            ]
+        )
+        score_meag = weight * p_top[ambiguous] + (1 - weight) * np.where(g_langs == meag_langs, g_probs, 0.0)
+        score_glot = weight * meag_for_g + (1 - weight) * g_probs
+        use_glot = score_glot > score_meag
+        langs[start + ambiguous] = np.where(use_glot, g_langs, meag_langs)
+        probs[start + ambiguous] = np.maximum(score_glot, score_meag)
+    return Predictions.from_labels(langs, probs)
+
+
+def load_predictor(
+    name: str = "glotlid", use_cache: bool = True, threshold: float = 0.9
+) -> Callable[[list[str]], Predictions]:
+    """Load the model(s) for *name* (one of :data:`LID_MODELS`) and return a predict function."""
+    if name not in LID_MODELS:
+        raise ValueError(f"Unknown LID model {name!r}; expected one of {LID_MODELS}.")
+    glotlid_model = meag = cache = None
+    if name in ("glotlid", "ensemble"):
+        from moore_web import glotlid
+
+        glotlid_model = glotlid.load_model()
+        cache = glotlid.prediction_cache(glotlid_model) if use_cache else None
+    if name in ("meag", "ensemble"):
+        from moore_web import lang_id
+
+        meag = lang_id.load_model()
+
+    if name == "glotlid":
+        return lambda texts: glotlid.predict(glotlid_model, texts, cache=cache)
+    if name == "meag":
+
+        def _meag(texts: list[str]) -> Predictions:
+            preds = lang_id.predict(meag, texts)
+            return Predictions(preds.codes, preds.probs, _meag_classes(meag))
+
+        return _meag
+    return lambda texts: ensemble_predict(texts, meag, glotlid_model, threshold=threshold, cache=cache)
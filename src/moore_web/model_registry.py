@@ -0,0 +1,345 @@
+"""Offline-first registry of the model artifacts used by moore_web.
+
+Loaders ask for a **logical name** (``glotlid``, ``meag_lid``,
+``ssa-comet-qe``, ``laser-fra``, ``laser-mos``, …) and get a local path back.
+A JSON manifest under ``$MOORE_WEB_CACHE/models/`` (see :mod:`moore_web.cache`)
+maps every name to its pinned local path, size and SHA-256.  When the artifact
+is listed and present, :func:`resolve` returns it without any network call
+(checking its size; ``prefetch`` and ``verify`` also check the SHA-256);
+otherwise it is fetched once from its source and recorded.
+
+Some artifacts need others at load time: a COMET checkpoint is built on a Hub
+encoder (its ``pretrained_model`` hparam) whose config and tokenizer
+transformers would otherwise download.  ``prefetch ssa-comet-qe`` therefore
+also snapshots that encoder as ``ssa-comet-qe-encoder``.
+
+With ``MOORE_WEB_OFFLINE=1`` (or ``HF_HUB_OFFLINE=1``) a missing artifact is an
+error instead of a download — provision air-gapped workers with ``prefetch``
+on a connected machine and copy the cache directory, or ``pin`` artifacts that
+were copied by other means.
+
+Usage
+-----
+    # Download every default artifact (and what it depends on), check checksums
+    python -m moore_web.model_registry prefetch
+
+    # Only some of them
+    python -m moore_web.model_registry prefetch glotlid laser-mos
+
+    # Register an artifact copied in by hand, then check everything
+    python -m moore_web.model_registry pin glotlid /mnt/models/glotlid/model.bin
+    python -m moore_web.model_registry verify
+
+    from moore_web.model_registry import resolve
+    path = resolve("glotlid")
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+from dataclasses import dataclass
+from datetime import date
+from pathlib import Path
+
+from moore_web.cache import cache_root
+
+MANIFEST_VERSION = 1
+
+
+@dataclass(frozen=True)
+class ModelSource:
+    """Where an artifact comes from.
+
+    ``kind`` is ``"hf_file"`` (one file of a Hub repo), ``"hf_snapshot"`` (a whole
+    Hub repo; ``filename`` is the file inside it that loaders need),
+    ``"laser"`` (a ``laser_encoders`` model directory for ``lang``) or
+    ``"comet_encoder"`` (config and tokenizer of the encoder named by the
+    registered COMET ``checkpoint``).  ``requires`` lists artifacts that
+    ``prefetch`` fetches along with this one.
+    """
+
+    kind: str
+    repo_id: str = ""
+    filename: str = ""
+    repo_type: str = "model"
+    lang: str = ""
+    checkpoint: str = ""
+    requires: tuple[str, ...] = ()
+
+
+# Logical name → source.  ``laser-<lang>`` names not listed here are derived on demand.
+MODELS: dict[str, ModelSource] = {
+    "glotlid": ModelSource("hf_file", "cis-lmu/glotlid", "model.bin"),
+    "meag_lid": ModelSource("hf_file", "JessicaOjo/meag_lid", "model/model.joblib"),
+    "ssa-comet-qe": ModelSource(
+        "hf_snapshot", "McGill-NLP/ssa-comet-qe", "checkpoints/model.ckpt", requires=("ssa-comet-qe-encoder",)
+    ),
+    "ssa-comet-qe-encoder": ModelSource("comet_encoder", checkpoint="ssa-comet-qe"),
+    "laser-fra": ModelSource("laser", lang="fra"),
+    "laser-mos": ModelSource("laser", lang="mos"),
+}
+
+
+def _source(name: str) -> ModelSource:
+    if name in MODELS:
+        return MODELS[name]
+    if name.startswith("laser-"):
+        return ModelSource("laser", lang=name.removeprefix("laser-"))
+    raise KeyError(f"Unknown model {name!r}; known: {sorted(MODELS)} or laser-<lang>.")
+
+
+def is_offline() -> bool:
+    """True when ``MOORE_WEB_OFFLINE`` or ``HF_HUB_OFFLINE`` is set to a truthy value."""
+    return any(
+        os.environ.get(v, "").lower() in ("1", "true", "yes") for v in ("MOORE_WEB_OFFLINE", "HF_HUB_OFFLINE")
+    )
+
+
+# ---------------------------------------------------------------------------
+# Manifest
+# ---------------------------------------------------------------------------
+
+
+def models_dir() -> Path:
+    return cache_root() / "models"
+
+
+def manifest_path() -> Path:
+    return models_dir() / "manifest.json"
+
+
+def load_manifest() -> dict[str, dict]:
+    """Return ``{name: entry}`` from the manifest (empty when there is none)."""
+    path = manifest_path()
+    if not path.exists():
+        return {}
+    data = json.loads(path.read_text(encoding="utf-8"))
+    if data.get("version") != MANIFEST_VERSION:
+        raise ValueError(f"{path} has manifest version {data.get('version')}, expected {MANIFEST_VERSION}.")
+    return data["models"]
+
+
+def _save_manifest(models: dict[str, dict]) -> None:
+    path = manifest_path()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps({"version": MANIFEST_VERSION, "models": models}, indent=2), encoding="utf-8")
+    tmp.replace(path)
+
+
+def _files(path: Path) -> list[Path]:
+    return sorted(p for p in path.rglob("*") if p.is_file()) if path.is_dir() else [path]
+
+
+def artifact_size(path: Path) -> int:
+    return sum(p.stat().st_size for p in _files(path))
+
+
+def artifact_sha256(path: Path) -> str:
+    """SHA-256 of a file, or of a directory's relative paths and contents."""
+    digest = hashlib.sha256()
+    for p in _files(path):
+        if path.is_dir():
+            digest.update(str(p.relative_to(path)).encode("utf-8") + b"\0")
+        with open(p, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+    return digest.hexdigest()
+
+
+def pin(name: str, path: str | Path, source: str = "pinned", file: str = "") -> dict:
+    """Record *path* (a file or directory) as the local artifact for *name*.
+
+    Size and checksum cover all of *path*; *file* is the path inside a directory
+    artifact that :func:`resolve` hands to loaders.
+    """
+    path = Path(path).resolve()
+    if not (path / file).exists():
+        raise FileNotFoundError(path / file)
+    e = {
+        "path": str(path),
+        "file": file,
+        "size": artifact_size(path),
+        "sha256": artifact_sha256(path),
+        "source": source,
+        "fetched": date.today().isoformat(),
+    }
+    models = load_manifest()
+    models[name] = e
+    _save_manifest(models)
+    return e
+
+
+# ---------------------------------------------------------------------------
+# Fetching
+# ---------------------------------------------------------------------------
+
+# Encoder files COMET needs to build a checkpoint's model: its weights come from the checkpoint.
+_ENCODER_FILES = ["*.json", "*.model", "*.txt"]
+
+
+def comet_hparams(checkpoint: str | Path) -> dict:
+    """``hparams.yaml`` of a COMET checkpoint (``<model>/checkpoints/model.ckpt``)."""
+    import yaml
+
+    return yaml.safe_load((Path(checkpoint).parents[1] / "hparams.yaml").read_text(encoding="utf-8"))
+
+
+def _fetch(name: str) -> tuple[Path, str, str]:
+    """Download *name* into :func:`models_dir`; return ``(artifact path, file inside it, source)``."""
+    src = _source(name)
+    target = models_dir() / name
+    if src.kind == "hf_file":
+        from huggingface_hub import hf_hub_download
+
+        path = hf_hub_download(src.repo_id, src.filename, repo_type=src.repo_type, local_dir=target)
+        return Path(path), "", f"hf://{src.repo_id}/{src.filename}"
+    if src.kind == "hf_snapshot":
+        from huggingface_hub import snapshot_download
+
+        snapshot_download(src.repo_id, repo_type=src.repo_type, local_dir=target)
+        return target, src.filename, f"hf://{src.repo_id}"
+    if src.kind == "laser":
+        from laser_encoders import LaserEncoderPipeline
+
+        target.mkdir(parents=True, exist_ok=True)
+        LaserEncoderPipeline(lang=src.lang, model_dir=str(target))  # downloads into target
+        return target, "", f"laser_encoders:{src.lang}"
+    if src.kind == "comet_encoder":
+        from huggingface_hub import snapshot_download
+
+        repo_id = comet_hparams(resolve(src.checkpoint))["pretrained_model"]
+        snapshot_download(repo_id, local_dir=target, allow_patterns=_ENCODER_FILES)
+        return target, "", f"hf://{repo_id}"
+    raise ValueError(f"Unknown source kind {src.kind!r} for {name!r}.")
+
+
+def resolve(name: str, check_sha256: bool = False) -> Path:
+    """Local path of artifact *name*; fetched and recorded only when not already present.
+
+    A registered artifact is accepted when its size matches the manifest, and
+    with *check_sha256* only when its checksum matches too (slower: it reads
+    every byte).  Otherwise it is fetched again.
+
+    Raises:
+        FileNotFoundError: The artifact is missing or changed and the registry is offline.
+    """
+    e = load_manifest().get(name)
+    if e is not None:
+        path = Path(e["path"])
+        if (
+            path.exists()
+            and artifact_size(path) == e["size"]
+            and (not check_sha256 or artifact_sha256(path) == e["sha256"])
+        ):
+            return path / e.get("file", "")
+        print(f"Warning: registered artifact for {name!r} at {path} is missing or changed.")
+    if is_offline():
+        raise FileNotFoundError(
+            f"Model {name!r} is not in the local registry ({manifest_path()}) and the registry is offline. "
+            f"Run `python -m moore_web.model_registry prefetch {name}` on a connected machine."
+        )
+    print(f"Fetching model {name!r}…")
+    path, file, source = _fetch(name)
+    pin(name, path, source=source, file=file)
+    return path / file
+
+
+def prefetch(names: list[str] | None = None) -> dict[str, Path]:
+    """Resolve *names* (default: all of :data:`MODELS`) and what they require, checking checksums."""
+    paths: dict[str, Path] = {}
+    pending = list(names or MODELS)
+    while pending:
+        name = pending.pop(0)
+        if name not in paths:
+            paths[name] = resolve(name, check_sha256=True)
+            pending.extend(_source(name).requires)
+    return paths
+
+
+def entry(name: str) -> dict | None:
+    """Manifest entry of *name* (``path``, ``file``, ``size``, ``sha256``, ``source``, ``fetched``), if any."""
+    return load_manifest().get(name)
+
+
+def laser_kwargs(lang: str) -> dict:
+    """``LaserEncoderPipeline`` keyword arguments for *lang*: the registered ``model_dir``, if any.
+
+    Unregistered languages keep ``laser_encoders``' own download directory,
+    except offline, where they are an error.
+    """
+    e = entry(f"laser-{lang}")
+    if e is not None and Path(e["path"]).exists():
+        return {"model_dir": e["path"]}
+    if is_offline():
+        raise FileNotFoundError(
+            f"LASER model for {lang!r} is not in the local registry ({manifest_path()}) and the registry "
+            f"is offline. Run `python -m moore_web.model_registry prefetch laser-{lang}` on a connected machine."
+        )
+    return {}
+
+
+def verify(names: list[str] | None = None) -> dict[str, str]:
+    """Recompute checksums; return ``{name: "ok" | "missing" | "mismatch"}``."""
+    models = load_manifest()
+    status = {}
+    for name in names or sorted(models):
+        e = models.get(name)
+        if e is None or not Path(e["path"]).exists():
+            status[name] = "missing"
+        else:
+            status[name] = "ok" if artifact_sha256(Path(e["path"])) == e["sha256"] else "mismatch"
+    return status
+
+
+# ---------------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------------
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Prefetch, pin and verify the local model artifacts.",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__,
+    )
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("prefetch", help="Download missing or changed artifacts and their dependencies.")
+    p.add_argument("names", nargs="*", metavar="NAME")
+    p = sub.add_parser("pin", help="Register a local artifact path for NAME.")
+    p.add_argument("name")
+    p.add_argument("path")
+    p.add_argument("--file", default="", help="File inside a directory artifact that loaders open.")
+    p = sub.add_parser("verify", help="Recompute and compare checksums.")
+    p.add_argument("names", nargs="*", metavar="NAME")
+    sub.add_parser("list", help="Show the manifest.")
+    return parser
+
+
+def main() -> None:
+    args = _build_parser().parse_args()
+    if args.command == "prefetch":
+        for name, path in prefetch(args.names or None).items():
+            print(f"{name}: {path}")
+    elif args.command == "pin":
+        e = pin(args.name, args.path, file=args.file)
+        print(f"{args.name}: {e['path']} ({e['size']:,} bytes, sha256 {e['sha256'][:12]}…)")
+    elif args.command == "verify":
+        status = verify(args.names or None)
+        for name, s in status.items():
+            print(f"  {name:<16}{s}")
+        if any(s != "ok" for s in status.values()):
+            raise SystemExit(1)
+    else:
+        models = load_manifest()
+        if not models:
+            print(f"No models registered in {manifest_path()}.")
+        for name, e in models.items():
+            print(f"  {name:<16}{e['size']:>15,} B  {e['sha256'][:12]}  {e['fetched']}  {e['path']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""Cheap character-class profiles and a pre-LID orthography gate.
+
+Mooré is written with characters French and English almost never use — ``ɩ``,
+``ʋ``, ``ɛ`` and the nasal vowels ``ã ẽ ĩ õ ũ`` (precomposed or with a
+combining tilde, possibly tone-marked).  :func:`profile` measures, for a whole
+column at once with Arrow regex kernels (no Python loop over rows):
+
+- ``letters``       — number of letters,
+- ``moore``         — share of letters that are Mooré-specific,
+- ``non_latin``     — share of letters outside the Latin script,
+- ``english``       — share of tokens that are common English function words,
+- ``french``        — share of tokens that are common French function words.
+
+French diacritics alone are not evidence: Mooré text routinely carries French
+proper nouns (*Côte d'Ivoire*, *Ségou*, *Général*), so only function words —
+which a Mooré sentence does not use — count.
+
+:func:`gate` turns the profiles of both sides into a reason code per row.  A
+row is rejected only when its Mooré side is *clearly* something else:
+
+- ``non_latin`` — most letters are not Latin,
+- ``english``   — no Mooré character, at least ``min_letters`` letters and an
+  English function-word rate of at least ``min_english``,
+- ``french``    — no Mooré character, at least ``min_letters`` letters and a
+  French function-word rate of at least ``min_french``,
+- ``swapped``   — the source side is markedly Mooré and the target has no
+  Mooré character.
+
+Rejected rows can be dropped before GlotLID, LASER or COMET-QE run
+(``annotate --ortho-gate``) or filtered out in :mod:`moore_web.filter_nllb`
+(``--ortho-gate``); :func:`report_savings` prints the rows rejected per reason
+and, when given the per-row calls of the models that would have run next, how
+many calls the gate avoided.
+
+Usage
+-----
+    from moore_web.orthography import gate, report_savings
+    reasons = gate(dataset["french"], dataset["moore"])
+    report_savings(reasons, {"GlotLID": 2, "COMET-QE": 1})  # before annotate's models
+"""
+
+from __future__ import annotations
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+
+MOORE_CHARS = "ɩƖʋƲɛƐãÃẽẼĩĨõÕũŨ̃"
+# Frequent English / French words that are not also Mooré words ("be", "to", "la", "ne", … are).
+ENGLISH_WORDS: tuple[str, ...] = tuple("the and of is are was were that for with this from have has".split())
+FRENCH_WORDS: tuple[str, ...] = tuple(
+    "le les de des du et est une dans pour par sur avec qui que sont au aux cette il elle".split()
+)
+
+_LETTER = r"\p{L}"
+_LATIN = r"\p{Latin}"
+_MOORE = f"[{MOORE_CHARS}]"
+_ENGLISH = r"(?i)\b(?:" + "|".join(ENGLISH_WORDS) + r")\b"
+_FRENCH = r"(?i)\b(?:" + "|".join(FRENCH_WORDS) + r")\b"
+_TOKEN = r"\S+"
+
+# Reason codes returned by :func:`gate` (0 = keep).
+GATE_REASONS: tuple[str, ...] = ("pass", "non_latin", "english", "french", "swapped")
+PASS, NON_LATIN, ENGLISH, FRENCH, SWAPPED = range(len(GATE_REASONS))
+
+
+def _as_array(texts) -> pa.Array:
+    if isinstance(texts, pa.ChunkedArray):
+        texts = texts.combine_chunks()
+    if not isinstance(texts, pa.Array):
+        texts = pa.array(texts, type=pa.large_string())
+    return pc.fill_null(texts, "") if texts.null_count else texts
+
+
+def _count(texts: pa.Array, pattern: str) -> np.ndarray:
+    return pc.count_substring_regex(texts, pattern).to_numpy(zero_copy_only=False).astype(np.int64)
+
+
+def profile(texts) -> dict[str, np.ndarray]:
+    """Character-class profile of every text (see the module docstring); ratios are ``float32``."""
+    texts = _as_array(texts)
+    letters = _count(texts, _LETTER)
+    tokens = _count(texts, _TOKEN)
+    safe_letters, safe_tokens = np.maximum(letters, 1), np.maximum(tokens, 1)
+    return {
+        "letters": letters,
+        "moore": (_count(texts, _MOORE) / safe_letters).astype(np.float32),
+        "non_latin": ((letters - _count(texts, _LATIN)) / safe_letters).astype(np.float32),
+        "english": (_count(texts, _ENGLISH) / safe_tokens).astype(np.float32),
+        "french": (_count(texts, _FRENCH) / safe_tokens).astype(np.float32),
+    }
+
+
+def gate(
+    src_texts,
+    tgt_texts,
+    min_letters: int = 20,
+    min_english: float = 0.15,
+    min_french: float = 0.15,
+    min_swapped: float = 0.03,
+) -> np.ndarray:
+    """Reason code (index into :data:`GATE_REASONS`) for every row; 0 keeps the row.
+
+    *tgt_texts* is the Mooré side.  When several reasons apply, the first in
+    :data:`GATE_REASONS` order is reported.
+    """
+    src, tgt = profile(src_texts), profile(tgt_texts)
+    no_moore = tgt["moore"] == 0
+    long_enough = no_moore & (tgt["letters"] >= min_letters)
+    conditions = [
+        (tgt["letters"] > 0) & (tgt["non_latin"] > 0.5),
+        long_enough & (tgt["english"] >= min_english),
+        long_enough & (tgt["french"] >= min_french),
+        no_moore & (src["moore"] >= min_swapped),
+    ]
+    return np.select(conditions, [NON_LATIN, ENGLISH, FRENCH, SWAPPED], default=PASS).astype(np.uint8)
+
+
+def report_savings(reasons: np.ndarray, calls_per_row: dict[str, int] | None = None) -> dict:
+    """Print and return the rows rejected per reason and the model calls the gate saved.
+
+    *calls_per_row* maps each downstream model to the calls it makes per row
+    (e.g. ``{"GlotLID": 2, "COMET-QE": 1}``).
+    """
+    total = len(reasons)
+    counts = np.bincount(reasons, minlength=len(GATE_REASONS))
+    rejected = total - int(counts[PASS])
+    share = rejected / total if total else 0.0
+    print(f"Orthography gate: {rejected:,} / {total:,} rows rejected ({share:.1%})")
+    for code, name in enumerate(GATE_REASONS):
+        if code != PASS and counts[code]:
+            print(f"  {name:<10}{counts[code]:>10,}")
+    saved = {}
+    for name, per_row in (calls_per_row or {}).items():
+        saved[name] = rejected * per_row
+        print(f"  {name}: {saved[name]:,} of {total * per_row:,} calls saved ({share:.1%})")
+    return {
+        "rows": total,
+        "rejected": rejected,
+        "reasons": {name: int(counts[code]) for code, name in enumerate(GATE_REASONS) if code != PASS},
+        "calls_saved": saved,
+    }
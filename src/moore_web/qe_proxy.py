@@ -0,0 +1,368 @@
+"""Cheap COMET-QE proxy used to triage pairs before running the real model.
+
+``McGill-NLP/ssa-comet-qe`` is by far the most expensive scorer in the
+pipeline.  Once a dataset carries COMET-QE labels, a small sklearn regressor
+can be trained on cheap per-row features to predict the COMET score:
+
+- LASER cosine similarity (``laser_score`` / ``laser_{src}_{tgt}``)
+- ``len_ratio`` (computed from the texts when the column is missing)
+- OpusFilter-style terminal punctuation score (always computed from the texts)
+- ``identification_consistency``
+- GlotLID probabilities for both sides (``{field}_glotlid_prob``)
+
+Missing features are passed as ``NaN`` — ``HistGradientBoostingRegressor``
+handles them natively, so the proxy works on datasets where only some of the
+annotations were run.
+
+Triage
+------
+Given a COMET threshold ``t`` the proxy *accepts* a pair when its prediction
+is at least ``t + accept_margin`` and *rejects* it when the prediction is below
+``t - reject_margin``.  Both margins are calibrated on a held-out split so that
+the fraction of wrong decisions on each side stays within ``max_error`` (the
+error budget).  Only the remaining pairs are sent to COMET.
+
+Usage
+-----
+    # Train a proxy on an already-scored file (saved next to the data)
+    uv run python -m moore_web.qe_proxy train final_data_hf/conseils_ministres_aligned.jsonl \\
+        --label-field comet_qe --threshold 0.35
+
+    # Inspect how a trained proxy would triage another file
+    uv run python -m moore_web.qe_proxy triage final_data_hf/raamde_aligned.jsonl \\
+        --proxy final_data_hf/conseils_ministres_aligned.qe_proxy.joblib
+
+    # Score with COMET only where the proxy is unsure
+    uv run python -m moore_web.score_comet_qe data.jsonl --proxy data.qe_proxy.joblib
+"""
+
+from __future__ import annotations
+
+import argparse
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import numpy as np
+
+FEATURE_NAMES: tuple[str, ...] = (
+    "laser",
+    "len_ratio",
+    "terminal_punctuation",
+    "identification_consistency",
+    "src_glotlid_prob",
+    "tgt_glotlid_prob",
+)
+
+# Decision codes returned by :meth:`QEProxy.triage`.
+ACCEPT = 1
+REJECT = -1
+UNSURE = 0
+
+
+# ---------------------------------------------------------------------------
+# Features
+# ---------------------------------------------------------------------------
+
+
+def _resolve_laser_field(columns: list[str], laser_field: str | None) -> str | None:
+    if laser_field is not None:
+        return laser_field if laser_field in columns else None
+    if "laser_score" in columns:
+        return "laser_score"
+    return next((c for c in columns if c.startswith("laser_")), None)
+
+
+def _float_column(values: list | None, n: int) -> np.ndarray:
+    if values is None:
+        return np.full(n, np.nan, dtype=np.float64)
+    return np.array([np.nan if v is None else float(v) for v in values], dtype=np.float64)
+
+
+def build_features(
+    dataset,
+    src_field: str = "french",
+    tgt_field: str = "moore",
+    laser_field: str | None = None,
+) -> np.ndarray:
+    """Return a ``(n_rows, len(FEATURE_NAMES))`` float matrix of cheap proxy features.
+
+    Args:
+        dataset:     ``datasets.Dataset`` (or any mapping of column name → list).
+        src_field:   Source text column.
+        tgt_field:   Target text column.
+        laser_field: LASER score column.  Auto-detected (``laser_score`` then
+                     any ``laser_*`` column) when ``None``.
+    """
+    from moore_web.filter_nllb import _len_ratio, _terminal_punctuation_score
+
+    columns = list(dataset.column_names if hasattr(dataset, "column_names") else dataset.keys())
+    src_texts = [s or "" for s in dataset[src_field]]
+    tgt_texts = [t or "" for t in dataset[tgt_field]]
+    n = len(src_texts)
+
+    def _col(name: str | None) -> list | None:
+        return dataset[name] if name is not None and name in columns else None
+
+    len_ratio = _col("len_ratio")
+    if len_ratio is None:
+        len_ratio = [_len_ratio(s, t) for s, t in zip(src_texts, tgt_texts)]
+
+    return np.column_stack(
+        [
+            _float_column(_col(_resolve_laser_field(columns, laser_field)), n),
+            _float_column(len_ratio, n),
+            np.array([_terminal_punctuation_score(s, t) for s, t in zip(src_texts, tgt_texts)]),
+            _float_column(_col("identification_consistency"), n),
+            _float_column(_col(f"{src_field}_glotlid_prob"), n),
+            _float_column(_col(f"{tgt_field}_glotlid_prob"), n),
+        ]
+    )
+
+
+# ---------------------------------------------------------------------------
+# Proxy model
+# ---------------------------------------------------------------------------
+
+
+def _calibrate_margin(
+    preds: np.ndarray, labels: np.ndarray, threshold: float, max_error: float, side: int
+) -> float:
+    """Smallest margin whose decided set (on *side*) has an error rate <= *max_error*.
+
+    Candidate margins are the distances of the held-out predictions to the
+    threshold, so the search is exact on the calibration split.
+    """
+    dist = (preds - threshold) * side
+    wrong = (labels < threshold) if side == ACCEPT else (labels >= threshold)
+    candidates = np.sort(dist[dist >= 0])
+    for margin in candidates:
+        decided = dist >= margin if side == ACCEPT else dist > margin
+        if not decided.any():
+            break
+        if wrong[decided].mean() <= max_error:
+            return float(margin)
+    return float("inf")
+
+
+@dataclass
+class QEProxy:
+    """Trained COMET-QE proxy plus its calibrated decision margins."""
+
+    model: object
+    threshold: float
+    accept_margin: float
+    reject_margin: float
+    max_error: float
+    label_field: str
+    laser_field: str | None = None
+    report: dict = field(default_factory=dict)
+
+    def predict(self, features: np.ndarray) -> np.ndarray:
+        return self.model.predict(features)
+
+    def triage(self, features: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Return ``(decisions, predictions)``; decisions are ACCEPT / REJECT / UNSURE."""
+        preds = self.predict(features)
+        decisions = np.full(len(preds), UNSURE, dtype=np.int8)
+        decisions[preds >= self.threshold + self.accept_margin] = ACCEPT
+        decisions[preds < self.threshold - self.reject_margin] = REJECT
+        return decisions, preds
+
+    def save(self, path: str | Path) -> Path:
+        import joblib
+
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        joblib.dump(self, path)
+        return path
+
+    @staticmethod
+    def load(path: str | Path) -> QEProxy:
+        import joblib
+
+        return joblib.load(path)
+
+
+def default_proxy_path(data_path: str | Path) -> Path:
+    """Proxy file stored next to the data: ``data.jsonl`` → ``data.qe_proxy.joblib``."""
+    data_path = Path(data_path)
+    return data_path.with_name(data_path.stem + ".qe_proxy.joblib")
+
+
+def train_proxy(
+    dataset,
+    label_field: str = "comet_qe",
+    src_field: str = "french",
+    tgt_field: str = "moore",
+    laser_field: str | None = None,
+    threshold: float = 0.5,
+    max_error: float = 0.02,
+    val_fraction: float = 0.2,
+    seed: int = 42,
+) -> QEProxy:
+    """Train a COMET-QE proxy on rows that already carry a COMET label.
+
+    Rows whose ``label_field`` is ``None`` are ignored.  The model is fit on
+    ``1 - val_fraction`` of the labelled rows; the rest calibrates the accept /
+    reject margins against *max_error* and produces the reported error budget.
+    The calibrated model is the one shipped, so the margins and the report
+    describe exactly what :meth:`QEProxy.triage` will do.
+
+    Args:
+        dataset:      ``datasets.Dataset`` with text columns and a COMET column.
+        label_field:  COMET-QE score column used as the regression target.
+        src_field:    Source text column.
+        tgt_field:    Target text column.
+        laser_field:  LASER score column (auto-detected when ``None``).
+        threshold:    COMET threshold the triage decisions are made against.
+        max_error:    Maximum tolerated fraction of wrong accept (or reject)
+                      decisions on the calibration split.
+        val_fraction: Fraction of labelled rows held out for calibration.
+        seed:         Random seed for the split and the model.
+
+    Returns:
+        A fitted :class:`QEProxy`.
+    """
+    from sklearn.ensemble import HistGradientBoostingRegressor
+
+    labels = _float_column(dataset[label_field], len(dataset))
+    labelled = np.flatnonzero(~np.isnan(labels))
+    if len(labelled) < 50:
+        raise ValueError(
+            f"Need at least 50 rows with a '{label_field}' label to train a proxy, got {len(labelled)}."
+        )
+
+    X = build_features(dataset, src_field=src_field, tgt_field=tgt_field, laser_field=laser_field)[labelled]
+    y = labels[labelled]
+
+    rng = np.random.default_rng(seed)
+    order = rng.permutation(len(y))
+    n_val = max(1, int(len(y) * val_fraction))
+    val_idx, fit_idx = order[:n_val], order[n_val:]
+
+    model = HistGradientBoostingRegressor(max_iter=200, learning_rate=0.1, random_state=seed)
+    model.fit(X[fit_idx], y[fit_idx])
+    val_preds = model.predict(X[val_idx])
+    accept_margin = _calibrate_margin(val_preds, y[val_idx], threshold, max_error, ACCEPT)
+    reject_margin = _calibrate_margin(val_preds, y[val_idx], threshold, max_error, REJECT)
+
+    proxy = QEProxy(
+        model=model,
+        threshold=threshold,
+        accept_margin=accept_margin,
+        reject_margin=reject_margin,
+        max_error=max_error,
+        label_field=label_field,
+        laser_field=laser_field,
+    )
+    decisions, _ = proxy.triage(X[val_idx])
+    y_val = y[val_idx]
+    accepted, rejected = decisions == ACCEPT, decisions == REJECT
+    proxy.report = {
+        "n_train": int(len(fit_idx)),
+        "n_val": int(len(val_idx)),
+        "val_mae": float(np.abs(val_preds - y_val).mean()),
+        "val_accept_rate": float(accepted.mean()),
+        "val_reject_rate": float(rejected.mean()),
+        "val_accept_error": float((y_val[accepted] < threshold).mean()) if accepted.any() else 0.0,
+        "val_reject_error": float((y_val[rejected] >= threshold).mean()) if rejected.any() else 0.0,
+    }
+    return proxy
+
+
+def print_report(proxy: QEProxy) -> None:
+    r = proxy.report
+    print(
+        f"QE proxy (threshold={proxy.threshold}, error budget={proxy.max_error:.1%}):\n"
+        f"  trained on {r['n_train']:,} rows, calibrated on {r['n_val']:,} rows  (val MAE={r['val_mae']:.4f})\n"
+        f"  accept if pred >= {proxy.threshold + proxy.accept_margin:.4f}  "
+        f"→ {r['val_accept_rate']:.1%} of rows, error {r['val_accept_error']:.2%}\n"
+        f"  reject if pred <  {proxy.threshold - proxy.reject_margin:.4f}  "
+        f"→ {r['val_reject_rate']:.1%} of rows, error {r['val_reject_error']:.2%}\n"
+        f"  COMET needed for ~{1 - r['val_accept_rate'] - r['val_reject_rate']:.1%} of rows"
+    )
+
+
+def print_triage_summary(decisions: np.ndarray) -> None:
+    n = len(decisions)
+    if not n:
+        return
+    n_acc = int((decisions == ACCEPT).sum())
+    n_rej = int((decisions == REJECT).sum())
+    n_unsure = n - n_acc - n_rej
+    print(
+        f"QE proxy triage: {n_acc:,} accepted, {n_rej:,} rejected, "
+        f"{n_unsure:,} sent to COMET ({100 * n_unsure / n:.1f}% of {n:,} rows)"
+    )
+
+
+# ---------------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------------
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Train or apply a cheap COMET-QE proxy model.",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__,
+    )
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    for name in ("train", "triage"):
+        p = sub.add_parser(name)
+        p.add_argument("input", help="Local JSONL or hf://owner/repo.")
+        p.add_argument("--src-field", default="french", help="Source text column (default: %(default)s).")
+        p.add_argument("--tgt-field", default="moore", help="Target text column (default: %(default)s).")
+        p.add_argument("--laser-field", default=None, help="LASER score column (default: auto-detect).")
+        p.add_argument("--proxy", default=None, help="Proxy path (default: <input>.qe_proxy.joblib).")
+
+    train = sub.choices["train"]
+    train.add_argument(
+        "--label-field", default="comet_qe", help="COMET-QE label column (default: %(default)s)."
+    )
+    train.add_argument("--threshold", type=float, default=0.5, help="COMET threshold (default: %(default)s).")
+    train.add_argument(
+        "--max-error",
+        type=float,
+        default=0.02,
+        help="Error budget: max fraction of wrong accept/reject decisions (default: %(default)s).",
+    )
+    train.add_argument("--seed", type=int, default=42, help="Random seed (default: %(default)s).")
+    return parser
+
+
+def main() -> None:
+    from moore_web.annotate import _is_hf, load_data
+
+    args = _build_parser().parse_args()
+    if args.proxy is None and _is_hf(args.input):
+        raise SystemExit("--proxy is required when the input is a HuggingFace dataset.")
+    proxy_path = Path(args.proxy) if args.proxy else default_proxy_path(args.input)
+    dataset = load_data(args.input)
+
+    if args.command == "train":
+        proxy = train_proxy(
+            dataset,
+            label_field=args.label_field,
+            src_field=args.src_field,
+            tgt_field=args.tgt_field,
+            laser_field=args.laser_field,
+            threshold=args.threshold,
+            max_error=args.max_error,
+            seed=args.seed,
+        )
+        print_report(proxy)
+        print(f"Saved proxy → {proxy.save(proxy_path)}")
+    else:
+        proxy = QEProxy.load(proxy_path)
+        print_report(proxy)
+        features = build_features(
+            dataset, src_field=args.src_field, tgt_field=args.tgt_field, laser_field=proxy.laser_field
+        )
+        decisions, _ = proxy.triage(features)
+        print_triage_summary(decisions)
+
+
+if __name__ == "__main__":
+    main()
@@ -28,6 +28,9 @@ Notes
 - Scores are calibrated for English sources; French sources give *relative* quality
   signals useful for filtering but absolute values are less meaningful.
 - Use --gpus 0 to force CPU (slow on large files).
+- With ``--proxy`` (see :mod:`moore_web.qe_proxy`) COMET only runs on pairs the
+  proxy cannot confidently accept or reject; the other rows get the proxy
+  prediction and ``{output_field}_from_proxy=True``.
 """
 
 from __future__ import annotations
@@ -43,10 +46,43 @@ from pathlib import Path
 
 
 def load_model():
-    from comet import download_model, load_from_checkpoint
+    """Load McGill-NLP/ssa-comet-qe from the local model registry (fetched on first use).
+
+    Like ``comet.load_from_checkpoint``, but the checkpoint's ``pretrained_model``
+    hparam is pointed at the registry's ``ssa-comet-qe-encoder`` snapshot, so
+    transformers reads the encoder config and tokenizer locally instead of
+    from the Hub.
+    """
+    from comet.models import str2model
+
+    from moore_web.model_registry import comet_hparams, resolve
 
     print("Loading McGill-NLP/ssa-comet-qe …")
-    return load_from_checkpoint(download_model("McGill-NLP/ssa-comet-qe"))
+    checkpoint = resolve("ssa-comet-qe")
+    encoder = resolve("ssa-comet-qe-encoder")
+    model_class = str2model[comet_hparams(checkpoint)["class_identifier"]]
+    return model_class.load_from_checkpoint(
+        str(checkpoint),
+        load_pretrained_weights=False,
+        map_location="cpu",
+        strict=False,
+        pretrained_model=str(encoder),
+        local_files_only=True,
+    )
+
+
+def score_in_pool(pairs: list[tuple[str, str]], batch_size: int = 8, gpus: int = 0) -> list[float]:
+    """:class:`~moore_web.worker_pool.WorkerPool` task: COMET-QE scores of ``(src, mt)`` pairs.
+
+    Uses the pool's ``ssa-comet-qe`` model; ``gpus=0`` because forked workers
+    cannot share one CUDA context.
+    """
+    from moore_web.worker_pool import model
+
+    output = model("ssa-comet-qe").predict(
+        [{"src": s, "mt": t} for s, t in pairs], batch_size=batch_size, gpus=gpus, progress_bar=False
+    )
+    return [round(float(s), 4) for s in output.scores]
 
 
 def score_dataset(
@@ -57,6 +93,7 @@ def score_dataset(
     batch_size: int = 8,
     gpus: int = 1,
     model=None,
+    proxy=None,
 ):
     """Add COMET-QE scores to every row of a HuggingFace ``Dataset``.
 
@@ -69,6 +106,9 @@ def score_dataset(
         batch_size:   Rows per inference batch.
         gpus:         Number of GPUs to use (0 = CPU).
         model:        Pre-loaded COMET model; loaded automatically if ``None``.
+        proxy:        Optional :class:`~moore_web.qe_proxy.QEProxy`.  When given, only
+                      pairs the proxy is unsure about are scored with COMET; an extra
+                      ``{output_field}_from_proxy`` boolean column is added.
 
     Returns:
         Annotated ``datasets.Dataset`` with an added score column.
@@ -78,6 +118,17 @@ def score_dataset(
     if model is None:
         model = load_model()
 
+    if proxy is not None:
+        from moore_web.qe_proxy import build_features
+
+        features = build_features(
+            dataset, src_field=src_field, tgt_field=tgt_field, laser_field=proxy.laser_field
+        )
+        scores, from_proxy = _score_with_proxy(
+            dataset[src_field], dataset[tgt_field], features, proxy, model, batch_size, gpus
+        )
+        return dataset.add_column(output_field, scores).add_column(f"{output_field}_from_proxy", from_proxy)
+
     def _score_batch(batch: dict) -> dict:
         data = [{"src": s, "mt": t} for s, t in zip(batch[src_field], batch[tgt_field])]
         output = model.predict(data, batch_size=batch_size, gpus=gpus)
@@ -88,6 +139,33 @@ def score_dataset(
     return dataset.map(_score_batch, batched=True, desc="comet-qe")
 
 
+def _score_with_proxy(
+    src_texts: list[str],
+    mt_texts: list[str],
+    features,
+    proxy,
+    model,
+    batch_size: int,
+    gpus: int,
+) -> tuple[list[float], list[bool]]:
+    """Run COMET only on rows the proxy leaves undecided; fill the rest with proxy predictions."""
+    from moore_web.qe_proxy import UNSURE, print_triage_summary
+
+    decisions, preds = proxy.triage(features)
+    print_triage_summary(decisions)
+    scores = [round(float(p), 4) for p in preds]
+    from_proxy = [True] * len(scores)
+
+    unsure = [i for i, d in enumerate(decisions) if d == UNSURE]
+    if unsure:
+        data = [{"src": src_texts[i], "mt": mt_texts[i]} for i in unsure]
+        output = model.predict(data, batch_size=batch_size, gpus=gpus)
+        for i, qe_score in zip(unsure, output.scores):
+            scores[i] = round(float(qe_score), 4)
+            from_proxy[i] = False
+    return scores, from_proxy
+
+
 def score_file(
     path: Path,
     output_path: Path,
@@ -97,6 +175,7 @@ def score_file(
     gpus: int,
     model,
     output_field: str | None = None,
+    proxy=None,
 ) -> None:
     rows = []
     with open(path, encoding="utf-8") as f:
@@ -112,20 +191,32 @@ def score_file(
     if output_field is None:
         output_field = f"comet_qe_{src_field}_{mt_field}"
 
-    data = [{"src": r[src_field], "mt": r[mt_field]} for r in rows]
-
-    print(f"Scoring {len(data)} pairs from {path.name} …")
-    output = model.predict(data, batch_size=batch_size, gpus=gpus)
+    print(f"Scoring {len(rows)} pairs from {path.name} …")
+    if proxy is not None:
+        from moore_web.qe_proxy import build_features
 
-    for row, qe_score in zip(rows, output.scores):
-        row[output_field] = round(float(qe_score), 4)
+        columns = {k: [r.get(k) for r in rows] for k in rows[0]}
+        features = build_features(
+            columns, src_field=src_field, tgt_field=mt_field, laser_field=proxy.laser_field
+        )
+        scores, from_proxy = _score_with_proxy(
+            columns[src_field], columns[mt_field], features, proxy, model, batch_size, gpus
+        )
+        for row, qe_score, flag in zip(rows, scores, from_proxy):
+            row[output_field] = qe_score
+            row[f"{output_field}_from_proxy"] = flag
+    else:
+        data = [{"src": r[src_field], "mt": r[mt_field]} for r in rows]
+        output = model.predict(data, batch_size=batch_size, gpus=gpus)
+        scores = output.scores
+        for row, qe_score in zip(rows, scores):
+            row[output_field] = round(float(qe_score), 4)
 
     output_path.parent.mkdir(parents=True, exist_ok=True)
     with open(output_path, "w", encoding="utf-8") as f:
         for row in rows:
             f.write(json.dumps(row, ensure_ascii=False) + "\n")
 
-    scores = output.scores
     print(
         f"  → {output_path.name}  "
         f"mean={statistics.mean(scores):.4f}  "
@@ -185,9 +276,21 @@ if __name__ == "__main__":
         default=1,
         help="Number of GPUs to use; set 0 for CPU (default: %(default)s).",
     )
+    parser.add_argument(
+        "--proxy",
+        default=None,
+        metavar="PATH",
+        help="Trained QE proxy (moore_web.qe_proxy); COMET only scores pairs the proxy is unsure about.",
+    )
     args = parser.parse_args()
 
     model = load_model()
+    proxy = None
+    if args.proxy:
+        from moore_web.qe_proxy import QEProxy, print_report
+
+        proxy = QEProxy.load(args.proxy)
+        print_report(proxy)
     single_input = len(args.inputs) == 1
 
     for input_str in args.inputs:
@@ -212,4 +315,5 @@ if __name__ == "__main__":
             batch_size=args.batch_size,
             gpus=args.gpus,
             model=model,
+            proxy=proxy,
         )
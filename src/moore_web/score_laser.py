@@ -7,14 +7,31 @@ reusing already-loaded models.
 See also ``score_mt_datasets.score_aligned_pairs`` for a list-based API that
 filters pairs below a minimum score and returns an ``AlignedCorpus``.
 
+Embeddings can be cached on disk with ``cache_dir``: one sub-directory per
+LASER language holding append-only shards — ``<shard>.keys.npy`` (sorted
+64-bit text hashes) and ``<shard>.vectors.npy`` (the aligned float32
+embeddings) — listed in ``manifest.json``.  Shards are opened memory-mapped,
+so later stages (e.g. semantic deduplication) can reuse the vectors without
+re-encoding; :func:`compact_cache` merges them into one.
+
 Usage
 -----
     from moore_web.score_laser import score_dataset
     ds = score_dataset(dataset, src_field="french", tgt_field="moore")
+
+    # Reuse / fill an embedding cache
+    ds = score_dataset(dataset, src_field="french", tgt_field="moore", cache_dir="laser_cache")
+
+    # Merge the cache shards written by many runs
+    from moore_web.score_laser import compact_cache
+    compact_cache("laser_cache", "mos")
 """
 
 from __future__ import annotations
 
+import json
+from pathlib import Path
+
 import numpy as np
 
 # Known field-name → LASER language code mappings for this project.
@@ -52,13 +69,171 @@ def load_encoders(src_lang: str = "fra", tgt_lang: str = "mos"):
     """
     from laser_encoders import LaserEncoderPipeline
 
+    from moore_web.model_registry import laser_kwargs
+
     print(f"Loading LASER {src_lang} model…")
-    laser_src = LaserEncoderPipeline(lang=src_lang)
+    laser_src = LaserEncoderPipeline(lang=src_lang, **laser_kwargs(src_lang))
     print(f"Loading LASER {tgt_lang} model…")
-    laser_tgt = LaserEncoderPipeline(lang=tgt_lang)
+    laser_tgt = LaserEncoderPipeline(lang=tgt_lang, **laser_kwargs(tgt_lang))
     return laser_src, laser_tgt
 
 
+def encode_in_pool(texts: list[str], lang: str) -> np.ndarray:
+    """:class:`~moore_web.worker_pool.WorkerPool` task: unit-norm embeddings from the pool's ``laser-<lang>``."""
+    from moore_web.worker_pool import model
+
+    return model(f"laser-{lang}").encode_sentences(texts, normalize_embeddings=True)
+
+
+# ---------------------------------------------------------------------------
+# Embedding cache
+# ---------------------------------------------------------------------------
+
+
+def _read_manifest(lang_dir: Path) -> dict:
+    path = lang_dir / "manifest.json"
+    if not path.exists():
+        return {"generation": 0, "dim": None, "shards": []}
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def _write_manifest(lang_dir: Path, manifest: dict) -> None:
+    tmp = lang_dir / "manifest.tmp.json"
+    tmp.write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+    tmp.replace(lang_dir / "manifest.json")
+
+
+def _shard_paths(lang_dir: Path, name: str) -> tuple[Path, Path]:
+    return lang_dir / f"{name}.keys.npy", lang_dir / f"{name}.vectors.npy"
+
+
+def _open_shard(lang_dir: Path, name: str) -> tuple[np.ndarray, np.ndarray]:
+    keys_path, vectors_path = _shard_paths(lang_dir, name)
+    return np.load(keys_path, mmap_mode="r"), np.load(vectors_path, mmap_mode="r")
+
+
+def _add_shard(lang_dir: Path, manifest: dict, keys: np.ndarray, vectors: np.ndarray) -> dict:
+    """Write a sorted ``keys`` / ``vectors`` shard, then publish it in a new manifest generation."""
+    generation = manifest["generation"] + 1
+    name = f"shard-{generation:06d}"
+    lang_dir.mkdir(parents=True, exist_ok=True)
+    for path, array in zip(_shard_paths(lang_dir, name), (keys, vectors)):
+        tmp = path.with_name(path.name.replace(".npy", ".tmp.npy"))
+        np.save(tmp, array)
+        tmp.replace(path)
+    # The shard only becomes visible once the manifest is replaced: a crash
+    # before that leaves an unreferenced shard, never mismatched keys/vectors.
+    manifest = {"generation": generation, "dim": int(vectors.shape[1]), "shards": [*manifest["shards"], name]}
+    _write_manifest(lang_dir, manifest)
+    return manifest
+
+
+def encode_cached(encoder, texts: list[str], lang: str, cache_dir: str | Path | None = None) -> np.ndarray:
+    """Encode *texts* with a LASER encoder, reusing embeddings cached under *cache_dir*.
+
+    Texts are keyed by their 64-bit hash (:func:`moore_web.text_hash.hash_texts`);
+    each distinct text is encoded at most once.  Cached shards are only read
+    through memory maps and newly encoded texts are appended as a new shard,
+    so a call costs memory and I/O proportional to *texts*, not to the cache.
+    Without *cache_dir* this is a plain
+    ``encoder.encode_sentences(texts, normalize_embeddings=True)``.
+
+    Returns:
+        ``(len(texts), dim)`` float32 array of L2-normalised embeddings.
+    """
+    if cache_dir is None or not len(texts):
+        return encoder.encode_sentences(texts, normalize_embeddings=True)
+
+    from moore_web.text_hash import hash_texts
+
+    lang_dir = Path(cache_dir) / lang
+    manifest = _read_manifest(lang_dir)
+
+    uniq, first, inverse = np.unique(hash_texts(texts), return_index=True, return_inverse=True)
+    found = np.zeros(len(uniq), dtype=bool)
+    hits = []  # (shard name, rows of uniq, rows of the shard)
+    for name in manifest["shards"]:
+        keys, _ = _open_shard(lang_dir, name)
+        if not len(keys):
+            continue
+        pending = np.flatnonzero(~found)
+        pos = np.minimum(np.searchsorted(keys, uniq[pending]), len(keys) - 1)
+        hit = keys[pos] == uniq[pending]
+        if hit.any():
+            hits.append((name, pending[hit], pos[hit]))
+            found[pending[hit]] = True
+    missing = np.flatnonzero(~found)
+    print(f"LASER cache [{lang}]: {int(found.sum()):,} cached, {len(missing):,} to encode.")
+
+    new_vectors = None
+    if len(missing):
+        new_vectors = np.asarray(
+            encoder.encode_sentences([texts[i] for i in first[missing]], normalize_embeddings=True),
+            dtype=np.float32,
+        )
+    dim = new_vectors.shape[1] if new_vectors is not None else manifest["dim"]
+
+    out = np.empty((len(uniq), dim), dtype=np.float32)
+    for name, rows, pos in hits:
+        _, vectors = _open_shard(lang_dir, name)
+        out[rows] = vectors[pos]
+    if new_vectors is not None:
+        out[missing] = new_vectors
+        _add_shard(lang_dir, manifest, uniq[missing], new_vectors)  # uniq is sorted
+    return out[inverse.reshape(-1)]
+
+
+def compact_cache(cache_dir: str | Path, lang: str, chunk_rows: int = 65_536) -> int:
+    """Merge all shards of *lang* under *cache_dir* into one; returns the number of cached texts.
+
+    Lookups cost one binary search per shard, so run this once after large
+    encoding jobs.  Vectors are copied *chunk_rows* at a time into a memory-mapped
+    output, and the old shards are deleted only after the new manifest is written.
+    """
+    lang_dir = Path(cache_dir) / lang
+    manifest = _read_manifest(lang_dir)
+    old = manifest["shards"]
+    if len(old) <= 1:
+        return sum(len(_open_shard(lang_dir, name)[0]) for name in old)
+
+    shards = [_open_shard(lang_dir, name) for name in old]
+    offsets = np.cumsum([0] + [len(keys) for keys, _ in shards])
+    keys = np.concatenate([np.asarray(k) for k, _ in shards])
+    order = np.argsort(keys, kind="stable")
+
+    generation = manifest["generation"] + 1
+    name = f"shard-{generation:06d}"
+    keys_path, vectors_path = _shard_paths(lang_dir, name)
+    tmp_vectors = vectors_path.with_name(vectors_path.name.replace(".npy", ".tmp.npy"))
+    merged = np.lib.format.open_memmap(
+        tmp_vectors, mode="w+", dtype=np.float32, shape=(len(keys), manifest["dim"])
+    )
+    for start in range(0, len(keys), chunk_rows):
+        idx = order[start : start + chunk_rows]
+        shard_of = np.searchsorted(offsets, idx, side="right") - 1
+        for s in np.unique(shard_of):
+            sel = shard_of == s
+            merged[start + np.flatnonzero(sel)] = shards[s][1][idx[sel] - offsets[s]]
+    merged.flush()
+    del merged, shards
+    tmp_vectors.replace(vectors_path)
+    tmp_keys = keys_path.with_name(keys_path.name.replace(".npy", ".tmp.npy"))
+    np.save(tmp_keys, keys[order])
+    tmp_keys.replace(keys_path)
+    _write_manifest(lang_dir, {"generation": generation, "dim": manifest["dim"], "shards": [name]})
+
+    for old_name in old:
+        for path in _shard_paths(lang_dir, old_name):
+            path.unlink(missing_ok=True)
+    print(f"LASER cache [{lang}]: compacted {len(old)} shards into {len(keys):,} rows.")
+    return len(keys)
+
+
+# ---------------------------------------------------------------------------
+# Dataset scoring
+# ---------------------------------------------------------------------------
+
+
 def score_dataset(
     dataset,
     src_field: str = "french",
@@ -68,6 +243,7 @@ def score_dataset(
     output_field: str | None = None,
     encoder_src=None,
     encoder_tgt=None,
+    cache_dir: str | Path | None = None,
 ):
     """Add LASER cosine-similarity scores to every row of a HuggingFace ``Dataset``.
 
@@ -93,6 +269,7 @@ def score_dataset(
                       automatically if ``None``.
         encoder_tgt:  Pre-loaded target ``LaserEncoderPipeline``; loaded
                       automatically if ``None``.
+        cache_dir:    Optional embedding cache directory (see :func:`encode_cached`).
 
     Returns:
         Annotated ``datasets.Dataset`` with an added score column.
@@ -115,9 +292,9 @@ def score_dataset(
     tgt_texts: list[str] = dataset[tgt_field]
 
     print(f"Encoding {len(src_texts):,} source sentences…")
-    src_embs: np.ndarray = encoder_src.encode_sentences(src_texts, normalize_embeddings=True)
+    src_embs: np.ndarray = encode_cached(encoder_src, src_texts, src_lang, cache_dir)
     print(f"Encoding {len(tgt_texts):,} target sentences…")
-    tgt_embs: np.ndarray = encoder_tgt.encode_sentences(tgt_texts, normalize_embeddings=True)
+    tgt_embs: np.ndarray = encode_cached(encoder_tgt, tgt_texts, tgt_lang, cache_dir)
 
     # Dot product on unit vectors == cosine similarity
     scores = [round(float(s), 4) for s in (src_embs * tgt_embs).sum(axis=1).tolist()]
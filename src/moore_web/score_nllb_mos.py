@@ -103,9 +103,10 @@ def score_and_upload(
                            contains ``mos_Latn``).  Other rows are kept in the
                            dataset with ``comet_qe_en_mos=None``.
     """
-    from comet import download_model, load_from_checkpoint
     from datasets import Dataset, DatasetDict, load_dataset
 
+    from moore_web.score_comet_qe import load_model
+
     if source_repo:
         ds = load_dataset(source_repo, split="train")
     else:
@@ -119,8 +120,7 @@ def score_and_upload(
     if rows_slice is not None:
         ds = ds.select(range(*rows_slice.indices(len(ds))))
 
-    print("Loading COMET-QE model (McGill-NLP/ssa-comet-qe)…")
-    model = load_from_checkpoint(download_model("McGill-NLP/ssa-comet-qe"))
+    model = load_model()
 
     score_fn = partial(
         _score_batch,
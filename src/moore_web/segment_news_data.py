@@ -2,15 +2,27 @@
 
 Each entry is expected to have a ``text_units`` list.  This module
 provides the pure segmentation logic (no ML dependencies).  Pair it
-with :mod:`moore_web.lang_id` to first annotate entries with
+with :mod:`moore_web.lid` to first annotate entries with
 ``text_unit_langs`` / ``text_unit_probs``.
 
+Entries are processed as a stream (:func:`segment_stream`): they are read one
+at a time (JSONL input is never loaded whole), language ID runs on batches of
+about ``batch_texts`` text units gathered across articles, and segmented
+entries are written out as soon as their batch is done.  Memory stays bounded
+by one batch however large the corpus grows.  ``.jsonl`` outputs get one entry
+per line; ``.json`` outputs keep the previous indented list format.
+
 Usage (CLI):
     uv run python -m moore_web.segment_news_data -j raamde_corpus.json -o out.json
     uv run python -m moore_web.segment_news_data -j raamde_corpus.json --no-lang-id
+    uv run python -m moore_web.segment_news_data -j raamde_corpus.json --lid-model ensemble
+    uv run python -m moore_web.segment_news_data -j raamde_corpus.jsonl -o out.jsonl --batch-texts 100000
 """
 
+import json
 import re
+from collections.abc import Callable, Iterable, Iterator
+from pathlib import Path
 
 MOORE_END_MARKERS = [
     r"^Kibar[aã]\s+yii",
@@ -74,9 +86,86 @@ def segment_entries(entries: list[dict]) -> list[dict]:
     return entries
 
 
+# ---------------------------------------------------------------------------
+# Streaming
+# ---------------------------------------------------------------------------
+
+
+def read_entries(path: str | Path) -> Iterator[dict]:
+    """Yield corpus entries from a JSONL file (one per line) or a JSON list.
+
+    JSONL is read line by line; a ``.json`` list has to be parsed whole first.
+    """
+    path = Path(path)
+    with open(path, encoding="utf-8") as f:
+        if path.suffix != ".jsonl":
+            yield from json.load(f)
+            return
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def segment_stream(
+    entries: Iterable[dict],
+    predict_fn: Callable | None = None,
+    batch_texts: int = 50_000,
+    drop_debug: bool = False,
+) -> Iterator[dict]:
+    """Annotate (when *predict_fn* is given) and segment *entries*, yielding them in order.
+
+    Entries are buffered until their multi-unit articles hold *batch_texts*
+    text units; each buffer is one :func:`moore_web.lid.annotate_text_units`
+    call.  With *drop_debug*, ``text_unit_langs`` / ``text_unit_probs`` are
+    removed before the entries are yielded.
+    """
+    from moore_web.lid import annotate_text_units
+
+    def _flush(buffer: list[dict]) -> list[dict]:
+        if predict_fn is not None:
+            annotate_text_units(buffer, predict_fn, decimals=4)
+        segment_entries(buffer)
+        if drop_debug:
+            for item in buffer:
+                item.pop("text_unit_langs", None)
+                item.pop("text_unit_probs", None)
+        return buffer
+
+    buffer: list[dict] = []
+    pending = 0
+    for item in entries:
+        buffer.append(item)
+        units = len(item.get("text_units") or [])
+        pending += units if units > 1 else 0
+        if pending >= batch_texts:
+            yield from _flush(buffer)
+            buffer, pending = [], 0
+    if buffer:
+        yield from _flush(buffer)
+
+
+def write_entries(entries: Iterable[dict], path: str | Path) -> int:
+    """Write *entries* as they arrive and return how many were written.
+
+    ``.jsonl`` paths get one entry per line; other paths get the same indented
+    JSON list as ``json.dump(entries, f, indent=2)``.
+    """
+    path = Path(path)
+    n = 0
+    with open(path, "w", encoding="utf-8") as f:
+        if path.suffix == ".jsonl":
+            for n, item in enumerate(entries, 1):
+                f.write(json.dumps(item, ensure_ascii=False) + "\n")
+            return n
+        for n, item in enumerate(entries, 1):
+            body = json.dumps(item, ensure_ascii=False, indent=2).replace("\n", "\n  ")
+            f.write(("[\n  " if n == 1 else ",\n  ") + body)
+        f.write("\n]" if n else "[]")
+    return n
+
+
 if __name__ == "__main__":
     import argparse
-    import json
 
     parser = argparse.ArgumentParser(
         description="Annotate and segment bilingual Moore/French news entries.",
@@ -85,19 +174,34 @@ if __name__ == "__main__":
         "--json",
         "-j",
         required=True,
-        help="Path to JSON file containing list of entries with text_units.",
+        help="Path to a JSONL file (one entry per line) or a JSON list of entries with text_units.",
     )
     parser.add_argument(
         "--output",
         "-o",
         default="corpus_segmented.json",
-        help="Output path for annotated JSON (default: %(default)s).",
+        help="Output path; .jsonl writes one entry per line (default: %(default)s).",
     )
     parser.add_argument(
         "--no-lang-id",
         action="store_true",
         help="Skip lang ID prediction (use if text_unit_langs already present).",
     )
+    parser.add_argument(
+        "--lid-model",
+        choices=["glotlid", "meag", "ensemble"],
+        default="glotlid",
+        help=(
+            "Language ID model; 'ensemble' sends only the texts MEAG is unsure of to GlotLID "
+            "(default: %(default)s)."
+        ),
+    )
+    parser.add_argument(
+        "--batch-texts",
+        type=int,
+        default=50_000,
+        help="Text units per language ID call, gathered across articles (default: %(default)s).",
+    )
     parser.add_argument(
         "--drop-debug",
         action="store_true",
@@ -105,21 +209,14 @@ if __name__ == "__main__":
     )
     args = parser.parse_args()
 
-    with open(args.json, encoding="utf-8") as f:
-        corpus = json.load(f)
-
+    predict_fn = None
     if not args.no_lang_id:
-        from moore_web.glotlid import annotate_text_units
-
-        corpus = annotate_text_units(corpus)
+        from moore_web.lid import load_predictor
 
-    corpus = segment_entries(corpus)
+        predict_fn = load_predictor(args.lid_model)
 
-    if args.drop_debug:
-        for item in corpus:
-            item.pop("text_unit_langs", None)
-            item.pop("text_unit_probs", None)
-
-    with open(args.output, "w", encoding="utf-8") as f:
-        json.dump(corpus, f, ensure_ascii=False, indent=2)
-    print(f"Wrote {len(corpus)} entries → {args.output}")
+    stream = segment_stream(
+        read_entries(args.json), predict_fn, batch_texts=args.batch_texts, drop_debug=args.drop_debug
+    )
+    n = write_entries(stream, args.output)
+    print(f"Wrote {n} entries → {args.output}")
@@ -0,0 +1,239 @@
+"""Embedding-based semantic near-duplicate removal for combined parallel datasets.
+
+Two rows are *semantic near-duplicates* when both their French and their
+Mooré LASER embeddings have a cosine similarity of at least ``threshold``.
+Near-duplicate pairs are linked into clusters (connected components) and one
+representative per cluster is kept, chosen by a configurable priority such as
+``("source", "comet_qe", "laser_score")``.
+
+Candidate search never materialises the full ``n × n`` similarity matrix:
+
+- ``"exact"`` — blocked matrix multiplies over ``block_size × block_size``
+  tiles of the upper triangle.
+- ``"ivf"`` — a coarse quantizer: k-means centroids (~``sqrt(n)``) over the
+  concatenated embeddings; each row is only compared with the rows assigned
+  to its ``nprobe`` nearest cells.  Approximate, but scales to hundreds of
+  thousands of rows on CPU.
+- ``"auto"`` (default) — ``"exact"`` up to ``exact_max_rows`` rows, ``"ivf"`` above.
+
+Memory stays bounded by the embeddings themselves plus one tile.
+
+Usage
+-----
+    from moore_web.score_laser import encode_cached, load_encoders
+    from moore_web.semantic_dedup import semantic_dedup
+
+    laser_fr, laser_mo = load_encoders("fra", "mos")
+    fr_embs = encode_cached(laser_fr, [r["french"] for r in rows], "fra", "laser_cache")
+    mo_embs = encode_cached(laser_mo, [r["moore"] for r in rows], "mos", "laser_cache")
+    kept, clusters = semantic_dedup(rows, fr_embs, mo_embs, threshold=0.95)
+"""
+
+from __future__ import annotations
+
+import math
+from collections.abc import Sequence
+
+import numpy as np
+
+DEFAULT_PRIORITY: tuple[str, ...] = ("source", "comet_qe", "laser_score")
+
+
+# ---------------------------------------------------------------------------
+# Candidate search
+# ---------------------------------------------------------------------------
+
+
+def _tile_edges(
+    fr: np.ndarray,
+    mo: np.ndarray,
+    q_idx: np.ndarray,
+    k_idx: np.ndarray,
+    threshold: float,
+    block_size: int,
+    upper_only: bool = False,
+) -> list[tuple[np.ndarray, np.ndarray]]:
+    """Return ``(i, j)`` index arrays of row pairs whose min(fr, mo) cosine >= *threshold*."""
+    edges = []
+    for qs in range(0, len(q_idx), block_size):
+        qi = q_idx[qs : qs + block_size]
+        fq, mq = fr[qi], mo[qi]
+        k_start = qs if upper_only else 0
+        for ks in range(k_start, len(k_idx), block_size):
+            ki = k_idx[ks : ks + block_size]
+            sim = fq @ fr[ki].T
+            np.minimum(sim, mq @ mo[ki].T, out=sim)
+            hit = sim >= threshold
+            if upper_only and ks == qs:
+                hit = np.triu(hit, k=1)
+            a, b = np.nonzero(hit)
+            if len(a):
+                edges.append((qi[a], ki[b]))
+    return edges
+
+
+def _ivf_edges(
+    fr: np.ndarray,
+    mo: np.ndarray,
+    threshold: float,
+    block_size: int,
+    nprobe: int,
+    n_cells: int | None,
+    seed: int,
+) -> list[tuple[np.ndarray, np.ndarray]]:
+    from sklearn.cluster import MiniBatchKMeans
+
+    n = len(fr)
+    n_cells = n_cells or max(1, int(math.sqrt(n)))
+    nprobe = min(nprobe, n_cells)
+    rng = np.random.default_rng(seed)
+    sample = rng.choice(n, size=min(n, max(50 * n_cells, 10_000)), replace=False)
+    kmeans = MiniBatchKMeans(n_clusters=n_cells, random_state=seed, n_init=3, batch_size=4096)
+    kmeans.fit(np.hstack([fr[sample], mo[sample]]))
+    dim = fr.shape[1]
+    c_fr = np.ascontiguousarray(kmeans.cluster_centers_[:, :dim], dtype=fr.dtype)
+    c_mo = np.ascontiguousarray(kmeans.cluster_centers_[:, dim:], dtype=mo.dtype)
+
+    primary = np.empty(n, dtype=np.int64)
+    probes = np.empty((n, nprobe), dtype=np.int64)
+    for s in range(0, n, block_size):
+        scores = fr[s : s + block_size] @ c_fr.T + mo[s : s + block_size] @ c_mo.T
+        top = np.argpartition(-scores, nprobe - 1, axis=1)[:, :nprobe]
+        probes[s : s + block_size] = top
+        primary[s : s + block_size] = scores.argmax(axis=1)
+
+    members_order = np.argsort(primary, kind="stable")
+    member_bounds = np.searchsorted(primary[members_order], np.arange(n_cells + 1))
+    probe_rows = np.repeat(np.arange(n), nprobe)
+    probe_cells = probes.reshape(-1)
+    query_order = np.argsort(probe_cells, kind="stable")
+    query_bounds = np.searchsorted(probe_cells[query_order], np.arange(n_cells + 1))
+
+    edges = []
+    for c in range(n_cells):
+        members = members_order[member_bounds[c] : member_bounds[c + 1]]
+        queries = probe_rows[query_order[query_bounds[c] : query_bounds[c + 1]]]
+        if len(members) and len(queries):
+            for a, b in _tile_edges(fr, mo, queries, members, threshold, block_size):
+                keep = a != b
+                edges.append((a[keep], b[keep]))
+    return edges
+
+
+def find_semantic_clusters(
+    fr_embs: np.ndarray,
+    mo_embs: np.ndarray,
+    threshold: float = 0.95,
+    method: str = "auto",
+    block_size: int = 2048,
+    exact_max_rows: int = 50_000,
+    nprobe: int = 2,
+    n_cells: int | None = None,
+    seed: int = 0,
+) -> np.ndarray:
+    """Return a cluster id per row; rows linked by near-duplicate edges share an id.
+
+    Args:
+        fr_embs:        ``(n, d)`` L2-normalised French embeddings.
+        mo_embs:        ``(n, d)`` L2-normalised Mooré embeddings.
+        threshold:      Minimum cosine similarity required on **both** sides.
+        method:         ``"exact"``, ``"ivf"`` or ``"auto"``.
+        block_size:     Tile size for the blocked matrix multiplies.
+        exact_max_rows: ``"auto"`` switches to ``"ivf"`` above this many rows.
+        nprobe:         Number of nearest coarse cells each row is compared against (ivf).
+        n_cells:        Number of coarse cells (ivf); defaults to ``sqrt(n)``.
+        seed:           Random seed for the k-means sample (ivf).
+    """
+    from scipy.sparse import coo_matrix
+    from scipy.sparse.csgraph import connected_components
+
+    fr = np.ascontiguousarray(fr_embs, dtype=np.float32)
+    mo = np.ascontiguousarray(mo_embs, dtype=np.float32)
+    n = len(fr)
+    if n == 0:
+        return np.empty(0, dtype=np.int64)
+
+    if method == "auto":
+        method = "exact" if n <= exact_max_rows else "ivf"
+    if method == "exact":
+        rows = np.arange(n)
+        edges = _tile_edges(fr, mo, rows, rows, threshold, block_size, upper_only=True)
+    elif method == "ivf":
+        edges = _ivf_edges(fr, mo, threshold, block_size, nprobe, n_cells, seed)
+    else:
+        raise ValueError(f"Unknown method {method!r}; expected 'exact', 'ivf' or 'auto'.")
+
+    a = np.concatenate([e[0] for e in edges]) if edges else np.empty(0, dtype=np.int64)
+    b = np.concatenate([e[1] for e in edges]) if edges else np.empty(0, dtype=np.int64)
+    graph = coo_matrix((np.ones(len(a), dtype=np.int8), (a, b)), shape=(n, n))
+    _, labels = connected_components(graph.tocsr(), directed=False)
+    return labels
+
+
+# ---------------------------------------------------------------------------
+# Representative selection
+# ---------------------------------------------------------------------------
+
+
+def _priority_key(row: dict, priority: Sequence[str], source_rank: dict[str, int]) -> tuple:
+    key = []
+    for name in priority:
+        if name == "source":
+            key.append(source_rank.get(row.get("source"), len(source_rank)))
+        else:
+            value = row.get(name)
+            key.append(math.inf if value is None else -float(value))
+    return tuple(key)
+
+
+def select_representatives(
+    rows: list[dict],
+    clusters: np.ndarray,
+    priority: Sequence[str] = DEFAULT_PRIORITY,
+    source_order: Sequence[str] = (),
+) -> np.ndarray:
+    """Return a boolean keep-mask with exactly one ``True`` per cluster.
+
+    The kept row is the one with the best priority key: for ``"source"`` the
+    position in *source_order* (earlier wins, unknown sources last); for any
+    other field the highest value (``None`` last).  Ties keep the first row.
+    """
+    source_rank = {s: i for i, s in enumerate(source_order)}
+    best: dict[int, tuple[tuple, int]] = {}
+    for i, (row, cluster) in enumerate(zip(rows, clusters.tolist())):
+        key = _priority_key(row, priority, source_rank)
+        if cluster not in best or key < best[cluster][0]:
+            best[cluster] = (key, i)
+    keep = np.zeros(len(rows), dtype=bool)
+    keep[[i for _, i in best.values()]] = True
+    return keep
+
+
+def semantic_dedup(
+    rows: list[dict],
+    fr_embs: np.ndarray,
+    mo_embs: np.ndarray,
+    threshold: float = 0.95,
+    priority: Sequence[str] = DEFAULT_PRIORITY,
+    source_order: Sequence[str] = (),
+    **search_kwargs,
+) -> tuple[list[dict], np.ndarray]:
+    """Drop semantic near-duplicates, keeping one representative per cluster.
+
+    Args:
+        rows:          Row dicts aligned with the embeddings.
+        fr_embs:       French LASER embeddings (one per row).
+        mo_embs:       Mooré LASER embeddings (one per row).
+        threshold:     Minimum cosine similarity on both sides to link two rows.
+        priority:      Fields ranking the rows of a cluster (see :func:`select_representatives`).
+        source_order:  Preferred sources, best first, used by the ``"source"`` priority.
+        search_kwargs: Forwarded to :func:`find_semantic_clusters`.
+
+    Returns:
+        ``(kept_rows, clusters)`` — the surviving rows (original order) and the
+        cluster id of every input row.
+    """
+    clusters = find_semantic_clusters(fr_embs, mo_embs, threshold=threshold, **search_kwargs)
+    keep = select_representatives(rows, clusters, priority=priority, source_order=source_order)
+    kept = [r for r, k in zip(rows, keep.tolist()) if k]
+    return kept, clusters
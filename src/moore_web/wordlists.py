@@ -4,10 +4,47 @@ Provides helpers to fetch GlotLID discriminative n-gram lists and
 pyspellchecker full-vocabulary dictionaries, plus a high-level builder
 that constructs the foreign-word exclusion set used by quality-warning
 checks.
+
+Building that set downloads wordlists and loads spellchecker dictionaries,
+which dominates run time on small inputs.  The final set is therefore
+compiled once into a versioned artifact — a sorted ``uint64`` array of
+FNV-1a word hashes (``.npy``) plus a JSON sidecar — that
+:func:`load_foreign_wordlist` memory-maps in milliseconds.  The sidecar records
+the revision of the upstream sources (the HF wordlist dataset commit and the
+pyspellchecker version).  Opening the artifact never contacts the Hub;
+freshness is checked by ``info``, and by :func:`load_foreign_wordlist` only
+with ``check_sources=True``, which recompiles when a source has changed.
+
+Usage
+-----
+    # Compile (or refresh) the artifact under $MOORE_WEB_CACHE (~/.cache/moore_web)
+    python -m moore_web.wordlists compile
+
+    # Inspect it and check whether its sources have changed
+    python -m moore_web.wordlists info
+
+    from moore_web.wordlists import load_foreign_wordlist
+    foreign = load_foreign_wordlist()   # compiles on first use
+    "maison" in foreign
 """
 
 from __future__ import annotations
 
+import argparse
+import json
+from datetime import date
+from pathlib import Path
+
+import numpy as np
+
+from moore_web.cache import cache_root
+from moore_web.text_hash import hash_text, hash_texts
+
+WORDLIST_FORMAT_VERSION = 1
+_HASH_NAME = "fnv1a64"
+
+_GLOTLID_WORDLISTS_REPO = "madoss/mos-eng-fra-wordlists"
+
 # GlotLID language code → pyspellchecker language code
 _SPELLCHECKER_LANG_MAP = {"fra_Latn": "fr", "eng_Latn": "en", "spa_Latn": "es", "deu_Latn": "de"}
 
@@ -27,7 +64,7 @@ def load_glotlid_wordlists(languages: list[str]) -> set[str]:
     words: set[str] = set()
     for lang in languages:
         try:
-            ds = load_dataset("madoss/mos-eng-fra-wordlists", split=lang)
+            ds = load_dataset(_GLOTLID_WORDLISTS_REPO, split=lang)
             for row in ds:
                 word = row.get("text") or row.get("word", "")
                 if word:
@@ -99,3 +136,216 @@ def build_foreign_wordlist(
         f"({len(raw_foreign) - len(foreign):,} removed as Mooré overlap)."
     )
     return foreign
+
+
+# ---------------------------------------------------------------------------
+# Compiled artifact
+# ---------------------------------------------------------------------------
+
+
+class CompiledWordlist:
+    """Set-like view over a sorted array of 64-bit word hashes.
+
+    Supports ``in``, ``len`` and truthiness like the ``set[str]`` it replaces,
+    plus :meth:`contains_many` for vectorised lookups.  Words cannot be listed
+    back.  With a few hundred thousand words the chance of a hash collision
+    flagging an unrelated token is ~1e-14 per lookup.
+    """
+
+    def __init__(self, hashes: np.ndarray, meta: dict | None = None):
+        self.hashes = hashes
+        self.meta = meta or {}
+
+    @classmethod
+    def from_words(cls, words, meta: dict | None = None) -> CompiledWordlist:
+        return cls(np.unique(hash_texts(sorted(words))), meta)
+
+    def __len__(self) -> int:
+        return len(self.hashes)
+
+    def __bool__(self) -> bool:
+        return len(self.hashes) > 0
+
+    def __contains__(self, word: object) -> bool:
+        if not isinstance(word, str) or not len(self.hashes):
+            return False
+        h = np.uint64(hash_text(word))
+        pos = int(np.searchsorted(self.hashes, h))
+        return pos < len(self.hashes) and self.hashes[pos] == h
+
+    def contains_many(self, words) -> np.ndarray:
+        """Return a boolean array: membership of every string in *words* (list or Arrow array)."""
+        queries = hash_texts(words)
+        if not len(self.hashes):
+            return np.zeros(len(queries), dtype=bool)
+        pos = np.minimum(np.searchsorted(self.hashes, queries), len(self.hashes) - 1)
+        return self.hashes[pos] == queries
+
+    def save(self, path: str | Path) -> Path:
+        """Write ``<path>`` (hashes) and ``<path>.json`` (metadata) atomically."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        meta = {
+            **self.meta,
+            "format_version": WORDLIST_FORMAT_VERSION,
+            "hash": _HASH_NAME,
+            "n_words": len(self),
+        }
+        tmp = path.with_name(path.name + ".tmp.npy")
+        np.save(tmp, np.ascontiguousarray(self.hashes, dtype=np.uint64))
+        tmp.replace(path)
+        _meta_path(path).write_text(json.dumps(meta, indent=2), encoding="utf-8")
+        return path
+
+    @classmethod
+    def load(cls, path: str | Path) -> CompiledWordlist:
+        """Memory-map a compiled wordlist; raises ``ValueError`` on a format mismatch."""
+        path = Path(path)
+        meta = json.loads(_meta_path(path).read_text(encoding="utf-8"))
+        if meta.get("format_version") != WORDLIST_FORMAT_VERSION or meta.get("hash") != _HASH_NAME:
+            raise ValueError(
+                f"{path} has format {meta.get('format_version')}/{meta.get('hash')}, "
+                f"expected {WORDLIST_FORMAT_VERSION}/{_HASH_NAME}."
+            )
+        return cls(np.load(path, mmap_mode="r"), meta)
+
+
+def _meta_path(path: Path) -> Path:
+    return path.with_name(path.name + ".json")
+
+
+def source_revisions(timeout: float = 10.0) -> dict[str, str | None]:
+    """Current revision of each wordlist source; ``None`` when it cannot be determined.
+
+    The wordlist dataset revision needs one Hub request (at most *timeout*
+    seconds); it is skipped when :func:`moore_web.model_registry.is_offline`.
+    """
+    from moore_web.model_registry import is_offline
+
+    revisions: dict[str, str | None] = {"glotlid_wordlists": None, "pyspellchecker": None}
+    if not is_offline():
+        try:
+            from huggingface_hub import HfApi
+
+            revisions["glotlid_wordlists"] = (
+                HfApi().dataset_info(_GLOTLID_WORDLISTS_REPO, timeout=timeout).sha
+            )
+        except Exception as e:
+            print(f"Warning: could not fetch the {_GLOTLID_WORDLISTS_REPO} revision ({e}).")
+    try:
+        from importlib.metadata import version
+
+        revisions["pyspellchecker"] = version("pyspellchecker")
+    except Exception:
+        pass
+    return revisions
+
+
+def _stale_sources(meta: dict, current: dict[str, str | None]) -> list[str]:
+    """Sources whose known current revision differs from the one the artifact was compiled from."""
+    compiled = meta.get("sources") or {}
+    return [name for name, rev in current.items() if rev is not None and compiled.get(name) != rev]
+
+
+def default_wordlist_path(
+    foreign_langs: list[str] | None = None, moore_langs: list[str] | None = None
+) -> Path:
+    """Artifact path for the given language sets under :func:`~moore_web.cache.cache_root`."""
+    foreign = "+".join(foreign_langs or ["fra_Latn", "eng_Latn"])
+    moore = "+".join(moore_langs or ["mos_Latn"])
+    return cache_root() / "wordlists" / f"foreign.{foreign}-minus-{moore}.v{WORDLIST_FORMAT_VERSION}.npy"
+
+
+def compile_foreign_wordlist(
+    path: str | Path | None = None,
+    foreign_langs: list[str] | None = None,
+    moore_langs: list[str] | None = None,
+) -> CompiledWordlist:
+    """Build the foreign-word exclusion set and save it as a compiled artifact."""
+    path = Path(path) if path else default_wordlist_path(foreign_langs, moore_langs)
+    sources = source_revisions()
+    words = build_foreign_wordlist(foreign_langs, moore_langs)
+    meta = {
+        "foreign_langs": foreign_langs or ["fra_Latn", "eng_Latn"],
+        "moore_langs": moore_langs or ["mos_Latn"],
+        "sources": sources,
+        "created": date.today().isoformat(),
+    }
+    compiled = CompiledWordlist.from_words(words, meta)
+    compiled.save(path)
+    print(f"  Compiled {len(compiled):,} foreign words → {path}")
+    return compiled
+
+
+def load_foreign_wordlist(
+    path: str | Path | None = None,
+    foreign_langs: list[str] | None = None,
+    moore_langs: list[str] | None = None,
+    rebuild: bool = False,
+    check_sources: bool = False,
+) -> CompiledWordlist:
+    """Open the compiled foreign wordlist, compiling it first if missing or outdated.
+
+    The artifact is outdated when its format differs.  With *check_sources*
+    it is also outdated when a revision reported by :func:`source_revisions`
+    differs from the one recorded at compile time (sources whose revision
+    cannot be determined are not checked); this costs a Hub request, so it is
+    off by default.
+    """
+    path = Path(path) if path else default_wordlist_path(foreign_langs, moore_langs)
+    if not rebuild and path.exists() and _meta_path(path).exists():
+        try:
+            compiled = CompiledWordlist.load(path)
+            stale = _stale_sources(compiled.meta, source_revisions()) if check_sources else []
+            if not stale:
+                print(
+                    f"  Foreign wordlist: {len(compiled):,} words (compiled {compiled.meta.get('created')})."
+                )
+                return compiled
+            print(f"Warning: {path} was compiled from older {', '.join(stale)} data. Recompiling.")
+        except ValueError as e:
+            print(f"Warning: {e} Recompiling.")
+    return compile_foreign_wordlist(path, foreign_langs, moore_langs)
+
+
+# ---------------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------------
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Compile / inspect the foreign-word exclusion artifact.",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__,
+    )
+    sub = parser.add_subparsers(dest="command", required=True)
+    for name, help_text in [("compile", "Build and save the artifact."), ("info", "Show artifact metadata.")]:
+        p = sub.add_parser(name, help=help_text)
+        p.add_argument("--path", default=None, help="Artifact path (default: under the moore_web cache).")
+        p.add_argument("--foreign-langs", nargs="+", default=None, metavar="LANG")
+        p.add_argument("--moore-langs", nargs="+", default=None, metavar="LANG")
+    return parser
+
+
+def main() -> None:
+    args = _build_parser().parse_args()
+    if args.command == "compile":
+        compile_foreign_wordlist(args.path, args.foreign_langs, args.moore_langs)
+        return
+    path = Path(args.path) if args.path else default_wordlist_path(args.foreign_langs, args.moore_langs)
+    if not path.exists():
+        print(f"No compiled wordlist at {path}. Run: python -m moore_web.wordlists compile")
+        return
+    compiled = CompiledWordlist.load(path)
+    print(f"{path}")
+    print(json.dumps(compiled.meta, indent=2))
+    stale = _stale_sources(compiled.meta, source_revisions())
+    if stale:
+        print(
+            f"Outdated: {', '.join(stale)} changed since compilation. Run: python -m moore_web.wordlists compile"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+"""Worker pool whose processes share models loaded once in a template process.
+
+GlotLID (~1.6 GB), the two LASER encoders and COMET-QE are too expensive to
+load in every worker.  :class:`WorkerPool` starts a fresh **template**
+process (``spawn``, so it inherits no threads or CUDA state from the caller),
+loads the requested models there once, and only then forks its workers from
+it: every worker sees the same model pages copy-on-write.  The calling process
+never loads the models itself.
+
+Models are named like in :mod:`moore_web.model_registry` — ``glotlid``,
+``meag_lid``, ``ssa-comet-qe``, ``laser-<lang>`` — or given as a
+``"module:callable"`` loader (optionally ``(loader, *args)``).  Tasks are
+module-level functions that fetch their models with :func:`model`; each module
+provides one:
+
+- :func:`moore_web.glotlid.predict_in_pool`        — ``glotlid``
+- :func:`moore_web.score_laser.encode_in_pool`     — ``laser-<lang>``
+- :func:`moore_web.score_comet_qe.score_in_pool`   — ``ssa-comet-qe``
+- :func:`moore_web.align_corpus.align_in_pool`     — ``laser-fra``, ``laser-mos``
+
+Usage
+-----
+    from moore_web.glotlid import predict_in_pool
+    from moore_web.worker_pool import WorkerPool
+
+    with WorkerPool(["glotlid"], num_proc=8) as pool:
+        for preds in pool.map(predict_in_pool, batches):
+            ...
+
+    # num_proc=0 loads the models in the calling process and runs tasks inline
+    with WorkerPool(["laser-fra", "laser-mos"], num_proc=0) as pool:
+        aligned = list(pool.map(align_in_pool, articles, min_score=0.5))
+
+Every item of a :meth:`WorkerPool.map` call is sent to the template in one
+message, so map over batches rather than single rows and split very large
+inputs into several calls.  Workers need the ``fork`` start method (Linux).
+"""
+
+from __future__ import annotations
+
+import functools
+import importlib
+import multiprocessing as mp
+from collections.abc import Callable, Iterable, Iterator
+
+# Loader of every registry name; ``laser-<lang>`` names not listed are derived on demand.
+MODEL_LOADERS: dict[str, str] = {
+    "glotlid": "moore_web.glotlid:load_model",
+    "meag_lid": "moore_web.lang_id:load_model",
+    "ssa-comet-qe": "moore_web.score_comet_qe:load_model",
+}
+
+# Models loaded in this process: set in the template before its workers fork.
+_MODELS: dict[str, object] = {}
+
+
+def load_laser(lang: str):
+    """``LaserEncoderPipeline`` for *lang* from the model registry."""
+    from laser_encoders import LaserEncoderPipeline
+
+    from moore_web.model_registry import laser_kwargs
+
+    return LaserEncoderPipeline(lang=lang, **laser_kwargs(lang))
+
+
+def _loader(name: str, spec: str | tuple | None = None) -> tuple[str, tuple]:
+    """``("module:callable", args)`` that loads model *name*."""
+    if spec is None:
+        if name in MODEL_LOADERS:
+            spec = MODEL_LOADERS[name]
+        elif name.startswith("laser-"):
+            spec = ("moore_web.worker_pool:load_laser", name.removeprefix("laser-"))
+        else:
+            raise KeyError(f"Unknown model {name!r}; known: {sorted(MODEL_LOADERS)} or laser-<lang>.")
+    if isinstance(spec, str):
+        return spec, ()
+    return spec[0], tuple(spec[1:])
+
+
+def _load(specs: dict[str, tuple[str, tuple]]) -> None:
+    for name, (target, args) in specs.items():
+        module, _, attr = target.partition(":")
+        print(f"Loading {name} once for all workers…")
+        _MODELS[name] = getattr(importlib.import_module(module), attr)(*args)
+
+
+def model(name: str):
+    """Model *name* as loaded for this pool (call from inside a task)."""
+    try:
+        return _MODELS[name]
+    except KeyError:
+        raise RuntimeError(f"Model {name!r} is not loaded in this process; pass it to WorkerPool.") from None
+
+
+def _template_main(conn, specs: dict[str, tuple[str, tuple]], num_proc: int) -> None:
+    """Load the models, fork the workers, then serve ``(fn, items, chunksize)`` requests until ``None``."""
+    try:
+        _load(specs)
+    except BaseException as e:
+        conn.send(("error", e))
+        return
+    conn.send(("ready", None))
+    with mp.get_context("fork").Pool(num_proc) as pool:
+        while (request := conn.recv()) is not None:
+            fn, items, chunksize = request
+            try:
+                for result in pool.imap(fn, items, chunksize):
+                    conn.send(("item", result))
+            except BaseException as e:
+                conn.send(("error", e))
+            else:
+                conn.send(("done", None))
+
+
+class WorkerPool:
+    """Forked workers sharing models loaded once in a template process.
+
+    Args:
+        models:   Model names (see :data:`MODEL_LOADERS`), or ``{name: loader}``
+                  with ``loader`` a ``"module:callable"`` string or a
+                  ``("module:callable", *args)`` tuple (``None`` for the default).
+        num_proc: Worker processes; 0 loads the models here and runs tasks inline.
+    """
+
+    def __init__(self, models: Iterable[str] | dict[str, str | tuple | None], num_proc: int = 2):
+        items = models.items() if isinstance(models, dict) else ((name, None) for name in models)
+        self.specs = {name: _loader(name, spec) for name, spec in items}
+        self.num_proc = num_proc
+        self._process = None
+        self._conn = None
+
+    def start(self) -> WorkerPool:
+        """Load the models (in the template, or here with ``num_proc=0``) and start the workers."""
+        if self.num_proc <= 0:
+            _load(self.specs)
+            return self
+        ctx = mp.get_context("spawn")
+        self._conn, child = ctx.Pipe()
+        self._process = ctx.Process(target=_template_main, args=(child, self.specs, self.num_proc))
+        self._process.start()
+        child.close()
+        kind, payload = self._conn.recv()
+        if kind == "error":
+            self.close()
+            raise payload
+        return self
+
+    def map(self, fn: Callable, items: Iterable, chunksize: int = 1, **kwargs) -> Iterator:
+        """Yield ``fn(item, **kwargs)`` for every item, in order.
+
+        *fn* must be a module-level function (it is pickled by reference).
+        """
+        if kwargs:
+            fn = functools.partial(fn, **kwargs)
+        if self.num_proc <= 0:
+            yield from map(fn, items)
+            return
+        if self._conn is None:
+            raise RuntimeError("WorkerPool is not started; use it as a context manager or call start().")
+        self._conn.send((fn, list(items), chunksize))
+        finished = False
+        try:
+            while True:
+                kind, payload = self._conn.recv()
+                if kind != "item":
+                    finished = True
+                    if kind == "error":
+                        raise payload
+                    return
+                yield payload
+        finally:
+            # A consumer that stops early must not leave results for the next call.
+            while not finished:
+                finished = self._conn.recv()[0] != "item"
+
+    def close(self) -> None:
+        """Stop the workers and the template (models loaded inline stay loaded)."""
+        if self._process is None:
+            return
+        try:
+            self._conn.send(None)
+        except (BrokenPipeError, OSError):
+            pass
+        self._process.join(timeout=30)
+        if self._process.is_alive():
+            self._process.terminate()
+        self._conn.close()
+        self._process = self._conn = None
+
+    def __enter__(self) -> WorkerPool:
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.close()
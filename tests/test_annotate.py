@@ -181,6 +181,17 @@ class TestRunQualityWarnings:
         assert "eng_Latn" not in result.column_names
         assert "mos_Latn" not in result.column_names
 
+    def test_reruns_on_disk_backed_dataset_record_stats(self, small_dataset: Dataset, tmp_path):
+        from datasets import load_from_disk
+
+        from moore_web.filter_nllb import DETECTOR_STATS
+
+        small_dataset.save_to_disk(str(tmp_path / "ds"))
+        ds = load_from_disk(str(tmp_path / "ds"))
+        run_quality_warnings(ds, load_wordlists=False)
+        run_quality_warnings(ds, load_wordlists=False)
+        assert DETECTOR_STATS.snapshot()["emoji"]["rows"] == len(ds)
+
     def test_emoji_detected_in_target(self):
         ds = Dataset.from_list([{"french": "Hello", "moore": "Hi 😀"}])
         result = run_quality_warnings(ds, load_wordlists=False)
@@ -0,0 +1,99 @@
+"""Tests for moore_web.code_switch — windowed code-switching detection."""
+
+from __future__ import annotations
+
+import numpy as np
+import pytest
+from datasets import Dataset
+
+from moore_web import annotate
+from moore_web.code_switch import annotate_dataset, detect, window_starts
+from moore_web.lid import Predictions
+
+FRENCH = {"le", "la", "de", "et", "pour", "santé"}
+
+
+class FakePredictor:
+    """Labels a window ``fra_Latn`` when most of its tokens are French, else ``mos_Latn``; records calls."""
+
+    def __init__(self):
+        self.calls: list[list[str]] = []
+
+    def __call__(self, texts: list[str]) -> Predictions:
+        self.calls.append(list(texts))
+        langs = []
+        for text in texts:
+            tokens = text.split()
+            french = sum(t in FRENCH for t in tokens)
+            langs.append("fra_Latn" if 2 * french > len(tokens) else "mos_Latn")
+        return Predictions.from_labels(langs, [0.9] * len(texts))
+
+
+MOORE = "a yaa sõma n yaa neere wʋsgo"
+MIXED = "a yaa le centre de santé pour la ville"
+
+
+class TestWindowStarts:
+    @pytest.mark.parametrize(
+        "n, expected",
+        [(0, []), (3, [0]), (4, [0]), (5, [0, 1]), (8, [0, 2, 4]), (9, [0, 2, 4, 5])],
+    )
+    def test_windows_cover_every_token(self, n, expected):
+        assert window_starts(n, window=4, stride=2) == expected
+
+
+class TestDetect:
+    def test_ratio_and_spans(self):
+        result = detect([MOORE, MIXED, ""], FakePredictor(), expected="mos_Latn")
+        assert result.ratio[0] == 0.0
+        assert 0.0 < result.ratio[1] < 1.0
+        assert result.ratio[2] == 0.0
+        assert result.langs()[2] == [] and result.probs()[2] == []
+        spans = result.spans(1)
+        assert spans[0] == (0, 4, "mos_Latn")
+        assert (4, 8, "fra_Latn") in spans
+        assert spans[-1][1] == len(MIXED.split())
+
+    def test_null_texts_have_no_windows(self):
+        result = detect([None, MIXED], FakePredictor(), expected="mos_Latn")
+        assert result.ratio[0] == 0.0 and result.ratio[1] > 0.0
+        assert result.langs()[0] == [] and result.spans(0) == []
+
+    def test_single_prediction_call_per_batch(self):
+        predictor = FakePredictor()
+        detect([MOORE, MIXED, MOORE], predictor)
+        assert len(predictor.calls) == 1
+
+    def test_majority_reference_without_expected(self):
+        french = "le centre de santé et la ville pour le"
+        result = detect([french], FakePredictor(), expected=None)
+        assert result.ratio[0] == 0.0
+        assert detect([french], FakePredictor(), expected="mos_Latn").ratio[0] == 1.0
+
+    def test_low_confidence_windows_do_not_count(self):
+        def unsure(texts):
+            return Predictions.from_labels(["fra_Latn"] * len(texts), [0.3] * len(texts))
+
+        assert detect([MIXED], unsure, expected="mos_Latn", min_prob=0.5).ratio[0] == 0.0
+
+
+class TestAnnotate:
+    def test_dataset_columns(self):
+        ds = Dataset.from_dict({"moore": [MOORE, MIXED]})
+        out = annotate_dataset(ds, column="moore", predict_fn=FakePredictor())
+        assert out["moore_code_switch_ratio"][0] == 0.0
+        assert out["moore_code_switch_ratio"][1] > 0.0
+        assert "fra_Latn" in out["moore_code_switch_langs"][1]
+        assert len(out["moore_code_switch_probs"][1]) == len(out["moore_code_switch_langs"][1])
+
+    def test_dataset_with_null_rows(self):
+        ds = Dataset.from_dict({"moore": [None, MIXED]})
+        out = annotate_dataset(ds, column="moore", predict_fn=FakePredictor())
+        assert out["moore_code_switch_ratio"][0] == 0.0 and out["moore_code_switch_langs"][0] == []
+
+    def test_composer_drops_mixed_rows(self, monkeypatch):
+        monkeypatch.setattr("moore_web.lid.load_predictor", lambda name: FakePredictor())
+        ds = Dataset.from_dict({"french": ["a", "b"], "moore": [MOORE, MIXED]})
+        out = annotate.annotate(ds, code_switch=True, max_code_switch=0.2)
+        assert out["moore"] == [MOORE]
+        assert np.isclose(out["moore_code_switch_ratio"][0], 0.0)
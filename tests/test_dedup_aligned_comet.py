@@ -0,0 +1,99 @@
+"""Tests for moore_web.dedup_aligned_comet and the text hashing it relies on."""
+
+from __future__ import annotations
+
+import json
+from unittest.mock import MagicMock
+
+from moore_web.dedup_aligned_comet import deduplicate_by_comet, find_duplicate_groups
+from moore_web.text_hash import factorize_texts, hash_texts
+
+
+def _fnv1a(text: str) -> int:
+    h = 0xCBF29CE484222325
+    for b in text.encode("utf-8"):
+        h = ((h ^ b) * 0x100000001B3) % 2**64
+    return h
+
+
+def _mock_comet(scores_by_mt: dict[str, float]):
+    model = MagicMock()
+    model.predict.side_effect = lambda data, **kw: MagicMock(scores=[scores_by_mt[d["mt"]] for d in data])
+    return model
+
+
+class TestHashTexts:
+    def test_matches_reference_fnv1a(self):
+        texts = ["", "a", "Laafɩ yaa sõama", "Bonjour tout le monde"]
+        assert [int(h) for h in hash_texts(texts)] == [_fnv1a(t) for t in texts]
+
+    def test_none_hashes_like_empty(self):
+        assert hash_texts([None])[0] == hash_texts([""])[0]
+
+    def test_factorize_equal_texts_share_id(self):
+        ids, n_unique = factorize_texts(["a", "b", "a"])
+        assert n_unique == 2
+        assert ids[0] == ids[2] != ids[1]
+
+
+class TestFindDuplicateGroups:
+    def test_transitive_groups(self):
+        groups = find_duplicate_groups(["a", "a", "b", "c"], ["x", "y", "y", "z"])
+        assert groups[0] == groups[1] == groups[2]
+        assert groups[3] != groups[0]
+
+
+class TestDeduplicateByComet:
+    def test_no_duplicates_unchanged(self):
+        pairs = [{"fr": "a", "mo": "x"}, {"fr": "b", "mo": "y"}]
+        assert deduplicate_by_comet(pairs, model=MagicMock()) == pairs
+
+    def test_clear_laser_margin_skips_comet(self):
+        pairs = [
+            {"fr": "a", "mo": "x", "laser_score": 0.9},
+            {"fr": "a", "mo": "y", "laser_score": 0.5},
+        ]
+        model = _mock_comet({})
+        result = deduplicate_by_comet(pairs, model=model)
+        assert result == [pairs[0]]
+        model.predict.assert_not_called()
+
+    def test_ambiguous_group_uses_comet(self):
+        pairs = [
+            {"fr": "a", "mo": "x", "laser_score": 0.70},
+            {"fr": "a", "mo": "y", "laser_score": 0.69},
+            {"fr": "b", "mo": "z", "laser_score": 0.9},
+        ]
+        model = _mock_comet({"x": 0.2, "y": 0.8})
+        result = deduplicate_by_comet(pairs, model=model)
+        assert [p["mo"] for p in result] == ["y", "z"]
+        assert len(model.predict.call_args[0][0]) == 2
+
+    def test_missing_laser_scores_use_comet(self):
+        pairs = [{"fr": "a", "mo": "x"}, {"fr": "b", "mo": "x"}]
+        model = _mock_comet({"x": 0.5})
+        deduplicate_by_comet(pairs, model=model)
+        model.predict.assert_called_once()
+
+    def test_audit_file_lists_dropped_groups(self, tmp_path):
+        pairs = [
+            {"fr": "a", "mo": "x", "laser_score": 0.9},
+            {"fr": "a", "mo": "y", "laser_score": 0.5},
+            {"fr": "b", "mo": "y", "laser_score": 0.4},
+        ]
+        audit = tmp_path / "audit.jsonl"
+        deduplicate_by_comet(pairs, model=MagicMock(), audit_path=audit)
+        records = [json.loads(line) for line in audit.read_text(encoding="utf-8").splitlines()]
+        assert len(records) == 1
+        assert records[0]["kept_index"] == 0
+        assert records[0]["resolved_by"] == "laser"
+        assert [m["kept"] for m in records[0]["members"]] == [True, False, False]
+
+    def test_infinite_margin_always_scores(self):
+        pairs = [
+            {"fr": "a", "mo": "x", "laser_score": 0.9},
+            {"fr": "a", "mo": "y", "laser_score": 0.1},
+        ]
+        model = _mock_comet({"x": 0.1, "y": 0.9})
+        result = deduplicate_by_comet(pairs, model=model, laser_margin=float("inf"))
+        assert [p["mo"] for p in result] == ["y"]
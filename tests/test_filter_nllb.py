@@ -0,0 +1,314 @@
+"""Tests for the vectorised quality-warning engine in moore_web.filter_nllb."""
+
+from __future__ import annotations
+
+import copy
+
+import numpy as np
+import pyarrow.compute as pc
+import pytest
+from datasets import ClassLabel, Dataset
+
+from moore_web import filter_nllb
+from moore_web.filter_nllb import (
+    DETECTOR_STATS,
+    DETECTORS,
+    WARNING_STATS,
+    WARNING_BITS,
+    WARNING_LABELS,
+    TokenizedText,
+    _has_bullet_asymmetry,
+    _has_dots_asymmetry,
+    _has_emoji,
+    _has_foreign_words,
+    _has_number_mismatch,
+    _has_parenthesis_asymmetry,
+    _lang_consistency_score,
+    _len_ratio,
+    _terminal_punctuation_score,
+    annotate_warnings,
+    annotate_warnings_shared,
+    apply_hard_filters,
+    compute_warnings,
+    flags_mask,
+    flags_to_labels,
+    label_equals,
+    labels_to_flags,
+    len_ratios,
+    map_warnings,
+    read_flags,
+    report_warning_stats,
+    share_wordlist,
+    warning_counts,
+    with_warning_labels,
+)
+
+WORDLIST = {"maison", "house", "the", "chat_noir"}
+
+PAIRS = [
+    ("Hello world.", "Yibeogo 😀"),
+    ("..and so on", "la sẽn ket"),
+    ("He paid 1,000 francs.", "A yɩɩ 1,000 wakɛ."),
+    ("He paid 1,000 francs.", "A yɩɩ wakɛ."),
+    ("Call (see page 4)", "Bool bãmba"),
+    ("● First item", "Yẽsgo"),
+    ("What?!?! Really... yes!!", "Ee"),
+    ("The house", "The house maison wẽnd"),
+    ("Σ word", "İstanbul maison the"),
+    ("x", "chat_noir ne_bãmb ｡１２"),
+    (None, None),
+    ("", "   "),
+]
+
+
+def _reference(src: str | None, tgt: str | None, wordlist: set[str]) -> tuple[list[str], float]:
+    src, tgt = src or "", tgt or ""
+    checks = [
+        _has_emoji(tgt),
+        _has_dots_asymmetry(src, tgt),
+        _has_number_mismatch(src, tgt),
+        _has_parenthesis_asymmetry(src, tgt),
+        _has_bullet_asymmetry(src, tgt),
+        _has_foreign_words(tgt, wordlist),
+        _terminal_punctuation_score(src, tgt) < -2,
+    ]
+    labels = [label for label, hit in zip(WARNING_LABELS, checks) if hit]
+    return labels, _lang_consistency_score(tgt, wordlist)
+
+
+@pytest.mark.parametrize("wordlist", [WORDLIST, set()])
+def test_matches_per_row_detectors(wordlist):
+    src, tgt = zip(*PAIRS)
+    flags, consistency = compute_warnings(list(src), list(tgt), wordlist)
+    expected = [_reference(s, t, wordlist) for s, t in PAIRS]
+    assert flags_to_labels(flags) == [labels for labels, _ in expected]
+    assert consistency == [score for _, score in expected]
+
+
+def test_set_and_compiled_wordlists_agree():
+    from moore_web.wordlists import CompiledWordlist
+
+    src, tgt = zip(*PAIRS)
+    compiled = CompiledWordlist.from_words(WORDLIST)
+    assert filter_nllb._hashed_wordlist(WORDLIST) is filter_nllb._hashed_wordlist(WORDLIST)
+    flags, consistency = compute_warnings(list(src), list(tgt), WORDLIST)
+    c_flags, c_consistency = compute_warnings(list(src), list(tgt), compiled)
+    assert flags.tolist() == c_flags.tolist() and consistency == c_consistency
+    assert _lang_consistency_score("maison wẽnd yiri", compiled) == _lang_consistency_score(
+        "maison wẽnd yiri", WORDLIST
+    )
+
+
+def test_flags_are_bit_sets():
+    flags, _ = compute_warnings(["Hello world."], ["Yibeogo 😀"], set())
+    assert flags.dtype == np.uint32
+    assert flags.tolist() == [WARNING_BITS["emoji"]]
+
+
+def test_annotate_warnings_batch_columns():
+    batch = annotate_warnings({"eng_Latn": ["The house."], "mos_Latn": ["maison ne yiri 😀"]}, WORDLIST)
+    assert batch["quality_warnings"] == [["emoji", "foreign_words"]]
+    assert batch["identification_consistency"] == [0.5]
+
+
+def test_empty_batch():
+    flags, consistency = compute_warnings([], [], WORDLIST)
+    assert len(flags) == 0 and consistency == []
+
+
+def test_apply_hard_filters_attributes_drops_in_order(capsys):
+    ds = Dataset.from_dict(
+        {
+            "id": [0, 1, 2, 3, 4],
+            "target_glotlid_prob": [0.95, 0.5, None, 0.99, 0.99],
+            "target_glotlid_lang": ["mos_Latn", "mos_Latn", "mos_Latn", "fra_Latn", "mos_Latn"],
+            "quality_warnings": [[], ["emoji"], None, ["emoji"], ["number_mismatch", "dots_asymmetry"]],
+            "len_ratio": [0.9, 0.9, 0.9, 0.9, 0.1],
+        }
+    ).select([4, 3, 2, 1, 0])
+    kept = apply_hard_filters(ds, len_ratio_threshold=0.5)
+    assert kept["id"] == [0]
+    out = capsys.readouterr().out
+    assert "(5 → 1 rows kept, 4 dropped)" in out
+    assert "target_glotlid: dropped 3" in out
+    assert "quality_warnings: dropped 1" in out
+    assert "len_ratio: dropped 0" in out
+
+
+def test_apply_hard_filters_code_switch_threshold():
+    ds = Dataset.from_dict({"id": [0, 1, 2], "target_code_switch_ratio": [0.0, 0.5, None]})
+    assert apply_hard_filters(ds)["id"] == [0, 1, 2]
+    assert apply_hard_filters(ds, code_switch_threshold=0.25)["id"] == [0]
+
+
+class TestLabelEquals:
+    LANGS = ["mos_Latn", None, "fra_Latn", "mos_Latn"]
+
+    def test_string_dictionary_and_class_label_columns_agree(self):
+        plain = Dataset.from_dict({"lang": self.LANGS})
+        coded = plain.cast_column("lang", ClassLabel(names=["fra_Latn", "mos_Latn"]))
+        dictionary = Dataset(
+            plain.data.table.set_column(0, "lang", pc.dictionary_encode(plain.data.table["lang"]))
+        )
+        expected = [True, False, False, True]
+        for ds in (plain, coded, dictionary):
+            assert label_equals(ds, "lang", "mos_Latn").tolist() == expected
+
+    def test_unknown_label_and_missing_column(self):
+        coded = Dataset.from_dict({"lang": [0, 1]}).cast_column(
+            "lang", ClassLabel(names=["fra_Latn", "mos_Latn"])
+        )
+        assert not label_equals(coded, "lang", "eng_Latn").any()
+        assert not label_equals(coded, "other", "mos_Latn").any()
+
+    def test_hard_filters_accept_class_label_columns(self, capsys):
+        ds = Dataset.from_dict(
+            {
+                "id": [0, 1, 2],
+                "target_glotlid_prob": [0.95, 0.95, 0.5],
+                "target_glotlid_lang": [1, 0, 1],
+            }
+        ).cast_column("target_glotlid_lang", ClassLabel(names=["fra_Latn", "mos_Latn"]))
+        assert apply_hard_filters(ds, len_ratio_threshold=0.0)["id"] == [0]
+
+
+def test_map_warnings_parallel_matches_serial():
+    src, tgt = zip(*PAIRS)
+    ds = Dataset.from_dict({"eng_Latn": list(src) * 3, "mos_Latn": list(tgt) * 3})
+    serial = map_warnings(ds, WORDLIST, batch_size=5)
+    parallel = map_warnings(ds, WORDLIST, batch_size=5, num_proc=2)
+    assert parallel.to_list() == serial.to_list()
+
+
+def test_shared_wordlist_key_must_match():
+    share_wordlist(WORDLIST)
+    with pytest.raises(RuntimeError):
+        annotate_warnings_shared({"eng_Latn": ["a"], "mos_Latn": ["b"]}, wordlist_key="stale")
+
+
+class TestTokenizedText:
+    def test_tokens_offsets_and_rows(self):
+        stage = TokenizedText(["Le Chat, noir!", None, "wẽnd-sõma"])
+        assert stage.tokens.to_pylist() == ["le", "chat", "noir", "wẽnd", "sõma"]
+        assert stage.offsets.tolist() == [0, 3, 3, 5]
+        assert stage.rows.tolist() == [0, 0, 0, 2, 2]
+        assert stage.vocab.take(stage.ids).to_pylist() == stage.tokens.to_pylist()
+
+    def test_len_ratios_match_per_row(self):
+        src, tgt = zip(*PAIRS)
+        expected = [_len_ratio(s or "", t or "") for s, t in PAIRS]
+        assert len_ratios(TokenizedText(list(src)), TokenizedText(list(tgt))) == expected
+
+    def test_annotate_warnings_tokenises_once(self, monkeypatch):
+        calls = []
+        split = pc.utf8_split_whitespace
+        monkeypatch.setattr(pc, "utf8_split_whitespace", lambda arr: calls.append(1) or split(arr))
+        src, tgt = zip(*PAIRS)
+        annotate_warnings({"eng_Latn": list(src), "mos_Latn": list(tgt)}, WORDLIST, len_ratio=True)
+        assert len(calls) == 1  # target side only; the source never needs tokens
+
+
+class TestDetectorRegistry:
+    def test_builtin_order_matches_labels(self):
+        assert tuple(DETECTORS) == WARNING_LABELS
+        assert {name for name, d in DETECTORS.items() if d.default} == {
+            "emoji",
+            "dots_asymmetry",
+            "foreign_words",
+        }
+
+    def test_register_custom_detector(self, monkeypatch):
+        for name in ("DETECTORS", "WARNING_LABELS", "WARNING_BITS"):
+            monkeypatch.setattr(filter_nllb, name, copy.copy(getattr(filter_nllb, name)))
+        filter_nllb.register_detector("question", lambda x: pc.ends_with(x.tgt.stripped, "?").to_numpy(False))
+        flags, _ = compute_warnings(["Yes?", "Yes?"], ["Ee?", "Ee"], set())
+        assert flags_to_labels(flags) == [["question"], []]
+        with pytest.raises(ValueError):
+            filter_nllb.register_detector("emoji", lambda x: None)
+
+    def test_subset_and_stats(self):
+        DETECTOR_STATS.reset()
+        src, tgt = zip(*PAIRS)
+        flags, _ = compute_warnings(list(src), list(tgt), WORDLIST, detectors=["emoji", "foreign_words"])
+        assert set(label for labels in flags_to_labels(flags) for label in labels) == {
+            "emoji",
+            "foreign_words",
+        }
+        stats = DETECTOR_STATS.snapshot()
+        assert list(stats) == ["emoji", "foreign_words"]
+        assert stats["emoji"]["rows"] == len(PAIRS) and stats["emoji"]["hits"] == 2
+
+    def test_parallel_stats_are_totals(self):
+        src, tgt = zip(*PAIRS)
+        ds = Dataset.from_dict({"eng_Latn": list(src) * 4, "mos_Latn": list(tgt) * 4})
+        map_warnings(ds, WORDLIST, batch_size=5, num_proc=2, detectors=["emoji"])
+        assert DETECTOR_STATS.snapshot()["emoji"]["rows"] == 4 * len(PAIRS)
+
+    def test_unknown_detector(self):
+        with pytest.raises(ValueError):
+            map_warnings(Dataset.from_dict({"eng_Latn": ["a"], "mos_Latn": ["b"]}), set(), detectors=["nope"])
+
+
+def test_apply_hard_filters_warning_filters():
+    ds = Dataset.from_dict({"id": [0, 1, 2], "quality_warnings": [["bullet_asymmetry"], ["emoji"], []]})
+    assert apply_hard_filters(ds)["id"] == [0, 2]
+    assert apply_hard_filters(ds, warning_filters=["bullet_asymmetry"])["id"] == [1, 2]
+
+
+class TestQualityFlags:
+    LABELS = [["emoji", "foreign_words"], [], None, ["number_mismatch"]]
+
+    def test_labels_roundtrip(self):
+        flags = labels_to_flags(self.LABELS)
+        assert flags.dtype == np.uint32
+        assert flags_to_labels(flags) == [["emoji", "foreign_words"], [], [], ["number_mismatch"]]
+        assert flags_mask(flags, ["foreign_words", "number_mismatch"]).tolist() == [True, False, False, True]
+        assert warning_counts(flags) == {"emoji": 1, "number_mismatch": 1, "foreign_words": 1}
+
+    def test_read_flags_from_either_column(self):
+        from_labels = read_flags(Dataset.from_dict({"quality_warnings": self.LABELS}).select([3, 2, 1, 0]))
+        from_flags = read_flags(Dataset.from_dict({"quality_flags": labels_to_flags(self.LABELS)[::-1]}))
+        assert from_labels.tolist() == from_flags.tolist()
+        assert read_flags(Dataset.from_dict({"x": [1]})) is None
+
+    def test_compact_annotation_and_compatibility_view(self):
+        src, tgt = zip(*PAIRS)
+        ds = Dataset.from_dict({"eng_Latn": list(src), "mos_Latn": list(tgt)})
+        full = map_warnings(ds, WORDLIST)
+        compact = map_warnings(ds, WORDLIST, labels=False)
+        assert "quality_warnings" not in compact.column_names
+        assert compact.features["quality_flags"].dtype == "uint32"
+        assert with_warning_labels(compact)["quality_warnings"] == full["quality_warnings"]
+        assert apply_hard_filters(compact)["eng_Latn"] == apply_hard_filters(full)["eng_Latn"]
+
+
+class TestWarningStats:
+    def test_accumulated_during_map(self, capsys):
+        src, tgt = zip(*PAIRS)
+        ds = Dataset.from_dict({"eng_Latn": list(src) * 3, "mos_Latn": list(tgt) * 3})
+        ds = map_warnings(ds, WORDLIST, batch_size=5, num_proc=2, len_ratio=True)
+        stats = WARNING_STATS.snapshot(WARNING_LABELS)
+        flags = read_flags(ds)
+        assert stats["rows"] == len(ds) and stats["any"] == int(np.count_nonzero(flags))
+        assert {k: v for k, v in stats["labels"].items() if v} == warning_counts(flags)
+        for col in ("identification_consistency", "len_ratio"):
+            values = np.asarray(ds[col])
+            assert stats["scores"][col]["mean"] == pytest.approx(values.mean())
+            assert stats["scores"][col]["quantiles"][0.5] == pytest.approx(
+                np.quantile(values, 0.5, method="inverted_cdf"), abs=2e-3
+            )
+        report_warning_stats(stats)
+        assert "identification_consistency (mean)" in capsys.readouterr().out
+
+    def test_quantiles_within_one_bin(self):
+        from moore_web.stream_stats import StreamingStats
+
+        values = np.random.default_rng(0).random(10_000)
+        stats = StreamingStats(scores=("x",))
+        stats.reset()
+        for chunk in np.array_split(values, 7):
+            stats.update(x=chunk.tolist() + [None])
+        snap = stats.snapshot()
+        assert snap["scores"]["x"]["count"] == len(values)
+        for q, got in snap["scores"]["x"]["quantiles"].items():
+            assert got == pytest.approx(np.quantile(values, q), abs=1e-3)
@@ -0,0 +1,52 @@
+"""Tests for moore_web.filter_sweep — one-pass threshold sweep."""
+
+from __future__ import annotations
+
+import itertools
+
+from datasets import Dataset
+
+from moore_web.filter_nllb import apply_hard_filters
+from moore_web.filter_sweep import SweepColumns, sweep, write_table
+
+ROWS = {
+    "target_sentence_lid": [0.95, 0.8, None, 0.99, 0.7, 0.92],
+    "target_glotlid_prob": [0.99, 0.95, 0.9, 0.6, 0.99, 0.97],
+    "target_glotlid_lang": ["mos_Latn", "mos_Latn", "mos_Latn", "mos_Latn", "fra_Latn", "mos_Latn"],
+    "comet_qe_en_mos": [0.8, 0.6, 0.7, 0.9, 0.2, 0.4],
+    "quality_warnings": [[], ["emoji"], None, [], ["number_mismatch"], []],
+    "len_ratio": [0.9, 0.5, 0.2, 0.8, 0.9, 0.1],
+    "source": ["nllb", "nllb", "web", "web", "web", None],
+}
+GRID = {
+    "lid_threshold": [0.5, 0.9],
+    "glotlid_threshold": [0.5, 0.9],
+    "comet_threshold": [0.3, 0.5],
+    "len_ratio_threshold": [0.0, 0.3],
+}
+
+
+def test_sweep_matches_apply_hard_filters(capsys):
+    ds = Dataset.from_dict(ROWS)
+    results = sweep(SweepColumns.from_dataset(ds, group_col="source"), GRID)
+    assert len(results) == len(list(itertools.product(*GRID.values())))
+    for row in results:
+        kept = apply_hard_filters(ds, **{p: row[p] for p in GRID})
+        assert row["kept"] == len(kept)
+        assert row["kept[nllb]"] == kept["source"].count("nllb")
+        assert row["kept[<null>]"] == kept["source"].count(None)
+
+
+def test_pass_counts_and_missing_columns():
+    ds = Dataset.from_dict({"comet_qe_en_mos": [0.1, 0.6, None]})
+    (row,) = sweep(SweepColumns.from_dataset(ds), {"comet_threshold": [0.5]})
+    assert row["kept"] == 1
+    assert row["pass[comet_threshold]"] == 1 and row["pass[lid_threshold]"] == 3
+
+
+def test_write_table(tmp_path):
+    results = sweep(SweepColumns.from_dataset(Dataset.from_dict(ROWS)), GRID)
+    path = tmp_path / "sweep.csv"
+    write_table(results, path)
+    lines = path.read_text(encoding="utf-8").splitlines()
+    assert lines[0].startswith("lid_threshold,glotlid_threshold") and len(lines) == len(results) + 1
@@ -0,0 +1,123 @@
+"""Tests for moore_web.glotlid — deduplicated, cached predictions."""
+
+from __future__ import annotations
+
+import numpy as np
+
+from moore_web import glotlid
+from moore_web.glotlid import PredictionCache, annotate_text_units, predict
+
+
+class FakeModel:
+    """Predicts ``mos_Latn`` for texts containing 'ẽ', else ``fra_Latn``; records every call."""
+
+    def __init__(self, revision: str | None = "fake@1"):
+        self.calls: list[list[str]] = []
+        if revision:
+            setattr(self, glotlid._REVISION_ATTR, revision)
+
+    def get_labels(self):
+        return ["__label__fra_Latn", "__label__mos_Latn", "__label__eng_Latn"]
+
+    def predict(self, texts, k=1):
+        self.calls.append(list(texts))
+        labels, probs = [], []
+        for t in texts:
+            best = "__label__mos_Latn" if "ẽ" in t else "__label__fra_Latn"
+            rest = [label for label in self.get_labels() if label != best]
+            p = 0.5 + len(t) / 1000
+            labels.append([best, *rest][:k])
+            probs.append([p, (1 - p) * 0.75, (1 - p) * 0.25][:k])
+        return labels, probs
+
+
+TEXTS = ["Bonjour", "Yẽ sõma", "Bonjour", "Yẽ\nsõma", "Merci"]
+
+
+class TestPredict:
+    def test_dedup_within_call(self):
+        model = FakeModel()
+        preds = predict(model, TEXTS)
+        assert preds.langs() == ["fra_Latn", "mos_Latn", "fra_Latn", "mos_Latn", "fra_Latn"]
+        assert preds.codes.dtype == np.int32 and preds.probs.dtype == np.float32
+        assert preds.prob_values(4) == [0.507, 0.507, 0.507, 0.507, 0.505]
+        assert sorted(model.calls[0]) == ["Bonjour", "Merci", "Yẽ sõma"]
+
+    def test_cache_hits_are_identical(self, tmp_path):
+        first = FakeModel()
+        expected = predict(first, TEXTS, cache=PredictionCache("fake@1", tmp_path / "c.sqlite"))
+
+        again = FakeModel()
+        cache = PredictionCache("fake@1", tmp_path / "c.sqlite")
+        preds = predict(again, TEXTS + ["Nouveau"], cache=cache)
+        assert again.calls == [["Nouveau"]]
+        assert preds.langs()[:-1] == expected.langs()
+        assert preds.prob_values(4)[:-1] == expected.prob_values(4)
+        assert (cache.hits, cache.misses) == (3, 1)
+
+    def test_revisions_do_not_share_entries(self, tmp_path):
+        predict(FakeModel(), TEXTS, cache=PredictionCache("fake@1", tmp_path / "c.sqlite"))
+        other = FakeModel("fake@2")
+        predict(other, TEXTS, cache=PredictionCache("fake@2", tmp_path / "c.sqlite"))
+        assert len(other.calls) == 1
+
+    def test_annotate_text_units(self, monkeypatch, tmp_path):
+        monkeypatch.setenv("MOORE_WEB_CACHE", str(tmp_path))
+        entries = [{"text_units": ["Bonjour", "Yẽ sõma"]}, {"text_units": ["Merci"]}, {"text_units": []}]
+        model = FakeModel()
+        out = annotate_text_units(entries, model)
+        assert out[0]["text_unit_langs"] == ["fra_Latn", "mos_Latn"]
+        assert out[0]["text_unit_probs"] == [0.507, 0.507]
+        assert out[1]["text_unit_langs"] is None and out[2]["text_unit_probs"] is None
+        assert (tmp_path / "glotlid" / "predictions.sqlite").exists()
+
+    def test_unknown_revision_skips_persistent_cache(self, monkeypatch, tmp_path):
+        monkeypatch.setenv("MOORE_WEB_CACHE", str(tmp_path))
+        assert glotlid.prediction_cache(FakeModel(revision=None)) is None
+
+
+def test_parallel_annotation_matches_serial(monkeypatch, tmp_path):
+    from datasets import Dataset
+
+    monkeypatch.setenv("MOORE_WEB_CACHE", str(tmp_path))
+    ds = Dataset.from_dict({"eng_Latn": TEXTS * 4, "mos_Latn": TEXTS[::-1] * 4})
+    serial = glotlid.annotate_dataset(ds, FakeModel(), batch_size=3, use_cache=False)
+    parallel = glotlid.annotate_dataset(ds, FakeModel(), batch_size=3, use_cache=False, num_proc=2)
+    assert parallel.to_list() == serial.to_list()
+    assert glotlid.LID_STATS.snapshot()["texts"] == 2 * len(ds)
+
+
+def test_empty_batch():
+    preds = predict(FakeModel(), [])
+    assert len(preds) == 0 and preds.langs() == []
+
+
+class TestCategoricalOutput:
+    def test_class_label_columns_decode_to_strings(self, monkeypatch, tmp_path):
+        from datasets import ClassLabel, Dataset
+
+        monkeypatch.setenv("MOORE_WEB_CACHE", str(tmp_path))
+        ds = Dataset.from_dict({"eng_Latn": TEXTS, "mos_Latn": TEXTS[::-1]})
+        plain = glotlid.annotate_dataset(ds, FakeModel(), batch_size=2, use_cache=False)
+        coded = glotlid.annotate_dataset(ds, FakeModel(), batch_size=2, use_cache=False, categorical=True)
+        feature = coded.features["mos_Latn_glotlid_lang"]
+        assert isinstance(feature, ClassLabel)
+        assert feature.names == ["fra_Latn", "mos_Latn", "eng_Latn"]
+        assert coded["mos_Latn_glotlid_lang"] == [0, 1, 0, 1, 0]
+        assert glotlid.decode_lid_columns(coded).to_list() == plain.to_list()
+
+    def test_top_k_columns(self, monkeypatch, tmp_path):
+        from datasets import Dataset
+
+        monkeypatch.setenv("MOORE_WEB_CACHE", str(tmp_path))
+        ds = Dataset.from_dict({"eng_Latn": TEXTS, "mos_Latn": TEXTS})
+        out = glotlid.annotate_dataset(ds, FakeModel(), use_cache=False, categorical=True, top_k=3)
+        out = glotlid.decode_lid_columns(out)
+        row = out[1]
+        assert row["eng_Latn_glotlid_topk_lang"] == ["mos_Latn", "fra_Latn", "eng_Latn"]
+        assert row["eng_Latn_glotlid_lang"] == "mos_Latn"
+        assert row["eng_Latn_glotlid_prob"] == 0.507
+        assert np.allclose(row["eng_Latn_glotlid_topk_prob"], [0.507, 0.3698, 0.1232], atol=1e-6)
+
+        top1 = glotlid.annotate_dataset(ds, FakeModel(), use_cache=False)
+        assert out.select_columns(top1.column_names).to_list() == top1.to_list()
@@ -0,0 +1,73 @@
+"""Tests for moore_web.lang_id — NumPy predictions from the MEAG bundle."""
+
+from __future__ import annotations
+
+import numpy as np
+from sklearn.feature_extraction.text import CountVectorizer
+from sklearn.naive_bayes import MultinomialNB
+
+from moore_web.lang_id import annotate_text_units, predict
+from moore_web.lid import ensemble_predict
+
+TRAIN = ["bonjour merci", "merci beaucoup", "yibeogo barka", "barka wẽnd"]
+LABELS = ["fra", "fra", "mos", "mos"]
+
+
+def _bundle() -> dict:
+    vec = CountVectorizer().fit(TRAIN)
+    return {"vectorizer": vec, "model": MultinomialNB().fit(vec.transform(TRAIN), LABELS)}
+
+
+def test_predict_matches_classifier(monkeypatch):
+    bundle = _bundle()
+    texts = ["bonjour", "barka", "merci wẽnd barka"]
+    monkeypatch.setattr(bundle["model"], "predict", None)  # labels come from predict_proba alone
+    preds = predict(bundle, texts, chunk_size=2)
+    monkeypatch.undo()
+    X = bundle["vectorizer"].transform(texts)
+    assert preds.langs() == bundle["model"].predict(X).tolist()
+    assert preds.probs.dtype == np.float32
+    assert np.allclose(preds.probs, bundle["model"].predict_proba(X).max(axis=1))
+
+
+def test_annotate_text_units_scatters_by_entry():
+    entries = [
+        {"text_units": ["bonjour", "barka", "merci"]},
+        {"text_units": ["barka"]},
+        {"text_units": ["yibeogo", "merci"]},
+    ]
+    out = annotate_text_units(entries, _bundle())
+    assert out[0]["text_unit_langs"] == ["fra", "mos", "fra"]
+    assert out[1]["text_unit_langs"] is None
+    assert out[2]["text_unit_langs"] == ["mos", "fra"] and len(out[2]["text_unit_probs"]) == 2
+
+
+class FakeGlotLID:
+    """Always predicts ``lang`` with probability ``prob``; records the texts it sees."""
+
+    def __init__(self, lang: str, prob: float):
+        self.lang, self.prob, self.seen = lang, prob, []
+
+    def predict(self, texts, k=1):
+        self.seen.extend(texts)
+        return [[f"__label__{self.lang}"] for _ in texts], [[self.prob] for _ in texts]
+
+
+class TestEnsemble:
+    TEXTS = ["bonjour merci", "barka wẽnd", "merci barka"]
+
+    def test_confident_texts_skip_glotlid(self):
+        glot = FakeGlotLID("mos_Latn", 1.0)
+        preds = ensemble_predict(self.TEXTS, _bundle(), glot, threshold=0.0)
+        assert glot.seen == []
+        assert preds.langs() == [f"{lang}_Latn" for lang in predict(_bundle(), self.TEXTS).langs()]
+
+    def test_ambiguous_texts_combine_probabilities(self):
+        bundle = _bundle()
+        meag = predict(bundle, self.TEXTS)
+        glot = FakeGlotLID("mos_Latn", 0.4)
+        preds = ensemble_predict(self.TEXTS, bundle, glot, threshold=1.01)
+        assert sorted(glot.seen) == sorted(self.TEXTS)
+        # fra_Latn scores 0.5 * p; mos_Latn scores 0.5 * (1 - p) + 0.5 * 0.4, so fra_Latn needs p > 0.7
+        assert preds.langs()[1] == "mos_Latn"
+        assert preds.langs()[0] == ("fra_Latn" if meag.probs[0] > 0.7 else "mos_Latn")
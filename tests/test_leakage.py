@@ -0,0 +1,39 @@
+"""Tests for moore_web.leakage — train/dev/test leakage index."""
+
+from __future__ import annotations
+
+from moore_web.leakage import LeakageIndex, leak_mask, leak_reasons
+
+TRAIN_FR = [
+    "Le conseil des ministres s'est réuni ce mercredi à Ouagadougou.",
+    "Le gouvernement a adopté un projet de loi sur la santé publique.",
+    "Oui",
+]
+TRAIN_MO = [
+    "Minis-rãmb tigissg zĩnda Wagdgo ne lɑrbɑ.",
+    "Gʋvɛrnema sak n deeg tõog sẽn kẽed laafɩ wɛɛngẽ.",
+    "Ẽye",
+]
+
+
+def _index() -> LeakageIndex:
+    return LeakageIndex.build(TRAIN_FR, TRAIN_MO)
+
+
+class TestLeakageIndex:
+    def test_exact_after_normalisation(self):
+        flags = _index().check(["le conseil des ministres s est réuni ce mercredi à ouagadougou"], ["Ne"])
+        assert leak_reasons(flags, 0) == ["fr_exact", "fr_near"]
+
+    def test_near_copy_on_target_side(self):
+        flags = _index().check(["Une phrase sans rapport."], [TRAIN_MO[1].rstrip(".") + " sõma."])
+        assert leak_reasons(flags, 0) == ["mo_near"]
+
+    def test_short_sentences_only_checked_exactly(self):
+        flags = _index().check(["oui!", "Ouix"], ["a", "b"])
+        assert flags["fr_exact"].tolist() == [True, False]
+        assert not flags["fr_near"].any()
+
+    def test_clean_rows_and_empty_texts(self):
+        flags = _index().check(["Bonjour à tous les habitants du village.", ""], ["Yibeogo", None])
+        assert not leak_mask(flags).any()
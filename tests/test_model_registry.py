@@ -0,0 +1,145 @@
+"""Tests for moore_web.model_registry — offline resolution of pinned artifacts."""
+
+from __future__ import annotations
+
+import pytest
+
+from moore_web import model_registry
+from moore_web.model_registry import laser_kwargs, pin, prefetch, resolve, verify
+
+
+@pytest.fixture(autouse=True)
+def _offline_cache(monkeypatch, tmp_path):
+    monkeypatch.setenv("MOORE_WEB_CACHE", str(tmp_path / "cache"))
+    monkeypatch.setenv("MOORE_WEB_OFFLINE", "1")
+
+
+class TestRegistry:
+    def test_pinned_file_resolves_offline(self, tmp_path):
+        artifact = tmp_path / "model.bin"
+        artifact.write_bytes(b"weights")
+        pin("glotlid", artifact)
+        assert resolve("glotlid") == artifact.resolve()
+        assert verify() == {"glotlid": "ok"}
+
+    def test_directory_artifact_with_file(self, tmp_path):
+        snapshot = tmp_path / "comet"
+        (snapshot / "checkpoints").mkdir(parents=True)
+        (snapshot / "checkpoints" / "model.ckpt").write_bytes(b"ckpt")
+        (snapshot / "hparams.yaml").write_text("a: 1")
+        pin("ssa-comet-qe", snapshot, file="checkpoints/model.ckpt")
+        assert resolve("ssa-comet-qe") == snapshot.resolve() / "checkpoints" / "model.ckpt"
+        (snapshot / "hparams.yaml").write_text("a: 2")
+        assert verify(["ssa-comet-qe"]) == {"ssa-comet-qe": "mismatch"}
+
+    def test_missing_offline_raises(self, tmp_path):
+        with pytest.raises(FileNotFoundError, match="prefetch meag_lid"):
+            resolve("meag_lid")
+        artifact = tmp_path / "model.joblib"
+        artifact.write_bytes(b"x")
+        pin("meag_lid", artifact)
+        artifact.write_bytes(b"changed size")
+        with pytest.raises(FileNotFoundError):
+            resolve("meag_lid")
+
+    def test_checksum_catches_same_size_change(self, tmp_path):
+        artifact = tmp_path / "model.bin"
+        artifact.write_bytes(b"weights")
+        pin("glotlid", artifact)
+        artifact.write_bytes(b"WEIGHTS")
+        assert resolve("glotlid") == artifact.resolve()  # size only
+        with pytest.raises(FileNotFoundError):
+            resolve("glotlid", check_sha256=True)
+        assert verify() == {"glotlid": "mismatch"}
+
+    def test_laser_kwargs(self, tmp_path):
+        with pytest.raises(FileNotFoundError):
+            laser_kwargs("mos")
+        (tmp_path / "laser").mkdir()
+        (tmp_path / "laser" / "laser3-mos_Latn.v1.pt").write_bytes(b"x")
+        pin("laser-mos", tmp_path / "laser")
+        assert laser_kwargs("mos") == {"model_dir": str((tmp_path / "laser").resolve())}
+
+    def test_unknown_name(self):
+        with pytest.raises(KeyError):
+            model_registry._source("nope")
+
+
+def _comet_snapshot(root):
+    (root / "checkpoints").mkdir(parents=True)
+    (root / "checkpoints" / "model.ckpt").write_bytes(b"ckpt")
+    (root / "hparams.yaml").write_text(
+        "class_identifier: unified_metric\npretrained_model: Davlan/afro-xlmr-large\n"
+    )
+    return root
+
+
+def test_prefetch_comet_also_fetches_its_encoder(monkeypatch, tmp_path):
+    monkeypatch.delenv("MOORE_WEB_OFFLINE")
+    downloads = []
+
+    def fake_snapshot_download(repo_id, local_dir, **kwargs):
+        downloads.append((repo_id, kwargs.get("allow_patterns")))
+        if repo_id == "McGill-NLP/ssa-comet-qe":
+            _comet_snapshot(local_dir)
+        else:
+            local_dir.mkdir(parents=True)
+            (local_dir / "config.json").write_text("{}")
+
+    monkeypatch.setattr("huggingface_hub.snapshot_download", fake_snapshot_download)
+    paths = prefetch(["ssa-comet-qe"])
+    assert list(paths) == ["ssa-comet-qe", "ssa-comet-qe-encoder"]
+    assert [repo for repo, _ in downloads] == ["McGill-NLP/ssa-comet-qe", "Davlan/afro-xlmr-large"]
+    assert "*.json" in downloads[1][1]
+    assert model_registry.entry("ssa-comet-qe-encoder")["source"] == "hf://Davlan/afro-xlmr-large"
+
+    monkeypatch.setenv("MOORE_WEB_OFFLINE", "1")
+    assert prefetch(["ssa-comet-qe"]) == paths
+    assert len(downloads) == 2
+
+
+def test_comet_loads_encoder_from_registry(monkeypatch, tmp_path):
+    import sys
+    import types
+
+    from moore_web import score_comet_qe
+
+    pin("ssa-comet-qe", _comet_snapshot(tmp_path / "comet"), file="checkpoints/model.ckpt")
+    (tmp_path / "encoder").mkdir()
+    (tmp_path / "encoder" / "config.json").write_text("{}")
+    pin("ssa-comet-qe-encoder", tmp_path / "encoder")
+
+    calls = []
+
+    class FakeMetric:
+        @classmethod
+        def load_from_checkpoint(cls, path, **kwargs):
+            calls.append((path, kwargs))
+            return cls()
+
+    comet_models = types.ModuleType("comet.models")
+    comet_models.str2model = {"unified_metric": FakeMetric}
+    monkeypatch.setitem(sys.modules, "comet", types.ModuleType("comet"))
+    monkeypatch.setitem(sys.modules, "comet.models", comet_models)
+
+    assert isinstance(score_comet_qe.load_model(), FakeMetric)
+    ((path, kwargs),) = calls
+    assert path == str((tmp_path / "comet" / "checkpoints" / "model.ckpt").resolve())
+    assert kwargs["pretrained_model"] == str((tmp_path / "encoder").resolve())
+    assert kwargs["local_files_only"] is True
+
+
+def test_glotlid_loads_from_registry_without_network(tmp_path):
+    import fasttext
+
+    from moore_web import glotlid
+
+    train = tmp_path / "train.txt"
+    train.write_text("__label__mos_Latn yibeogo barka\n__label__fra_Latn bonjour merci\n" * 20)
+    model_file = tmp_path / "glotlid.bin"
+    fasttext.train_supervised(str(train), epoch=50, lr=1.0, verbose=0, thread=1).save_model(str(model_file))
+    pin("glotlid", model_file)
+
+    model = glotlid.load_model()
+    assert glotlid.predict(model, ["bonjour merci"]).langs() == ["fra_Latn"]
+    assert getattr(model, glotlid._REVISION_ATTR).startswith("cis-lmu/glotlid@sha256:")
@@ -0,0 +1,81 @@
+"""Tests for moore_web.near_dedup — MinHash-LSH near-duplicate clustering."""
+
+from __future__ import annotations
+
+import json
+
+import numpy as np
+from datasets import Dataset
+
+from moore_web.near_dedup import (
+    add_near_dup_clusters,
+    dedup_jsonl,
+    minhash_signatures,
+    near_dup_clusters,
+    normalize_text,
+)
+
+SRC = [
+    "Le gouvernement a adopté un projet de loi sur la santé publique.",
+    "le gouvernement  a adopté un projet de loi sur la santé publique",
+    "Le conseil des ministres s'est réuni ce mercredi à Ouagadougou.",
+    "Le gouvernement a adopté un projet de loi sur la santé publique.",
+]
+TGT = [
+    "Gʋvɛrnema sak n deeg tõog sẽn kẽed laafɩ wɛɛngẽ.",
+    "Gʋvɛrnema sak n deeg tõog sẽn kẽed laafɩ wɛɛngẽ",
+    "Minis-rãmb tigissg zĩnda Wagdgo ne lɑrbɑ.",
+    "Pʋg-sɑdbɑ tõogã kẽed rɑsɑɑmb yelle, lɑ b tõe n sõngɑ b mɑɑg-n-mens.",
+]
+
+
+class TestNormalizeText:
+    def test_case_punctuation_and_whitespace(self):
+        assert normalize_text("  Bonjour,   LE monde! ") == "bonjour le monde"
+
+    def test_none_is_empty(self):
+        assert normalize_text(None) == ""
+
+
+class TestMinhashSignatures:
+    def test_identical_after_normalisation(self):
+        sig = minhash_signatures(SRC[:2], TGT[:2])
+        assert sig.shape == (2, 128)
+        assert (sig[0] == sig[1]).all()
+
+    def test_short_and_empty_texts(self):
+        sig = minhash_signatures(["a", ""], ["", None])
+        assert sig.shape == (2, 128)
+
+
+class TestNearDupClusters:
+    def test_variants_cluster_and_other_side_matters(self):
+        clusters = near_dup_clusters(SRC, TGT)
+        assert clusters.tolist() == [0, 0, 2, 3]
+
+    def test_trailing_word_is_near_duplicate(self):
+        src = [SRC[0], SRC[0].rstrip(".") + " hier."]
+        tgt = [TGT[0], TGT[0]]
+        assert near_dup_clusters(src, tgt).tolist() == [0, 0]
+
+    def test_batches_do_not_change_result(self):
+        assert (near_dup_clusters(SRC, TGT, batch_size=1) == near_dup_clusters(SRC, TGT)).all()
+
+
+def test_add_near_dup_clusters_column():
+    ds = Dataset.from_dict({"french": SRC, "moore": TGT})
+    ds = add_near_dup_clusters(ds, "french", "moore")
+    assert ds["near_dup_cluster"] == [0, 0, 2, 3]
+
+
+def test_dedup_jsonl_drop(tmp_path):
+    path = tmp_path / "in.jsonl"
+    path.write_text(
+        "".join(json.dumps({"french": s, "moore": t}, ensure_ascii=False) + "\n" for s, t in zip(SRC, TGT)),
+        encoding="utf-8",
+    )
+    out = tmp_path / "out.jsonl"
+    clusters = dedup_jsonl(path, out, "french", "moore", drop=True)
+    rows = [json.loads(line) for line in out.read_text(encoding="utf-8").splitlines()]
+    assert np.array_equal(clusters, [0, 0, 2, 3])
+    assert [r["near_dup_cluster"] for r in rows] == [0, 2, 3]
@@ -0,0 +1,76 @@
+"""Tests for moore_web.orthography — character-class profiles and the pre-LID gate."""
+
+from __future__ import annotations
+
+import unicodedata
+
+import numpy as np
+import pyarrow as pa
+from datasets import Dataset
+
+from moore_web import annotate
+from moore_web.orthography import ENGLISH, FRENCH, NON_LATIN, PASS, SWAPPED, gate, profile, report_savings
+
+MOORE = "Yaa sõma n yɩɩd tɩ ned fãa wʋm a sẽn yet to-to"
+ENGLISH_TEXT = "The government of Burkina Faso and the people of the region"
+FRENCH_TEXT = "Le gouvernement a décidé de rénover l'hôpital régional à Kaya"
+CYRILLIC = "Правительство Буркина-Фасо"
+
+
+class TestProfile:
+    def test_ratios(self):
+        p = profile([MOORE, ENGLISH_TEXT, CYRILLIC, "", None])
+        assert p["moore"][0] > 0.1 and p["moore"][1] == 0
+        assert p["english"][1] > 0.3 and p["english"][0] == 0
+        assert p["french"][0] == p["french"][1] == 0
+        assert p["non_latin"][2] == 1.0 and p["non_latin"][1] == 0
+        assert p["letters"][3] == p["letters"][4] == 0
+        assert all(v.dtype == np.float32 for k, v in p.items() if k != "letters")
+
+    def test_decomposed_nasal_vowels_count(self):
+        decomposed = unicodedata.normalize("NFD", "sõma")
+        assert profile([decomposed])["moore"][0] > 0
+
+    def test_accepts_arrow_columns(self):
+        chunked = pa.chunked_array([[MOORE], [ENGLISH_TEXT]])
+        assert profile(chunked)["letters"].tolist() == profile([MOORE, ENGLISH_TEXT])["letters"].tolist()
+
+
+class TestGate:
+    def test_reasons(self):
+        src = ["Hello", "Hello", "Bonjour", "Hello", MOORE, "Hi"]
+        tgt = [MOORE, ENGLISH_TEXT, FRENCH_TEXT, CYRILLIC, "A yaa neere wusgo", "Yaa sõma"]
+        assert gate(src, tgt).tolist() == [PASS, ENGLISH, FRENCH, NON_LATIN, SWAPPED, PASS]
+
+    def test_french_proper_nouns_alone_do_not_reject(self):
+        tgt = [
+            "Ne Côte d Ivoire soaba wa yeela yaa soma",
+            "Général Traoré kenga Ségou ne a zamsdba wa",
+            "A Sénégal naaba yeela ti ned fa paama",
+        ]
+        assert gate(["Hello"] * 3, tgt).tolist() == [PASS] * 3
+
+    def test_short_texts_without_moore_chars_pass(self):
+        assert gate(["Hello"], ["The end"]).tolist() == [PASS]
+
+    def test_report_savings(self, capsys):
+        reasons = np.array([PASS, ENGLISH, ENGLISH, NON_LATIN], dtype=np.uint8)
+        report = report_savings(reasons, {"GlotLID": 2, "COMET-QE": 1})
+        assert report["rejected"] == 3
+        assert report["reasons"]["english"] == 2
+        assert report["calls_saved"] == {"GlotLID": 6, "COMET-QE": 3}
+        assert "GlotLID: 6 of 8 calls saved (75.0%)" in capsys.readouterr().out
+
+
+def test_annotate_gate_runs_before_models(monkeypatch):
+    seen = []
+
+    def fake_lang_id(dataset, **kwargs):
+        seen.extend(dataset["moore"])
+        return dataset
+
+    monkeypatch.setattr(annotate, "run_lang_id", fake_lang_id)
+    ds = Dataset.from_dict({"french": ["Bonjour", "Bonjour"], "moore": [MOORE, ENGLISH_TEXT]})
+    out = annotate.annotate(ds, lang_id=True, ortho_gate=True)
+    assert seen == [MOORE]
+    assert out["moore"] == [MOORE]
@@ -0,0 +1,97 @@
+"""Tests for moore_web.qe_proxy — feature building, training and COMET triage."""
+
+from __future__ import annotations
+
+from unittest.mock import MagicMock
+
+import numpy as np
+import pytest
+from datasets import Dataset
+
+from moore_web.qe_proxy import (
+    ACCEPT,
+    FEATURE_NAMES,
+    REJECT,
+    QEProxy,
+    build_features,
+    default_proxy_path,
+    train_proxy,
+)
+from moore_web.score_comet_qe import score_dataset
+
+
+@pytest.fixture(scope="module")
+def scored_dataset() -> Dataset:
+    rng = np.random.default_rng(0)
+    rows = []
+    for _ in range(400):
+        laser = float(rng.uniform(0.3, 1.0))
+        rows.append(
+            {
+                "french": "Bonjour tout le monde.",
+                "moore": "Yibeogo ne paam.",
+                "laser_score": laser,
+                "comet_qe": laser * 0.8 + float(rng.normal(0, 0.02)),
+            }
+        )
+    return Dataset.from_list(rows)
+
+
+@pytest.fixture(scope="module")
+def proxy(scored_dataset: Dataset) -> QEProxy:
+    return train_proxy(scored_dataset, threshold=0.5, max_error=0.05)
+
+
+class TestBuildFeatures:
+    def test_shape(self, scored_dataset: Dataset):
+        X = build_features(scored_dataset)
+        assert X.shape == (len(scored_dataset), len(FEATURE_NAMES))
+
+    def test_missing_columns_are_nan(self, scored_dataset: Dataset):
+        X = build_features(scored_dataset)
+        assert np.isnan(X[:, FEATURE_NAMES.index("identification_consistency")]).all()
+
+    def test_len_ratio_computed_from_texts(self):
+        X = build_features({"french": ["ab"], "moore": ["abcd"]})
+        assert X[0, FEATURE_NAMES.index("len_ratio")] == pytest.approx(0.5)
+
+
+class TestTrainProxy:
+    def test_decides_most_rows(self, proxy: QEProxy):
+        assert proxy.report["val_accept_rate"] + proxy.report["val_reject_rate"] > 0.5
+
+    def test_error_budget_respected_on_validation(self, proxy: QEProxy):
+        assert proxy.report["val_accept_error"] <= 0.05
+        assert proxy.report["val_reject_error"] <= 0.05
+
+    def test_shipped_model_is_the_calibrated_one(self, proxy: QEProxy, scored_dataset: Dataset):
+        # Same split as train_proxy: the first n_val rows of the seeded permutation.
+        val_idx = np.random.default_rng(42).permutation(len(scored_dataset))[: proxy.report["n_val"]]
+        X = build_features(scored_dataset)[val_idx]
+        y = np.asarray(scored_dataset["comet_qe"])[val_idx]
+        assert np.abs(proxy.predict(X) - y).mean() == pytest.approx(proxy.report["val_mae"])
+
+    def test_too_few_labels_raises(self):
+        ds = Dataset.from_list([{"french": "a", "moore": "b", "comet_qe": 0.5}] * 10)
+        with pytest.raises(ValueError):
+            train_proxy(ds)
+
+    def test_save_and_load_roundtrip(self, proxy: QEProxy, scored_dataset: Dataset, tmp_path):
+        path = proxy.save(default_proxy_path(tmp_path / "data.jsonl"))
+        assert path.name == "data.qe_proxy.joblib"
+        loaded = QEProxy.load(path)
+        X = build_features(scored_dataset)
+        assert np.allclose(loaded.predict(X), proxy.predict(X))
+
+
+class TestTriagedScoring:
+    def test_comet_only_sees_unsure_rows(self, proxy: QEProxy, scored_dataset: Dataset):
+        model = MagicMock()
+        model.predict.side_effect = lambda data, **kw: MagicMock(scores=[0.0] * len(data))
+        result = score_dataset(scored_dataset, model=model, proxy=proxy)
+
+        decisions, _ = proxy.triage(build_features(scored_dataset))
+        n_unsure = int(((decisions != ACCEPT) & (decisions != REJECT)).sum())
+        sent = len(model.predict.call_args[0][0]) if model.predict.called else 0
+        assert sent == n_unsure
+        assert sum(result["comet_qe_french_moore_from_proxy"]) == len(scored_dataset) - n_unsure
@@ -0,0 +1,72 @@
+"""Tests for the sharded LASER embedding cache in moore_web.score_laser."""
+
+from __future__ import annotations
+
+import json
+
+import numpy as np
+
+from moore_web.score_laser import compact_cache, encode_cached
+
+
+class FakeEncoder:
+    """Deterministic unit vectors derived from the text; records every encoded text."""
+
+    def __init__(self, dim: int = 8):
+        self.dim = dim
+        self.encoded: list[str] = []
+
+    def encode_sentences(self, texts, normalize_embeddings=True):
+        self.encoded.extend(texts)
+        out = np.array([np.random.default_rng(sum(map(ord, t))).normal(size=self.dim) for t in texts])
+        return out / np.linalg.norm(out, axis=1, keepdims=True)
+
+
+def _manifest(tmp_path):
+    return json.loads((tmp_path / "mos" / "manifest.json").read_text())
+
+
+class TestEncodeCached:
+    def test_each_text_encoded_once(self, tmp_path):
+        encoder = FakeEncoder()
+        first = encode_cached(encoder, ["a", "b", "a"], "mos", tmp_path)
+        second = encode_cached(encoder, ["b", "c", "a"], "mos", tmp_path)
+        assert encoder.encoded == ["a", "b", "c"]
+        assert np.allclose(first[0], first[2]) and np.allclose(second[2], first[0])
+        assert np.allclose(second, FakeEncoder().encode_sentences(["b", "c", "a"]))
+
+    def test_misses_append_a_shard(self, tmp_path):
+        encoder = FakeEncoder()
+        encode_cached(encoder, ["a", "b"], "mos", tmp_path)
+        encode_cached(encoder, ["a", "b"], "mos", tmp_path)
+        assert len(_manifest(tmp_path)["shards"]) == 1
+        encode_cached(encoder, ["c"], "mos", tmp_path)
+        manifest = _manifest(tmp_path)
+        assert manifest["generation"] == 2 and len(manifest["shards"]) == 2
+        assert len(np.load(tmp_path / "mos" / f"{manifest['shards'][1]}.keys.npy")) == 1
+
+    def test_unpublished_shard_is_ignored(self, tmp_path):
+        encoder = FakeEncoder()
+        encode_cached(encoder, ["a"], "mos", tmp_path)
+        # A shard written without its manifest update (crash) is never read.
+        np.save(tmp_path / "mos" / "shard-000002.keys.npy", np.zeros(1, dtype=np.uint64))
+        encode_cached(encoder, ["a", "b"], "mos", tmp_path)
+        assert encoder.encoded == ["a", "b"]
+
+
+def test_compact_cache(tmp_path):
+    texts = [f"text {i}" for i in range(50)]
+    encoder = FakeEncoder()
+    for start in range(0, 50, 10):
+        encode_cached(encoder, texts[start : start + 10], "mos", tmp_path)
+    old = _manifest(tmp_path)["shards"]
+    assert compact_cache(tmp_path, "mos", chunk_rows=7) == 50
+
+    manifest = _manifest(tmp_path)
+    assert len(manifest["shards"]) == 1
+    assert not any((tmp_path / "mos" / f"{name}.keys.npy").exists() for name in old)
+    keys = np.load(tmp_path / "mos" / f"{manifest['shards'][0]}.keys.npy")
+    assert (keys[1:] > keys[:-1]).all()
+    again = encode_cached(encoder, texts[::-1], "mos", tmp_path)
+    assert len(encoder.encoded) == 50
+    assert np.allclose(again, FakeEncoder().encode_sentences(texts[::-1]))
@@ -0,0 +1,68 @@
+"""Tests for moore_web.segment_news_data — streaming LID + segmentation."""
+
+from __future__ import annotations
+
+import copy
+import json
+
+from moore_web.lid import Predictions, annotate_text_units
+from moore_web.segment_news_data import read_entries, segment_entries, segment_stream, write_entries
+
+
+class FakePredictor:
+    """Labels units starting with 'Le ' as French; records the size of every call."""
+
+    def __init__(self):
+        self.calls: list[int] = []
+
+    def __call__(self, texts: list[str]) -> Predictions:
+        self.calls.append(len(texts))
+        langs = ["fra_Latn" if t.startswith("Le ") else "mos_Latn" for t in texts]
+        return Predictions.from_labels(langs, [0.9] * len(texts))
+
+
+ENTRIES = [
+    {"url": f"u{i}", "text_units": ["Yaa sõma", "Ned fãa", "Le journal", "Le sport"][: i % 4 + 1]}
+    for i in range(10)
+]
+
+
+class TestSegmentStream:
+    def test_matches_whole_corpus_path(self):
+        expected = segment_entries(annotate_text_units(copy.deepcopy(ENTRIES), FakePredictor(), decimals=4))
+        streamed = list(segment_stream(copy.deepcopy(ENTRIES), FakePredictor(), batch_texts=5))
+        assert streamed == expected
+
+    def test_lid_batches_span_articles(self):
+        predict_fn = FakePredictor()
+        list(segment_stream(copy.deepcopy(ENTRIES), predict_fn, batch_texts=5))
+        assert len(predict_fn.calls) < sum(len(e["text_units"]) > 1 for e in ENTRIES)
+        assert sum(predict_fn.calls) == sum(len(e["text_units"]) for e in ENTRIES if len(e["text_units"]) > 1)
+
+    def test_drop_debug(self):
+        out = list(segment_stream(copy.deepcopy(ENTRIES), FakePredictor(), drop_debug=True))
+        assert all("text_unit_langs" not in e and "segments" in e for e in out)
+        assert out[3]["segments"] == {"moore": ["Yaa sõma", "Ned fãa"], "french": ["Le journal", "Le sport"]}
+
+    def test_without_predictor_uses_existing_langs(self):
+        entry = {"text_units": ["a", "b"], "text_unit_langs": ["mos_Latn", "fra_Latn"]}
+        (out,) = segment_stream([entry])
+        assert out["segments"] == {"moore": ["a"], "french": ["b"]}
+
+
+class TestReadWrite:
+    def test_jsonl_round_trip(self, tmp_path):
+        path = tmp_path / "out.jsonl"
+        assert write_entries(iter(ENTRIES), path) == len(ENTRIES)
+        assert len(path.read_text(encoding="utf-8").splitlines()) == len(ENTRIES)
+        assert list(read_entries(path)) == ENTRIES
+
+    def test_json_output_matches_json_dump(self, tmp_path):
+        path = tmp_path / "out.json"
+        write_entries(iter(ENTRIES), path)
+        assert path.read_text(encoding="utf-8") == json.dumps(ENTRIES, ensure_ascii=False, indent=2)
+        assert list(read_entries(path)) == ENTRIES
+
+    def test_empty(self, tmp_path):
+        assert write_entries(iter([]), tmp_path / "out.json") == 0
+        assert json.loads((tmp_path / "out.json").read_text()) == []
@@ -0,0 +1,69 @@
+"""Tests for moore_web.semantic_dedup — near-duplicate clustering and representative choice."""
+
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from moore_web.semantic_dedup import find_semantic_clusters, select_representatives, semantic_dedup
+
+
+def _normalise(x: np.ndarray) -> np.ndarray:
+    return (x / np.linalg.norm(x, axis=1, keepdims=True)).astype(np.float32)
+
+
+@pytest.fixture(scope="module")
+def embeddings() -> tuple[np.ndarray, np.ndarray]:
+    """300 random rows followed by near copies of the first 30."""
+    rng = np.random.default_rng(0)
+    fr = rng.normal(size=(300, 64))
+    mo = rng.normal(size=(300, 64))
+    fr = np.vstack([fr, fr[:30] + 0.01 * rng.normal(size=(30, 64))])
+    mo = np.vstack([mo, mo[:30] + 0.01 * rng.normal(size=(30, 64))])
+    return _normalise(fr), _normalise(mo)
+
+
+class TestFindSemanticClusters:
+    @pytest.mark.parametrize("method", ["exact", "ivf"])
+    def test_near_copies_share_cluster(self, embeddings, method):
+        fr, mo = embeddings
+        labels = find_semantic_clusters(fr, mo, threshold=0.95, method=method, block_size=64)
+        assert (labels[:30] == labels[300:]).all()
+        assert len(np.unique(labels)) == 300
+
+    def test_one_side_similar_is_not_enough(self, embeddings):
+        fr, mo = embeddings
+        mo = mo.copy()
+        mo[300:] = mo[100:130]
+        labels = find_semantic_clusters(fr, mo, threshold=0.95, method="exact")
+        assert len(np.unique(labels)) == 330
+
+    def test_unknown_method_raises(self, embeddings):
+        with pytest.raises(ValueError):
+            find_semantic_clusters(*embeddings, method="hnsw")
+
+
+class TestSelectRepresentatives:
+    def test_source_priority_then_score(self):
+        rows = [
+            {"source": "news", "comet_qe": 0.9},
+            {"source": "mafand", "comet_qe": 0.1},
+            {"source": "mafand", "comet_qe": 0.5},
+            {"source": "news", "comet_qe": None},
+        ]
+        keep = select_representatives(rows, np.array([0, 0, 0, 1]), source_order=["mafand"])
+        assert keep.tolist() == [False, False, True, True]
+
+    def test_missing_score_ranks_last(self):
+        rows = [{"laser_score": None}, {"laser_score": 0.1}]
+        keep = select_representatives(rows, np.array([0, 0]), priority=("laser_score",))
+        assert keep.tolist() == [False, True]
+
+
+def test_semantic_dedup_keeps_one_per_cluster(embeddings):
+    fr, mo = embeddings
+    rows = [{"source": "a"} for _ in range(300)] + [{"source": "b"} for _ in range(30)]
+    kept, clusters = semantic_dedup(rows, fr, mo, source_order=("b",))
+    assert len(kept) == 300
+    assert sum(r["source"] == "b" for r in kept) == 30
+    assert len(clusters) == len(rows)
@@ -0,0 +1,92 @@
+"""Tests for the compiled foreign-wordlist artifact in moore_web.wordlists."""
+
+from __future__ import annotations
+
+import json
+
+import numpy as np
+import pytest
+
+from moore_web import wordlists
+from moore_web.filter_nllb import compute_warnings
+from moore_web.wordlists import CompiledWordlist, load_foreign_wordlist
+
+WORDS = {"maison", "house", "the", "chat_noir", "été"}
+
+
+class TestCompiledWordlist:
+    def test_set_semantics(self):
+        compiled = CompiledWordlist.from_words(WORDS)
+        assert len(compiled) == len(WORDS) and compiled
+        assert all(w in compiled for w in WORDS)
+        assert "yiri" not in compiled and None not in compiled
+        assert not CompiledWordlist.from_words(set())
+
+    def test_contains_many(self):
+        compiled = CompiledWordlist.from_words(WORDS)
+        assert compiled.contains_many(["yiri", "été", "house", ""]).tolist() == [False, True, True, False]
+        assert CompiledWordlist.from_words(set()).contains_many(["the"]).tolist() == [False]
+
+    def test_save_load_roundtrip(self, tmp_path):
+        path = CompiledWordlist.from_words(WORDS, {"foreign_langs": ["fra_Latn"]}).save(tmp_path / "w.npy")
+        loaded = CompiledWordlist.load(path)
+        assert isinstance(loaded.hashes, np.memmap)
+        assert loaded.meta["n_words"] == len(WORDS) and loaded.meta["foreign_langs"] == ["fra_Latn"]
+        assert "maison" in loaded
+
+    def test_load_rejects_other_format(self, tmp_path):
+        path = CompiledWordlist.from_words(WORDS).save(tmp_path / "w.npy")
+        meta_path = tmp_path / "w.npy.json"
+        meta_path.write_text(json.dumps({**json.loads(meta_path.read_text()), "format_version": 0}))
+        with pytest.raises(ValueError):
+            CompiledWordlist.load(path)
+
+
+SOURCES = {"glotlid_wordlists": "abc123", "pyspellchecker": "0.8.1"}
+
+
+def test_load_foreign_wordlist_compiles_once(tmp_path, monkeypatch):
+    calls = []
+    monkeypatch.setattr(wordlists, "build_foreign_wordlist", lambda *a: calls.append(a) or WORDS)
+    monkeypatch.setattr(wordlists, "source_revisions", lambda: dict(SOURCES))
+    path = tmp_path / "foreign.npy"
+    first = load_foreign_wordlist(path)
+    # Opening an existing artifact never looks up the source revisions.
+    monkeypatch.setattr(wordlists, "source_revisions", lambda: pytest.fail("source_revisions called"))
+    second = load_foreign_wordlist(path)
+    assert len(calls) == 1
+    assert np.array_equal(first.hashes, second.hashes)
+    assert second.meta["sources"] == SOURCES
+
+
+def test_load_foreign_wordlist_recompiles_when_sources_change(tmp_path, monkeypatch):
+    calls = []
+    monkeypatch.setattr(wordlists, "build_foreign_wordlist", lambda *a: calls.append(a) or WORDS)
+    monkeypatch.setattr(wordlists, "source_revisions", lambda: dict(SOURCES))
+    path = tmp_path / "foreign.npy"
+    load_foreign_wordlist(path)
+
+    monkeypatch.setattr(wordlists, "source_revisions", lambda: {**SOURCES, "glotlid_wordlists": None})
+    load_foreign_wordlist(path, check_sources=True)
+    assert len(calls) == 1  # unknown revision (offline): keep the artifact
+
+    monkeypatch.setattr(wordlists, "source_revisions", lambda: {**SOURCES, "glotlid_wordlists": "def456"})
+    load_foreign_wordlist(path)
+    assert len(calls) == 1
+    reloaded = load_foreign_wordlist(path, check_sources=True)
+    assert len(calls) == 2
+    assert reloaded.meta["sources"]["glotlid_wordlists"] == "def456"
+
+
+def test_source_revisions_skip_hub_when_offline(monkeypatch):
+    monkeypatch.setenv("HF_HUB_OFFLINE", "1")
+    monkeypatch.setattr("huggingface_hub.HfApi.dataset_info", lambda *a, **k: pytest.fail("Hub called"))
+    assert wordlists.source_revisions()["glotlid_wordlists"] is None
+
+
+def test_compute_warnings_same_for_set_and_compiled():
+    src = ["The house.", "Bonjour", "x"]
+    tgt = ["maison ne yiri", "Yibeogo sõma wẽnd", "chat_noir été the"]
+    assert repr(compute_warnings(src, tgt, WORDS)) == repr(
+        compute_warnings(src, tgt, CompiledWordlist.from_words(WORDS))
+    )
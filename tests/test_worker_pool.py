@@ -0,0 +1,59 @@
+"""Tests for moore_web.worker_pool — models loaded once in a template process."""
+
+from __future__ import annotations
+
+import os
+
+import pytest
+
+from moore_web import worker_pool
+from moore_web.worker_pool import WorkerPool
+
+# "Models" that record the process that loaded them.
+MODELS = {"loader_pid": "os:getpid", "offset": ("builtins:int", "7")}
+
+
+def _task(batch: list[int], scale: int = 1) -> tuple[int, int, list[int]]:
+    loaded_in = worker_pool.model("loader_pid")
+    return loaded_in, os.getpid(), [scale * x + worker_pool.model("offset") for x in batch]
+
+
+def _fail(batch):
+    raise ValueError(f"bad batch {batch}")
+
+
+class TestWorkerPool:
+    def test_models_load_once_in_template(self):
+        batches = [[i, i + 1] for i in range(0, 20, 2)]
+        with WorkerPool(MODELS, num_proc=2) as pool:
+            results = list(pool.map(_task, batches, scale=10))
+        loaders = {loaded_in for loaded_in, _, _ in results}
+        workers = {pid for _, pid, _ in results}
+        assert len(loaders) == 1
+        assert os.getpid() not in loaders | workers
+        assert loaders.isdisjoint(workers)
+        assert [values for _, _, values in results] == [[10 * x + 7 for x in b] for b in batches]
+        assert "loader_pid" not in worker_pool._MODELS  # never loaded in the caller
+
+    def test_errors_propagate_and_pool_stays_usable(self):
+        with WorkerPool(MODELS, num_proc=2) as pool:
+            with pytest.raises(ValueError, match="bad batch"):
+                list(pool.map(_fail, [[1]]))
+            first = next(pool.map(_task, [[1], [2], [3]]))
+            assert first[2] == [8]
+            assert [r[2] for r in pool.map(_task, [[4]])] == [[11]]
+
+    def test_inline_mode(self, monkeypatch):
+        monkeypatch.setattr(worker_pool, "_MODELS", {})
+        with WorkerPool(MODELS, num_proc=0) as pool:
+            (result,) = pool.map(_task, [[1, 2]])
+        assert result == (os.getpid(), os.getpid(), [8, 9])
+
+    def test_unknown_model(self):
+        with pytest.raises(KeyError):
+            WorkerPool(["no-such-model"])
+        assert WorkerPool(["laser-fra"]).specs["laser-fra"] == ("moore_web.worker_pool:load_laser", ("fra",))
+
+    def test_loader_errors_surface_at_start(self):
+        with pytest.raises(ModuleNotFoundError):
+            WorkerPool({"broken": "no_such_module:load"}, num_proc=1).start()